@@ -0,0 +1,66 @@
+from FractalEngine import FractalRenderer, escape_times, plane, mandelbrot, burning_ship, phoenix, tricorn, julia
+import argparse
+import numpy as np
+import time
+
+# Pixels/sec of the scalar fractal functions vs the vectorized engine.
+#   python Benchmark.py --width 400 --height 280 --max-iter 200
+
+SCALAR = {
+    "mandelbrot": mandelbrot,
+    "burning_ship": burning_ship,
+    "phoenix": phoenix,
+    "tricorn": tricorn,
+    "julia": julia,
+}
+
+def bench_scalar(func, x0, dx, y0, dy, width, height, max_iter):
+    start = time.perf_counter()
+    out = np.empty((height, width), dtype=np.int32)
+    for j in range(height):
+        for i in range(width):
+            out[j, i] = func(x0 + i * dx, y0 + j * dy, max_iter)
+    return out, time.perf_counter() - start
+
+def bench_vector(name, x0, dx, y0, dy, width, height, max_iter):
+    start = time.perf_counter()
+    out = escape_times(name, plane(x0, dx, y0, dy, width, height), max_iter)
+    return out, time.perf_counter() - start
+
+def bench_tiled(renderer, name, width, height, max_iter):
+    start = time.perf_counter()
+    renderer.render(name, -2.5, 1.5, -1.5, 1.5, width, height, max_iter)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fractal renderers")
+    parser.add_argument("--width", type=int, default=200)
+    parser.add_argument("--height", type=int, default=140)
+    parser.add_argument("--max-iter", type=int, default=70)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    width, height, max_iter = args.width, args.height, args.max_iter
+    pixels = width * height
+    x0, dx = -2.5, 4.0 / width
+    y0, dy = -1.5, 3.0 / height
+
+    print(f"{width}x{height} ({pixels:,} px), max_iter={max_iter}\n")
+    print(f"{'fractal':<14}{'scalar px/s':>14}{'numpy px/s':>14}{'tiled px/s':>14}{'speedup':>10}{'match':>8}")
+
+    for name, func in SCALAR.items():
+        scalar, t_scalar = bench_scalar(func, x0, dx, y0, dy, width, height, max_iter)
+        vector, t_vector = bench_vector(name, x0, dx, y0, dy, width, height, max_iter)
+        # fresh renderer every time so the tile cache doesn't help
+        renderer = FractalRenderer(workers=args.workers)
+        try:
+            bench_tiled(renderer, name, width, height, max_iter + 1)  # warm up the process pool
+            t_tiled = bench_tiled(renderer, name, width, height, max_iter)
+        finally:
+            renderer.close()
+        match = np.mean(scalar == vector) * 100
+        print(f"{name:<14}{pixels / t_scalar:>14,.0f}{pixels / t_vector:>14,.0f}{pixels / t_tiled:>14,.0f}"
+              f"{t_scalar / min(t_vector, t_tiled):>9.1f}x{match:>7.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from typing import Callable
+import numpy as np
+import threading
+import math
+import os
+
+# Vectorized escape-time engine.
+# Same maths as the scalar functions below, but every pixel of a tile is
+# iterated at once with NumPy. Points drop out of the working arrays as soon
+# as they escape, so the cost per iteration shrinks as we go.
+
+TILE_SIZE = 64
+# side length of one level 0 quadtree tile in the complex plane
+ROOT_SPAN = 4.0
+PARALLEL_MIN_PIXELS = 64 * 64
+TILE_CACHE_SIZE = 4096
+
+# Scalar versions, one point at a time. Still used for the escape time of a
+# single mouse click, and as the reference the benchmark compares against.
+
+def mandelbrot(x: float, y: float, max_iter: int) -> int:
+    c = complex(x, y)
+    z = 0j
+    for n in range(max_iter):
+        if abs(z) > 2:
+            return n
+        z = z*z + c
+    return 0
+
+def burning_ship(x: float, y: float, max_iter: int) -> int:
+    c = complex(x, y)
+    z = 0j
+    for n in range(max_iter):
+        if abs(z) > 2:
+            return n
+        z = complex(abs(z.real), abs(z.imag))
+        z = z*z + c
+    return 0
+
+def phoenix(x: float, y: float, max_iter: int) -> int:
+    c = complex(x, y)
+    z = 0j
+    p = 0j
+    for n in range(max_iter):
+        if abs(z) > 2:
+            return n
+        z, p = z*z + c + 0.56667 * p, z
+    return 0
+
+def tricorn(x: float, y: float, max_iter: int) -> int:
+    c = complex(x, y)
+    z = 0j
+    for n in range(max_iter):
+        if abs(z) > 2:
+            return n
+        z = (z.conjugate())**2 + c
+    return 0
+
+def julia(x: float, y: float, max_iter: int) -> int:
+    c = complex(-0.7, 0.27015)
+    z = complex(x, y)
+    for n in range(max_iter):
+        if abs(z) > 2:
+            return n
+        z = z*z + c
+    return 0
+
+# Vectorized versions
+
+def _mandelbrot_step(z, c, p):
+    return z * z + c, p
+
+def _burning_ship_step(z, c, p):
+    z = np.abs(z.real) + 1j * np.abs(z.imag)
+    return z * z + c, p
+
+def _phoenix_step(z, c, p):
+    return z * z + c + 0.56667 * p, z
+
+def _tricorn_step(z, c, p):
+    z = np.conj(z)
+    return z * z + c, p
+
+JULIA_C = complex(-0.7, 0.27015)
+
+# name -> (step function, starts at z=0 with c=point (False) or z=point with fixed c (True))
+FRACTALS = {
+    "mandelbrot": (_mandelbrot_step, False),
+    "burning_ship": (_burning_ship_step, False),
+    "phoenix": (_phoenix_step, False),
+    "tricorn": (_tricorn_step, False),
+    "julia": (_mandelbrot_step, True),
+}
+
+def escape_times(name: str, points: np.ndarray, max_iter: int) -> np.ndarray:
+    """Escape time for every complex number in points, 0 for points that never escape."""
+    step, is_julia = FRACTALS[name]
+    shape = points.shape
+    points = points.ravel()
+
+    if is_julia:
+        z = points.copy()
+        c = np.full(points.shape, JULIA_C)
+    else:
+        z = np.zeros(points.shape, dtype=np.complex128)
+        c = points.copy()
+    p = np.zeros(points.shape, dtype=np.complex128)
+
+    counts = np.zeros(points.shape, dtype=np.int32)
+    idx = np.arange(points.size)
+    for n in range(max_iter):
+        escaped = (z.real * z.real + z.imag * z.imag) > 4.0
+        if escaped.any():
+            counts[idx[escaped]] = n
+            alive = ~escaped
+            idx, z, c, p = idx[alive], z[alive], c[alive], p[alive]
+            if idx.size == 0:
+                break
+        z, p = step(z, c, p)
+    return counts.reshape(shape)
+
+def plane(x0: float, dx: float, y0: float, dy: float, width: int, height: int) -> np.ndarray:
+    """(height, width) grid of complex points, pixel (i, j) sits at x0 + i*dx, y0 + j*dy."""
+    xs = x0 + dx * np.arange(width)
+    ys = y0 + dy * np.arange(height)
+    return xs[np.newaxis, :] + 1j * ys[:, np.newaxis]
+
+def render_tile(name: str, max_iter: int, x0: float, dx: float, y0: float, dy: float, width: int, height: int) -> np.ndarray:
+    return escape_times(name, plane(x0, dx, y0, dy, width, height), max_iter)
+
+def _render_tile_job(job):
+    return render_tile(*job)
+
+def level_for(pixel_size: float) -> int:
+    """Quadtree level whose tile pixels are closest in size to pixel_size."""
+    return max(0, round(math.log2(ROOT_SPAN / (TILE_SIZE * pixel_size))))
+
+def level_pixel_size(level: int) -> float:
+    return ROOT_SPAN / (2 ** level) / TILE_SIZE
+
+class FractalRenderer:
+    """
+    Renders a viewport as an array of escape times.
+
+    The complex plane is covered by a quadtree of tiles anchored at 0+0j. A
+    tile on level L spans ROOT_SPAN / 2**L on each side and is always
+    TILE_SIZE x TILE_SIZE pixels, so each zoom step by 2 lands exactly on the
+    next level. A viewport is drawn from the level closest to its pixel size,
+    which means tiles are reused when panning and when zooming back out to a
+    level we already visited. Big batches of missing tiles go to a process pool.
+    """
+
+    def __init__(self, workers: int | None = None, cache_size: int = TILE_CACHE_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _compute(self, jobs: list, should_stop: Callable[[], bool] | None) -> list | None:
+        if self.workers > 1 and len(jobs) > 1 and len(jobs) * TILE_SIZE * TILE_SIZE >= PARALLEL_MIN_PIXELS:
+            futures = [self._get_pool().submit(_render_tile_job, job) for job in jobs]
+            tiles = []
+            for future in futures:
+                if should_stop is not None and should_stop():
+                    for f in futures:
+                        f.cancel()
+                    return None
+                tiles.append(future.result())
+            return tiles
+        tiles = []
+        for job in jobs:
+            if should_stop is not None and should_stop():
+                return None
+            tiles.append(_render_tile_job(job))
+        return tiles
+
+    def _tile_span(self, x_min: float, x_max: float, y_min: float, y_max: float,
+                   width: int, height: int, level: int):
+        pixel = level_pixel_size(level)
+        dx = (x_max - x_min) / width
+        dy = (y_max - y_min) / height
+        # level pixel that holds the centre of every viewport pixel
+        gx = np.floor((x_min + (np.arange(width) + 0.5) * dx) / pixel).astype(np.int64)
+        gy = np.floor((y_min + (np.arange(height) + 0.5) * dy) / pixel).astype(np.int64)
+        tx_range = range(int(gx[0]) // TILE_SIZE, int(gx[-1]) // TILE_SIZE + 1)
+        ty_range = range(int(gy[0]) // TILE_SIZE, int(gy[-1]) // TILE_SIZE + 1)
+        return gx, gy, tx_range, ty_range
+
+    def view_level(self, x_min: float, x_max: float, y_min: float, y_max: float, width: int, height: int) -> int:
+        return level_for(min((x_max - x_min) / width, (y_max - y_min) / height))
+
+    def is_cached(self, name: str, x_min: float, x_max: float, y_min: float, y_max: float,
+                  width: int, height: int, max_iter: int, level: int | None = None) -> bool:
+        if level is None:
+            level = self.view_level(x_min, x_max, y_min, y_max, width, height)
+        _, _, tx_range, ty_range = self._tile_span(x_min, x_max, y_min, y_max, width, height, level)
+        with self._lock:
+            return all((name, max_iter, level, tx, ty) in self._cache for ty in ty_range for tx in tx_range)
+
+    def render(self, name: str, x_min: float, x_max: float, y_min: float, y_max: float,
+               width: int, height: int, max_iter: int, level: int | None = None,
+               should_stop: Callable[[], bool] | None = None) -> np.ndarray | None:
+        """
+        Escape times for the viewport, shape (height, width).
+
+        level defaults to the one matching the viewport, pass a lower level
+        for a cheap coarse preview. Returns None if should_stop() turned true
+        before every tile was done (the finished tiles are still cached).
+        """
+        if level is None:
+            level = self.view_level(x_min, x_max, y_min, y_max, width, height)
+        pixel = level_pixel_size(level)
+        span = pixel * TILE_SIZE
+        gx, gy, tx_range, ty_range = self._tile_span(x_min, x_max, y_min, y_max, width, height, level)
+
+        tiles = {}
+        missing_keys = []
+        jobs = []
+        with self._lock:
+            for ty in ty_range:
+                for tx in tx_range:
+                    key = (name, max_iter, level, tx, ty)
+                    tile = self._cache.get(key)
+                    if tile is not None:
+                        self._cache.move_to_end(key)
+                        tiles[(tx, ty)] = tile
+                    else:
+                        missing_keys.append(key)
+                        # sample at the centre of each tile pixel
+                        jobs.append((name, max_iter, tx * span + pixel / 2, pixel, ty * span + pixel / 2, pixel, TILE_SIZE, TILE_SIZE))
+
+        computed = self._compute(jobs, should_stop) if jobs else []
+        if computed is None:
+            return None
+
+        with self._lock:
+            for key, tile in zip(missing_keys, computed):
+                tiles[key[3:]] = tile
+                self._cache[key] = tile
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        # stitch the tiles into one mosaic, then pick the pixel under every viewport pixel
+        tx0, ty0 = tx_range[0], ty_range[0]
+        mosaic = np.empty((len(ty_range) * TILE_SIZE, len(tx_range) * TILE_SIZE), dtype=np.int32)
+        for (tx, ty), tile in tiles.items():
+            top, left = (ty - ty0) * TILE_SIZE, (tx - tx0) * TILE_SIZE
+            mosaic[top:top + TILE_SIZE, left:left + TILE_SIZE] = tile
+        return mosaic[np.ix_(gy - ty0 * TILE_SIZE, gx - tx0 * TILE_SIZE)]
@@ -5,7 +5,10 @@ from textual.containers import Vertical, VerticalScroll, Horizontal, Container
 from textual_canvas import Canvas
 from textual.color import Color
 from textual import events
-from typing import Iterator
+from textual.worker import get_current_worker
+from FractalEngine import FractalRenderer, mandelbrot, burning_ship, phoenix, tricorn, julia
+from functools import lru_cache
+import numpy as np
 import pygame
 import time
 import math
@@ -31,69 +34,31 @@ BLUE_BROWN = [
     Color(106, 52, 3),
 ]
 
+# how many quadtree levels coarser the preview pass is (each level halves the resolution)
+COARSE_LEVELS = 2
+
 pygame.mixer.init(frequency=44100, size=-16, channels=1)
 
+SAMPLE_RATE = 44100
+# tones within this many cents of each other share one cached buffer
+FREQUENCY_BUCKET_CENTS = 5
+TONE_CACHE_SIZE = 128
+
+def frequency_bucket(frequency: float) -> int:
+    return round(1200 * math.log2(frequency) / FREQUENCY_BUCKET_CENTS)
+
+@lru_cache(maxsize=TONE_CACHE_SIZE)
+def _cached_tone(bucket: int, duration: float, volume: float):
+    frequency = 2 ** (bucket * FREQUENCY_BUCKET_CENTS / 1200)
+    t = np.arange(int(SAMPLE_RATE * duration)) / SAMPLE_RATE
+    samples = (volume * 32767 * np.sin(2 * np.pi * frequency * t)).astype("<i2")
+    samples.flags.writeable = False
+    sound = pygame.mixer.Sound(buffer=samples)
+    # byte view of the same samples, wave.writeframes takes it as is
+    return sound, memoryview(samples).cast("B")
+
 def generate_tone(frequency: float, duration: float = 0.2, volume: float = 0.5):
-    sample_rate = 44100
-    n_samples = int(sample_rate * duration)
-    buf = bytearray()
-    for i in range(n_samples):
-        value = int(volume * 32767 * math.sin(2 * math.pi * frequency * i / sample_rate))
-        buf += value.to_bytes(2, byteorder='little', signed=True)
-    sound = pygame.mixer.Sound(buffer=bytes(buf))
-    return sound, bytes(buf)
-
-def mandelbrot(x: float, y: float, max_iter: int) -> int:
-    c = complex(x, y)
-    z = 0j
-    for n in range(max_iter):
-        if abs(z) > 2:
-            return n
-        z = z*z + c
-    return 0
-
-def burning_ship(x: float, y: float, max_iter: int) -> int:
-    c = complex(x, y)
-    z = 0j
-    for n in range(max_iter):
-        if abs(z) > 2:
-            return n
-        z = complex(abs(z.real), abs(z.imag))
-        z = z*z + c
-    return 0
-
-def phoenix(x: float, y: float, max_iter: int) -> int:
-    c = complex(x, y)
-    z = 0j
-    p = 0j
-    for n in range(max_iter):
-        if abs(z) > 2:
-            return n
-        z, p = z*z + c + 0.56667 * p, z
-    return 0
-
-def tricorn(x: float, y: float, max_iter: int) -> int:
-    c = complex(x, y)
-    z = 0j
-    for n in range(max_iter):
-        if abs(z) > 2:
-            return n
-        z = (z.conjugate())**2 + c
-    return 0
-
-def julia(x: float, y: float, max_iter: int) -> int:
-    c = complex(-0.7, 0.27015)
-    z = complex(x, y)
-    for n in range(max_iter):
-        if abs(z) > 2:
-            return n
-        z = z*z + c
-    return 0
-
-def frange(r_from: float, r_to: float, size: int) -> Iterator[tuple[int, float]]:
-    step = (r_to - r_from) / size
-    for i in range(size):
-        yield i, r_from + i * step
+    return _cached_tone(frequency_bucket(frequency), duration, round(volume, 3))
 
 class SoundCanvas(Canvas):
     def __init__(self, *args, **kwargs):
@@ -107,16 +72,67 @@ class SoundCanvas(Canvas):
         self.y_min, self.y_max = -1.5, 1.5
         self.max_iter = 70
         self.fractal_func = mandelbrot
+        self.renderer = FractalRenderer()
 
     def render(self) -> None:
+        # Rendering happens on a worker thread so the event loop never waits on
+        # it. A new render cancels the one still running (exclusive worker).
+        view = (
+            self.fractal_func.__name__,
+            self.x_min, self.x_max, self.y_min, self.y_max,
+            self.width, self.height,
+        )
+        self.run_worker(lambda: self._render_progressive(view), thread=True, exclusive=True, group="render")
+
+    def _render_progressive(self, view: tuple) -> None:
+        worker = get_current_worker()
+        level = self.renderer.view_level(*view[1:])
+        passes = []
+        if not self.renderer.is_cached(*view, self.max_iter, level=level):
+            # quick blocky preview first: coarser quadtree level, fewer iterations
+            passes.append((max(0, level - COARSE_LEVELS), max(8, self.max_iter // 4)))
+        passes.append((level, self.max_iter))
+
+        for pass_level, max_iter in passes:
+            escape = self.renderer.render(*view, max_iter, level=pass_level, should_stop=lambda: worker.is_cancelled)
+            if escape is None or worker.is_cancelled:
+                return
+            self.app.call_from_thread(self._paint, escape)
+
+    def _paint(self, escape: np.ndarray) -> None:
+        if escape.shape != (self.height, self.width):
+            return
+        # one set_pixels call per palette colour instead of one call per pixel
+        palette = np.where(escape == 0, len(BLUE_BROWN), escape % len(BLUE_BROWN))
         with self.batch_refresh():
-            for x_pixel, x_point in frange(self.x_min, self.x_max, self.width):
-                for y_pixel, y_point in frange(self.y_min, self.y_max, self.height):
-                    value = self.fractal_func(x_point, y_point, self.max_iter)
-                    color = BLUE_BROWN[value % 16] if value else Color(0, 0, 0)
-                    self.set_pixel(x_pixel, y_pixel, color)
+            for index in np.unique(palette):
+                ys, xs = np.nonzero(palette == index)
+                color = BLUE_BROWN[index] if index < len(BLUE_BROWN) else Color(0, 0, 0)
+                self.set_pixels(zip(xs.tolist(), ys.tolist()), color)
         self.refresh()
 
+    def pan(self, fx: float, fy: float) -> None:
+        """Move the viewport by a fraction of its width/height."""
+        shift_x = (self.x_max - self.x_min) * fx
+        shift_y = (self.y_max - self.y_min) * fy
+        self.x_min, self.x_max = self.x_min + shift_x, self.x_max + shift_x
+        self.y_min, self.y_max = self.y_min + shift_y, self.y_max + shift_y
+        self.render()
+
+    def zoom(self, factor: float) -> None:
+        """Zoom around the centre of the viewport, factor > 1 zooms in."""
+        cx, cy = (self.x_min + self.x_max) / 2, (self.y_min + self.y_max) / 2
+        half_w = (self.x_max - self.x_min) / (2 * factor)
+        half_h = (self.y_max - self.y_min) / (2 * factor)
+        self.x_min, self.x_max = cx - half_w, cx + half_w
+        self.y_min, self.y_max = cy - half_h, cy + half_h
+        self.render()
+
+    def reset_view(self) -> None:
+        self.x_min, self.x_max = -2.5, 1.5
+        self.y_min, self.y_max = -1.5, 1.5
+        self.render()
+
     async def on_mouse_down(self, event: events.MouseDown) -> None:
         current_time = time.time()
         if current_time - self._last_sound < self._cooldown:
@@ -160,7 +176,7 @@ class Mandelbrot(Widget):
                 id="mainrow",
             ),
             Static(
-                "Controls: Press Enter to save sound",
+                "Controls: Enter to save sound | Arrows to pan | +/- to zoom | R to reset view",
                 id="footer",
             ),
         )
@@ -186,7 +202,7 @@ class Mandelbrot(Widget):
 
     def save_last_sound(self):
         if self.canvas.last_raw_buffer and self.canvas.last_coords:
-            freq_samples = 44100
+            freq_samples = SAMPLE_RATE
             buf = self.canvas.last_raw_buffer
             x_coord, y_coord = self.canvas.last_coords
             filename = f"Library/sound_{x_coord:.4f}_{y_coord:.4f}.wav"
@@ -197,11 +213,25 @@ class Mandelbrot(Widget):
                 wf.setframerate(freq_samples)
                 wf.writeframes(buf)
 
+    def on_unmount(self) -> None:
+        self.canvas.renderer.close()
+
     async def on_key(self, event: events.Key) -> None:
+        pan_keys = {"left": (-0.125, 0), "right": (0.125, 0), "up": (0, -0.125), "down": (0, 0.125)}
         if event.key == "enter":
             self.save_last_sound()
-            event.prevent_default()
-            event.stop()
+        elif event.key in pan_keys:
+            self.canvas.pan(*pan_keys[event.key])
+        elif event.key in ("plus", "equals_sign"):
+            self.canvas.zoom(2)
+        elif event.key in ("minus", "underscore"):
+            self.canvas.zoom(0.5)
+        elif event.key == "r":
+            self.canvas.reset_view()
+        else:
+            return
+        event.prevent_default()
+        event.stop()
 
 class MandelbrotApp(App):
     CSS_PATH = "Styling.tcss"
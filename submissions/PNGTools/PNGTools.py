@@ -1,18 +1,26 @@
 import argparse
 import base64
-import colorsys
+import contextlib
+import glob
 import io
 import math
 import os
-import random
+import shlex
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import numpy as np
-
+from pngtools import kernels
+from pngtools import stego
+from pngtools.compressor import SizeTargetCompressor, DEFAULT_WORKERS
 class PNGTools:
     def __init__(self):
         self.original_image = None
         self.processed_image = None
+        # (image, png bytes) when processed_image was already encoded, save_image writes those bytes as is
+        self.encoded_image = None
+        self._original_png_size = None
 
     def load_image(self, file_path):
 
@@ -45,6 +53,10 @@ class PNGTools:
                 # It's a string (likely base64 or analysis result)
                 with open(output_path, 'w') as f:
                     f.write(self.processed_image)
+            elif (self.encoded_image is not None and self.encoded_image[0] is self.processed_image
+                  and file_extension not in ('.jpg', '.jpeg', '.webp')):
+                with open(output_path, 'wb') as f:
+                    f.write(self.encoded_image[1])
             else:
                 if file_extension == '.jpg' or file_extension == '.jpeg':
                     self.processed_image.convert("RGB").save(output_path, format="JPEG")
@@ -58,214 +70,88 @@ class PNGTools:
             sys.exit(1)
     
     
-    def color_distance(self, color1, color2):
-        return sum((a - b) ** 2 for a, b in zip(color1, color2)) ** 0.5 / 441.6729559300637
-    # 441.6729559300637 is obtained from sqrt(255^2 + 255^2 + 255^2) from the euclidean distance formula for colors
-
     def make_transparent(self, target_color, tolerance):
         if not self.original_image:
             return
         
-        img = self.original_image.convert("RGBA")
-        data = img.getdata()
-        new_data = []
-        target_rgb = tuple(int(target_color[i:i+2], 16) for i in (0, 2, 4))
+        pixels = kernels.rgba_pixels(self.original_image)
+        target_rgb = kernels.parse_hex(target_color)
         threshold = tolerance / 100.0
-
-        for item in data:
-            if self.color_distance(item[:3], target_rgb) <= threshold:
-                new_data.append((item[0], item[1], item[2], 0))
-            else:
-                new_data.append(item)
-
-        img.putdata(new_data)
-        self.processed_image = img
+        kernels.make_transparent(pixels, target_rgb, threshold)
+        self.processed_image = kernels.to_image(pixels)
 
 
     def swap_colors(self, target_color, new_color, tolerance):
         if not self.original_image:
             return
         
-        img = self.original_image.convert("RGBA")
-        data = img.getdata()
-        new_data = []
-        target_rgb = tuple(int(target_color[i:i+2], 16) for i in (0, 2, 4))
-        new_rgb = tuple(int(new_color[i:i+2], 16) for i in (0, 2, 4))
+        pixels = kernels.rgba_pixels(self.original_image)
+        target_rgb = kernels.parse_hex(target_color)
+        new_rgb = kernels.parse_hex(new_color)
         threshold = tolerance / 100.0
-
-        for item in data:
-            if self.color_distance(item[:3], target_rgb) <= threshold:
-                new_data.append(new_rgb + (item[3],))
-            else:
-                new_data.append(item)
-
-        img.putdata(new_data)
-        self.processed_image = img
+        kernels.swap_colors(pixels, target_rgb, new_rgb, threshold)
+        self.processed_image = kernels.to_image(pixels)
 
     def change_color_tone(self, new_tone):
         if not self.original_image:
             return
         
-        img = self.original_image.convert("RGBA")
-        data = img.getdata()
-        new_data = []
-        new_rgb = tuple(int(new_tone[i:i+2], 16) for i in (0, 2, 4))
-        new_hsv = colorsys.rgb_to_hsv(*[x/255.0 for x in new_rgb])
-
-        for item in data:
-            if item[3] != 0:
-                r, g, b = item[:3]
-                h, s, v = colorsys.rgb_to_hsv(r/255.0, g/255.0, b/255.0)
-                new_r, new_g, new_b = colorsys.hsv_to_rgb(new_hsv[0], new_hsv[1], v)
-                new_data.append((int(new_r*255), int(new_g*255), int(new_b*255), item[3]))
-            else:
-                new_data.append(item)
-
-        img.putdata(new_data)
-        self.processed_image = img
+        pixels = kernels.rgba_pixels(self.original_image)
+        kernels.change_color_tone(pixels, kernels.parse_hex(new_tone))
+        self.processed_image = kernels.to_image(pixels)
 
     def change_opacity(self, opacity):
         if not self.original_image:
             return
 
-        img = self.original_image.convert("RGBA")
-        data = img.getdata()
-        new_data = []
+        pixels = kernels.rgba_pixels(self.original_image)
         opacity_level = opacity / 100.0
-
-        for item in data:
-            new_alpha = int(item[3] * opacity_level)
-            new_data.append(item[:3] + (new_alpha,))
-
-        img.putdata(new_data)
-        self.processed_image = img
+        kernels.scale_opacity(pixels, opacity_level)
+        self.processed_image = kernels.to_image(pixels)
 
     def add_noise(self, noise_level, color_similarity=None):
         if not self.original_image:
             return
         
-        img = self.original_image.convert("RGBA")
-        width, height = img.size
-        pixels = img.load()
+        pixels = kernels.rgba_pixels(self.original_image)
+        height, width = pixels.shape[:2]
         noise_amount = noise_level / 100.0
-
-        noise_type = "similar" if color_similarity is not None else "random"
         similarity = color_similarity / 100.0 if color_similarity is not None else None
 
-        for _ in range(int(width * height * noise_amount)):
-            x = random.randint(0, width - 1)
-            y = random.randint(0, height - 1)
-
-            if noise_type == "random":
-                new_color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255), 255)
-            else:
-                r, g, b, a = pixels[x, y]
-                new_r = max(0, min(255, int(r + (random.random() * 2 - 1) * 255 * similarity)))
-                new_g = max(0, min(255, int(g + (random.random() * 2 - 1) * 255 * similarity)))
-                new_b = max(0, min(255, int(b + (random.random() * 2 - 1) * 255 * similarity)))
-                new_color = (new_r, new_g, new_b, a)
-
-            pixels[x, y] = new_color
+        kernels.add_noise(pixels, int(width * height * noise_amount), similarity)
+        self.processed_image = kernels.to_image(pixels)
 
-        self.processed_image = img
-
-    def compress_png(self, compression_level):
+    def compress_png(self, compression_level, workers=None):
         if not self.original_image:
             return
         
-        img = self.original_image.copy()
-        original_size = self.find_file_size(self.original_image)
+        original_size = self.original_png_size()
         target_ratio = (compression_level / 100) ** 0.7 * 98
         target_size = original_size * (1 - target_ratio / 100)
-        min_resolution_factor = 0.1
-        max_resolution_factor = 0.95
 
+        # starting point of the palette search, the search moves from here
         if compression_level <= 20:
-            resolution_factor = 0.85
             color_mode = 'P'
             palette_size = 256
         elif compression_level <= 40:
-            resolution_factor = 0.7
             color_mode = 'P'
             palette_size = 192
         elif compression_level <= 60:
-            resolution_factor = 0.55
             color_mode = 'P'
             palette_size = 128
         elif compression_level <= 80:
-            resolution_factor = 0.4
             color_mode = 'P'
             palette_size = 64
         else:
-            resolution_factor = 0.3
             color_mode = 'L' if compression_level > 85 else 'P'
             palette_size = 32
 
-        img_resized = img.copy()
-        new_width = max(1, int(img.width * resolution_factor))
-        new_height = max(1, int(img.height * resolution_factor))
-        img_resized = img_resized.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-        if color_mode == 'P':
-            if img_resized.mode == 'RGBA':
-                background = Image.new('RGB', img_resized.size, (255, 255, 255))
-                background.paste(img_resized, mask=img_resized.split()[3])
-                img_resized = background
-            elif img_resized.mode != 'RGB':
-                img_resized = img_resized.convert('RGB')
-
-            img_resized = img_resized.quantize(colors=palette_size, method=2)
-        
-        elif color_mode == 'L':
-            img_resized = img_resized.convert('L')
-
-        output = io.BytesIO()
-        img_resized.save(output, format="PNG", optimize=True, compress_level=9)
-        output.seek(0)
-        self.processed_image = Image.open(output)
-        compressed_size = self.find_file_size(self.processed_image)
-
-        tolerance = 0.05 * target_size
-        iterations = 0
-        max_iterations = 3
-
-        while abs(compressed_size - target_size) > tolerance and iterations < max_iterations:
-            iterations += 1
-
-            if compressed_size > target_size:
-                resolution_factor *= 0.85
-                if resolution_factor < min_resolution_factor:
-                    resolution_factor = min_resolution_factor
-                    break
-            
-            else:
-                resolution_factor /= 0.85
-                if resolution_factor > max_resolution_factor:
-                    resolution_factor = max_resolution_factor
-                    break
-
-            img_resized = img.copy()
-            new_width = max(1, int(img.width * resolution_factor))
-            new_height = max(1, int(img.height * resolution_factor))
-            img_resized = img_resized.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-            if color_mode == 'P':
-                if img_resized.mode == 'RGBA':
-                    background = Image.new('RGB', img_resized.size, (255, 255, 255))
-                    background.paste(img_resized, mask=img_resized.split()[3])
-                    img_resized = background
-                elif img_resized.mode != 'RGB':
-                    img_resized = img_resized.convert('RGB')
-                
-                img_resized = img_resized.quantize(colors=palette_size, method=2)
-            elif color_mode == 'L':
-                img_resized = img_resized.convert('L')
-
-            output = io.BytesIO()
-            img_resized.save(output, format="PNG", optimize=True, compress_level=9)
-            output.seek(0)
-            self.processed_image = Image.open(output)
-            compressed_size = self.find_file_size(self.processed_image)
+        compressor = SizeTargetCompressor(self.original_image, target_size * 1024, color_mode,
+                                          workers=workers or DEFAULT_WORKERS)
+        best = compressor.run(palette_size)
+        self.processed_image = best.image()
+        self.encoded_image = (self.processed_image, best.data)
+        compressed_size = best.size / 1024
 
         ratio = (1 - compressed_size / original_size) * 100 if original_size > 0 else 0
 
@@ -274,9 +160,16 @@ class PNGTools:
         print(f"Original size: {original_size:.2f} KB")
         print(f"Compressed size: {compressed_size:.2f} KB")
         print(f"Compression ratio: {ratio:.2f}%")
+        print(f"Candidates evaluated: {len(compressor.candidates)}")
 
         return ratio
 
+    def original_png_size(self):
+        """PNG size of original_image in KB, encoded once per loaded image"""
+        if self._original_png_size is None or self._original_png_size[0] is not self.original_image:
+            self._original_png_size = (self.original_image, self.find_file_size(self.original_image))
+        return self._original_png_size[1]
+
     def find_file_size(self, image):
         temp_buffer = io.BytesIO()
         image.save(temp_buffer, format="PNG")
@@ -348,9 +241,7 @@ class PNGTools:
         if not self.original_image:
             return
 
-        temp_buffer = io.BytesIO()
-        self.original_image.save(temp_buffer, format="PNG")
-        size_bytes = temp_buffer.getbuffer().nbytes
+        size_bytes = self.original_png_size() * 1024
 
         if size_bytes < 1024:
             result = f"{size_bytes} bytes"
@@ -652,65 +543,30 @@ class PNGTools:
         
         self.processed_image = img.crop(bbox)
 
-    def hide_text(self, message):
+    def hide_text(self, message, bits=1):
         if not self.original_image:
             return
             
-        img = self.original_image.convert("RGBA")
+        if not 1 <= bits <= stego.MAX_BITS:
+            print(f"Error: --bits must be between 1 and {stego.MAX_BITS}")
+            sys.exit(1)
+        pixels = kernels.rgba_pixels(self.original_image)
         message_bytes = message.encode('utf-8')
-        message_bytes += b'\x00'
-        width, height = img.size
-        max_bytes = width * height * 3 // 8
+        max_bytes = stego.capacity(pixels, bits) - 1
         if len(message_bytes) > max_bytes:
-            print(f"Error: Message too long for this image. Maximum size: {max_bytes} bytes")
+            print(f"Error: Message too long for this image. Maximum size: {max_bytes} bytes at {bits} bit(s) per channel")
             sys.exit(1)
-        pixels = list(img.getdata())
-        pixel_array = list(pixels)
-        message_bits = ''.join([format(byte, '08b') for byte in message_bytes])
-        bit_index = 0
-        
-        for i in range(len(pixel_array)):
-            if bit_index >= len(message_bits):
-                break
-                
-            r, g, b, a = pixel_array[i]
-            if bit_index < len(message_bits):
-                r = (r & ~1) | int(message_bits[bit_index])
-                bit_index += 1
-            
-            if bit_index < len(message_bits):
-                g = (g & ~1) | int(message_bits[bit_index])
-                bit_index += 1
-            
-            if bit_index < len(message_bits):
-                b = (b & ~1) | int(message_bits[bit_index])
-                bit_index += 1
-            
-            pixel_array[i] = (r, g, b, a)
-        
-        new_img = Image.new('RGBA', img.size)
-        new_img.putdata(pixel_array)
-        self.processed_image = new_img
+        stego.embed(pixels, message_bytes, bits)
+        self.processed_image = kernels.to_image(pixels)
 
-    def extract_hidden_text(self):
+    def extract_hidden_text(self, bits=1):
         if not self.original_image:
             return
             
-        img = self.original_image.convert("RGBA")
-        pixels = list(img.getdata())
-        extracted_bits = ''
-        for r, g, b, a in pixels:
-            extracted_bits += str(r & 1)
-            extracted_bits += str(g & 1)
-            extracted_bits += str(b & 1)
-        
-        extracted_bytes = bytearray()
-        for i in range(0, len(extracted_bits), 8):
-            if i + 8 <= len(extracted_bits):
-                byte = int(extracted_bits[i:i+8], 2)
-                if byte == 0:
-                    break
-                extracted_bytes.append(byte)
+        if not 1 <= bits <= stego.MAX_BITS:
+            print(f"Error: --bits must be between 1 and {stego.MAX_BITS}")
+            sys.exit(1)
+        extracted_bytes = stego.extract(kernels.rgba_pixels(self.original_image), bits)
         
         try:
             message = extracted_bytes.decode('utf-8')
@@ -758,32 +614,9 @@ class PNGTools:
         if not self.original_image:
             return
         
-        img = self.original_image.convert("RGBA")
-        width, height = img.size
-        pixels = img.load()
-
-        for y in range(height):
-            for x in range(width):
-                r, g, b, a = pixels[x, y]
-
-                if filter_type == "grayscale":
-                    gray = int(0.299 * r + 0.587 * g + 0.114 * b)
-                    pixels[x, y] =  (gray, gray, gray, a)
-                elif filter_type == "sepia":
-                    tr = int(0.393 * r + 0.769 * g + 0.189 * b)
-                    tg = int(0.349 * r + 0.686 * g + 0.168 * b)
-                    tb = int(0.272 * r + 0.534 * g + 0.131 * b)
-                    pixels[x, y] = (min(tr, 255), min(tg, 255), min(tb, 255), a)
-                elif filter_type == "negative":
-                    pixels[x, y] = (255 - r, 255 - g, 255 - b, a)
-                elif filter_type == "red":
-                    pixels[x, y] = (r, 0, 0, a)
-                elif filter_type == "green":
-                    pixels[x, y] = (0, g, 0, a)
-                elif filter_type == "blue":
-                    pixels[x, y] = (0, 0, b, a)
-
-        self.processed_image = img
+        pixels = kernels.rgba_pixels(self.original_image)
+        kernels.apply_filter(pixels, filter_type)
+        self.processed_image = kernels.to_image(pixels)
         return self
 
     def crop_image(self, left=None, top=None, right=None, bottom=None, topleft=None, bottomright=None):
@@ -905,6 +738,8 @@ Processing Operations:
 
     hide-text           Hide a secret message inside the PNG
         --message "<string>"    Message to conceal (in quotes)
+        --message-file <path>   Hide the contents of a text file instead
+        --bits <n>              Bits per colour channel, 1-8 (default: 1)
 
     resize              Resize the PNG
         --width <px>            New width in pixels
@@ -926,11 +761,19 @@ Processing Operations:
         --bottomright <x,y>     Top right coordinates
         
         
+Pipeline Mode (process many images, each decoded and saved once):
+    -i, --input <path>          Directory, glob ("sprites/**/*.png") or file
+    -o, --output <dir>          Output directory, relative paths are kept
+    --pipeline "<steps>"        Operations separated by |, each with its own options
+                                e.g. "trim | resize --width 64 | compress --level 50"
+    --workers <n>               (Optional) Worker processes, defaults to CPU count
+
 Information Commands (No output file required):
     analyze             Analyze the PNG file (basic metadata)
     size                Get PNG file size
     color-count         Count the number of unique colors in the PNG
     extract-hidden-text Extract hidden text from PNG
+        --bits <n>              Bits per channel the text was hidden with (default: 1)
     pick-color          Get color at specific coordinates
         --x <px>                X cooridnate
         --y <px>                Y coordinate
@@ -938,25 +781,12 @@ Information Commands (No output file required):
 
     print(usage)
 
-def main():
-    if len(sys.argv) == 1:
-        print_usage()
-        sys.exit(1)
-
-    parser = argparse.ArgumentParser(description='PNG manipulation tool', add_help=False)
-
-    parser.add_argument('-h', '--help', action='store_true', help='Show this help message')
-    parser.add_argument('-i', '--input', help='Input image file')
-    parser.add_argument('-o', '--output', help='Output image file (not required for info commands)')
-    parser.add_argument('-p', '--process', help='Processing operation to perform')
-
-    args, _ = parser.parse_known_args()
-    if args.help:
-        print_usage()
-        sys.exit(0)
+INFO_COMMANDS = ['analyze', 'size', 'color-count', 'pick-color', 'extract-hidden-text']
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
 
+def build_parser(require_input=True):
     parser = argparse.ArgumentParser(description='PNG manipulation tool')
-    parser.add_argument('-i', '--input', required=True, help='Input image file')
+    parser.add_argument('-i', '--input', required=require_input, help='Input image file')
     parser.add_argument('-o', '--output', help='Output image file (not required for info commands)')
     parser.add_argument('-p', '--process', required=True, help='Processing operation to perform')
 
@@ -977,6 +807,8 @@ def main():
     parser.add_argument('--italic', action='store_true', help='Italic text')
     parser.add_argument('--radius', type=float, help='Blur radius')
     parser.add_argument('--message', help='Message to hide in PNG')
+    parser.add_argument('--message-file', help='Text file to hide in PNG')
+    parser.add_argument('--bits', type=int, default=1, help='Bits per colour channel used to hide text')
     parser.add_argument('--thickness', type=int, help='Border thickness')
     parser.add_argument('--cornerradius', type=int, help='Corner radius')
     parser.add_argument('--tl', type=int, help='Top left corner radius')
@@ -993,27 +825,10 @@ def main():
     parser.add_argument('--bottom', type=int, help='Bottom y coordinate for cropping')
     parser.add_argument('--topleft', help='Top left coordinate for cropping in format "x,y"')
     parser.add_argument('--bottomright', help='Bottom right coordinate for cropping in format "x,y"')
+    return parser
 
-    try:
-        args = parser.parse_args()
-    except SystemExit:
-        print_usage()
-        sys.exit(1)
-
-    if not os.path.exists(args.input):
-        print(f"Error: Input file '{args.input}' does not exist")
-        print_usage()
-        sys.exit(1)
-
-    info_commands = ['analyze', 'size', 'color-count', 'pick-color', 'extract-hidden-text']
-    if args.process not in info_commands and not args.output:
-        print("Error: Output file is required for this operation")
-        print_usage()
-        sys.exit(1)
-
-    tools = PNGTools()
-    tools.load_image(args.input)
-
+def run_process(tools, args):
+    """Runs the operation named by args.process on the image loaded in tools"""
     if args.process == 'transparent':
         if not args.color:
             print("Error: --color is required for transparent operation")
@@ -1167,14 +982,17 @@ def main():
         tools.trim_png()
 
     elif args.process == 'hide-text':
+        if args.message_file:
+            with open(args.message_file, encoding='utf-8') as f:
+                args.message = f.read()
         if not args.message:
-            print("Error: --message is required for hide-text operation")
+            print("Error: --message or --message-file is required for hide-text operation")
             print_usage()
             sys.exit(1)
-        tools.hide_text(args.message)
+        tools.hide_text(args.message, args.bits)
 
     elif args.process == 'extract-hidden-text':
-        tools.extract_hidden_text()
+        tools.extract_hidden_text(args.bits)
 
     elif args.process == 'resize':
         if args.width is None and args.height is None:
@@ -1211,7 +1029,186 @@ def main():
         print_usage()
         sys.exit(1)
 
-    if args.process not in info_commands and args.output:
+def parse_pipeline(pipeline):
+    """Turns 'trim | resize --width 64 | compress --level 50' into one parsed args per step"""
+    lexer = shlex.shlex(pipeline, posix=True, punctuation_chars='|')
+    lexer.whitespace_split = True
+    steps = [[]]
+    for token in lexer:
+        if token == '|':
+            steps.append([])
+        else:
+            steps[-1].append(token)
+
+    parser = build_parser(require_input=False)
+    parsed = []
+    for step in steps:
+        if not step:
+            print(f"Error: Empty step in pipeline '{pipeline}'")
+            sys.exit(1)
+        try:
+            args = parser.parse_args(['-p'] + step)
+        except SystemExit:
+            print(f"Error: Could not parse pipeline step '{' '.join(step)}'")
+            sys.exit(1)
+        if args.process in INFO_COMMANDS or args.process == 'split-rgba':
+            print(f"Error: '{args.process}' can't be used in a pipeline, it doesn't produce a single image")
+            sys.exit(1)
+        parsed.append(args)
+    return parsed
+
+def expand_inputs(pattern):
+    """Returns [(input_path, path_relative_to_the_output_dir)] for a directory, glob or single file"""
+    if os.path.isdir(pattern):
+        root = pattern
+        files = [os.path.join(folder, name)
+                 for folder, _, names in os.walk(pattern)
+                 for name in names if name.lower().endswith(IMAGE_EXTENSIONS)]
+    else:
+        files = [f for f in glob.glob(pattern, recursive=True) if os.path.isfile(f)]
+        if not files:
+            return []
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files])
+    return [(f, os.path.relpath(os.path.abspath(f), os.path.abspath(root))) for f in sorted(files)]
+
+def run_pipeline_file(job):
+    """Decodes one image, runs every step on it in memory and saves it once. Runs in the worker processes."""
+    input_path, output_path, steps = job
+    timings = []
+    captured = io.StringIO()
+    try:
+        # every operation prints, which would be a mess with thousands of files
+        with contextlib.redirect_stdout(captured):
+            started = time.perf_counter()
+            tools = PNGTools()
+            tools.load_image(input_path)
+            tools.original_image.load()
+            timings.append(('decode', time.perf_counter() - started))
+
+            for step in steps:
+                started = time.perf_counter()
+                step.input, step.output = input_path, output_path
+                run_process(tools, step)
+                tools.original_image = tools.processed_image
+                timings.append((step.process, time.perf_counter() - started))
+
+            started = time.perf_counter()
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            tools.save_image(output_path)
+            timings.append(('save', time.perf_counter() - started))
+        return input_path, True, timings, ''
+    except (Exception, SystemExit) as e:
+        # keep the error, not the usage text that comes after it
+        message = captured.getvalue().split('\nUsage:')[0].strip()
+        if not isinstance(e, SystemExit):
+            message = f"{message}\n{type(e).__name__}: {e}".strip()
+        return input_path, False, timings, message
+
+def print_timing(input_path, ok, timings, message):
+    steps = '  '.join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in timings)
+    total = sum(seconds for _, seconds in timings) * 1000
+    status = 'ok' if ok else 'FAILED'
+    print(f"{status:<6} {input_path}  {steps}  total {total:.1f}ms")
+    if not ok and message:
+        for line in message.splitlines():
+            print(f"         {line}")
+
+def pipeline_cli():
+    parser = argparse.ArgumentParser(description='PNG manipulation tool (pipeline mode)')
+    parser.add_argument('-i', '--input', required=True, help='Input directory, glob or file')
+    parser.add_argument('-o', '--output', required=True, help='Output directory')
+    parser.add_argument('--pipeline', required=True, help='Chain of operations separated by |')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    try:
+        args, _ = parser.parse_known_args()
+    except SystemExit:
+        print_usage()
+        sys.exit(1)
+
+    steps = parse_pipeline(args.pipeline)
+    inputs = expand_inputs(args.input)
+    if not inputs:
+        print(f"Error: No images found for '{args.input}'")
+        sys.exit(1)
+
+    jobs = [(path, os.path.join(args.output, rel), steps) for path, rel in inputs]
+    started = time.perf_counter()
+
+    # run the first file here so a bad option fails once instead of once per file
+    first = run_pipeline_file(jobs[0])
+    print_timing(*first)
+    if not first[1]:
+        sys.exit(1)
+    results = [first]
+
+    rest = jobs[1:]
+    if rest:
+        workers = args.workers or os.cpu_count() or 1
+        if workers == 1:
+            mapped = map(run_pipeline_file, rest)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            mapped = pool.map(run_pipeline_file, rest, chunksize=max(1, len(rest) // (workers * 8)))
+        for result in mapped:
+            print_timing(*result)
+            results.append(result)
+        if workers != 1:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    failed = [r for r in results if not r[1]]
+    busy = sum(seconds for r in results for _, seconds in r[2])
+    print(f"\nProcessed {len(results) - len(failed)}/{len(results)} images in {elapsed:.2f}s "
+          f"({busy:.2f}s of work, {len(results) / elapsed:.1f} images/s)")
+    if failed:
+        sys.exit(1)
+
+def main():
+    if len(sys.argv) == 1:
+        print_usage()
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(description='PNG manipulation tool', add_help=False)
+
+    parser.add_argument('-h', '--help', action='store_true', help='Show this help message')
+    parser.add_argument('-i', '--input', help='Input image file')
+    parser.add_argument('-o', '--output', help='Output image file (not required for info commands)')
+    parser.add_argument('-p', '--process', help='Processing operation to perform')
+    parser.add_argument('--pipeline', help='Chain of operations separated by |')
+
+    args, _ = parser.parse_known_args()
+    if args.help:
+        print_usage()
+        sys.exit(0)
+
+    if args.pipeline:
+        pipeline_cli()
+        return
+
+    parser = build_parser()
+
+    try:
+        args = parser.parse_args()
+    except SystemExit:
+        print_usage()
+        sys.exit(1)
+
+    if not os.path.exists(args.input):
+        print(f"Error: Input file '{args.input}' does not exist")
+        print_usage()
+        sys.exit(1)
+
+    if args.process not in INFO_COMMANDS and not args.output:
+        print("Error: Output file is required for this operation")
+        print_usage()
+        sys.exit(1)
+
+    tools = PNGTools()
+    tools.load_image(args.input)
+
+    run_process(tools, args)
+
+    if args.process not in INFO_COMMANDS and args.output:
         tools.save_image(args.output)
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+# Size targeting PNG compressor.
+# A candidate is the image scaled by some factor and reduced to some palette
+# size. Its encoded size grows with both, so we bisect over palette sizes
+# until one can reach the target somewhere between MIN_SCALE and MAX_SCALE,
+# then narrow the scale down. Every candidate is encoded exactly once and
+# the bytes are kept, the winner is handed back as is instead of encoding
+# it again. Each narrowing round evaluates several scales at once.
+
+MIN_SCALE = 0.1
+MAX_SCALE = 1.0
+# None keeps full colour, it is the top of the ladder
+PALETTE_LADDER = [8, 16, 32, 48, 64, 96, 128, 192, 256, None]
+MAX_ROUNDS = 6
+DEFAULT_WORKERS = 4
+
+
+def encode_png(image):
+    # default zlib level, the same encoding the original size is measured with,
+    # level 9 costs five times as much on full colour candidates for ~2%
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def flatten_rgb(image):
+    """Drops the alpha channel onto a white background"""
+    if image.mode == 'RGBA':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[3])
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def render_candidate(image, scale, palette_size, color_mode='P'):
+    """The image at scale, reduced to palette_size colours (None keeps every colour)"""
+    new_width = max(1, int(image.width * scale))
+    new_height = max(1, int(image.height * scale))
+    resized = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    if color_mode == 'L':
+        return resized.convert('L')
+    if palette_size is None:
+        return resized
+    return flatten_rgb(resized).quantize(colors=palette_size, method=2)
+
+
+class Candidate:
+    __slots__ = ('scale', 'palette_size', 'data')
+
+    def __init__(self, scale, palette_size, data):
+        self.scale = scale
+        self.palette_size = palette_size
+        self.data = data
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    def image(self):
+        return Image.open(io.BytesIO(self.data))
+
+
+class SizeTargetCompressor:
+    def __init__(self, image, target_bytes, color_mode='P', tolerance=0.05, workers=DEFAULT_WORKERS):
+        self.image = image
+        self.target = target_bytes
+        self.color_mode = color_mode
+        self.tolerance = tolerance * target_bytes
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.candidates = {}
+
+    def _encode(self, key):
+        scale, palette_size = key
+        return Candidate(scale, palette_size, encode_png(render_candidate(self.image, scale, palette_size, self.color_mode)))
+
+    def evaluate(self, pool, keys):
+        """Encodes every (scale, palette_size) not seen yet, in parallel"""
+        keys = [(round(scale, 4), palette) for scale, palette in keys]
+        missing = list(dict.fromkeys(k for k in keys if k not in self.candidates))
+        for key, candidate in zip(missing, pool.map(self._encode, missing)):
+            self.candidates[key] = candidate
+        return [self.candidates[k] for k in keys]
+
+    def hit(self, candidate):
+        return abs(candidate.size - self.target) <= self.tolerance
+
+    def best(self):
+        return min(self.candidates.values(), key=lambda c: abs(c.size - self.target))
+
+    def pick_palette(self, pool, palette_size):
+        """
+        Bisects the palette ladder for a palette whose size range over
+        [MIN_SCALE, MAX_SCALE] contains the target. If even the ends of the
+        ladder can't reach it, the last palette tried is the closest one.
+        """
+        if self.color_mode == 'L':
+            return palette_size
+        ladder = PALETTE_LADDER
+        if palette_size not in ladder:
+            ladder = sorted(set(p for p in ladder if p is not None) | {palette_size}) + [None]
+        low, high = 0, len(ladder) - 1
+        index = ladder.index(palette_size)
+        while True:
+            palette = ladder[index]
+            smallest, largest = self.evaluate(pool, [(MIN_SCALE, palette), (MAX_SCALE, palette)])
+            if smallest.size > self.target + self.tolerance:
+                high = index - 1  # too big even when tiny, fewer colours
+            elif largest.size < self.target - self.tolerance:
+                low = index + 1  # too small even at full size, more colours
+            else:
+                return palette
+            if low > high:
+                return palette
+            index = (low + high) // 2
+
+    def search_scale(self, pool, palette):
+        """Narrows [MIN_SCALE, MAX_SCALE] around the target, workers scales per round"""
+        low, high = MIN_SCALE, MAX_SCALE
+        smallest, largest = self.evaluate(pool, [(low, palette), (high, palette)])
+        if self.hit(smallest) or self.hit(largest) or not smallest.size < self.target < largest.size:
+            return
+        for _ in range(MAX_ROUNDS):
+            step = (high - low) / (self.workers + 1)
+            scales = [low + step * (i + 1) for i in range(self.workers)]
+            results = self.evaluate(pool, [(scale, palette) for scale in scales])
+            if any(self.hit(c) for c in results):
+                return
+            # the new bracket is between the last scale below and the first above target
+            for scale, candidate in zip(scales, results):
+                if candidate.size < self.target:
+                    low = scale
+                else:
+                    high = scale
+                    break
+
+    def run(self, palette_size=256):
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            self.search_scale(pool, self.pick_palette(pool, palette_size))
+        return self.best()
@@ -0,0 +1,139 @@
+import colorsys
+import numpy as np
+from PIL import Image
+
+# Vectorized pixel kernels used by PNGTools.
+# Every kernel works on an (height, width, 4) uint8 RGBA array in place, a
+# strip of rows at a time, so the wider temporaries (distances, floats) never
+# hold more than STRIP_PIXELS pixels no matter how big the image is.
+
+MAX_COLOR_DISTANCE = 441.6729559300637  # sqrt(255^2 + 255^2 + 255^2)
+STRIP_PIXELS = 1 << 18
+
+
+def rgba_pixels(image):
+    """RGBA copy of image as a writable array, image itself is never modified"""
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    pixels = np.asarray(image)
+    if not pixels.flags.writeable:
+        pixels = pixels.copy()
+    return pixels
+
+
+def to_image(pixels):
+    """Wraps an RGBA array back into an image without copying it"""
+    return Image.fromarray(pixels, "RGBA")
+
+
+def strips(pixels, strip_pixels=STRIP_PIXELS):
+    """Yields views of consecutive row strips of pixels"""
+    height, width = pixels.shape[:2]
+    rows = max(1, strip_pixels // max(1, width))
+    for top in range(0, height, rows):
+        yield pixels[top:top + rows]
+
+
+def parse_hex(color):
+    return tuple(int(color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def squared_distance_limit(threshold):
+    """
+    Largest squared RGB distance that is still within threshold.
+
+    Squared distances are integers between 0 and 3 * 255^2, so the check is
+    evaluated once for all of them (distance / MAX_COLOR_DISTANCE <= threshold)
+    and every pixel only needs an integer compare afterwards.
+    """
+    squared = np.arange(3 * 255 ** 2 + 1)
+    within = np.sqrt(squared) / MAX_COLOR_DISTANCE <= threshold
+    return int(np.count_nonzero(within)) - 1
+
+
+def color_distance_mask(rgb, target_rgb, limit):
+    """True where the squared distance to target_rgb is at most limit"""
+    squared = np.zeros(rgb.shape[:-1], dtype=np.int32)
+    for channel, target in enumerate(target_rgb):
+        diff = rgb[..., channel].astype(np.int32)
+        diff -= target
+        diff *= diff
+        squared += diff
+    return squared <= limit
+
+
+def make_transparent(pixels, target_rgb, threshold):
+    limit = squared_distance_limit(threshold)
+    for strip in strips(pixels):
+        mask = color_distance_mask(strip[..., :3], target_rgb, limit)
+        strip[..., 3][mask] = 0
+    return pixels
+
+
+def swap_colors(pixels, target_rgb, new_rgb, threshold):
+    new_rgb = np.asarray(new_rgb, dtype=np.uint8)
+    limit = squared_distance_limit(threshold)
+    for strip in strips(pixels):
+        mask = color_distance_mask(strip[..., :3], target_rgb, limit)
+        strip[..., :3][mask] = new_rgb
+    return pixels
+
+
+def change_color_tone(pixels, new_rgb):
+    # Only the value (the brightest channel) of every pixel survives, hue and
+    # saturation come from new_rgb. hsv_to_rgb is linear in v, so the 256
+    # possible values are looked up in a table built with colorsys itself.
+    h, s, _ = colorsys.rgb_to_hsv(*[x/255.0 for x in new_rgb])
+    coefficients = np.array(colorsys.hsv_to_rgb(h, s, 1.0))
+    value = np.arange(256) / 255.0
+    table = (value[:, np.newaxis] * coefficients * 255).astype(np.uint8)
+    for strip in strips(pixels):
+        rgb = strip[..., :3]
+        brightest = np.maximum(np.maximum(rgb[..., 0], rgb[..., 1]), rgb[..., 2])
+        visible = strip[..., 3] != 0
+        for channel in range(3):
+            np.copyto(rgb[..., channel], table[brightest, channel], where=visible)
+    return pixels
+
+
+def scale_opacity(pixels, opacity_level):
+    for strip in strips(pixels):
+        strip[..., 3] = np.clip(strip[..., 3] * opacity_level, 0, 255).astype(np.uint8)
+    return pixels
+
+
+def apply_filter(pixels, filter_type):
+    for strip in strips(pixels):
+        rgb = strip[..., :3]
+        r, g, b = (rgb[..., i].astype(np.float64) for i in range(3))
+        if filter_type == "grayscale":
+            rgb[...] = (0.299 * r + 0.587 * g + 0.114 * b).astype(np.uint8)[..., np.newaxis]
+        elif filter_type == "sepia":
+            rgb[..., 0] = np.minimum(0.393 * r + 0.769 * g + 0.189 * b, 255).astype(np.uint8)
+            rgb[..., 1] = np.minimum(0.349 * r + 0.686 * g + 0.168 * b, 255).astype(np.uint8)
+            rgb[..., 2] = np.minimum(0.272 * r + 0.534 * g + 0.131 * b, 255).astype(np.uint8)
+        elif filter_type == "negative":
+            np.subtract(255, rgb, out=rgb)
+        elif filter_type in ("red", "green", "blue"):
+            keep = ("red", "green", "blue").index(filter_type)
+            for i in range(3):
+                if i != keep:
+                    rgb[..., i] = 0
+    return pixels
+
+
+def add_noise(pixels, count, similarity=None, rng=None):
+    """Recolours count randomly picked pixels, fully random or within similarity of the old colour"""
+    rng = rng or np.random.default_rng()
+    height, width = pixels.shape[:2]
+    flat = pixels.reshape(-1, 4)
+    for start in range(0, count, STRIP_PIXELS):
+        n = min(STRIP_PIXELS, count - start)
+        idx = rng.integers(0, height * width, size=n)
+        if similarity is None:
+            flat[idx, :3] = rng.integers(0, 256, size=(n, 3), dtype=np.uint8)
+            flat[idx, 3] = 255
+        else:
+            jitter = (rng.random((n, 3)) * 2 - 1) * 255 * similarity
+            flat[idx, :3] = np.clip(np.trunc(flat[idx, :3] + jitter), 0, 255).astype(np.uint8)
+    return pixels
@@ -0,0 +1,87 @@
+"""
+Parser benchmark - time LinkParser on generated multi-megabyte Markdown and HTML.
+
+    python benchmarks/bench_parser.py --size 8
+
+The parser is linear in the size of the document, so the throughput should
+stay roughly the same as --size grows.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from brokelink.parser import LinkParser
+
+
+def generate_markdown(size_mb: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    section = 0
+    while total < size_mb * 1024 * 1024:
+        if rng.random() < 0.05:
+            section += 1
+            line = f"## Section {section}"
+        else:
+            line = (
+                f"Some prose with a [link {total}](docs/page{rng.randint(0, 999)}.md#section-{section}), "
+                f"an image ![diagram](img/d{rng.randint(0, 99)}.png) and a "
+                f"[![badge](badges/b{rng.randint(0, 9)}.svg)](https://example.com/{total})."
+            )
+        parts.append(line)
+        total += len(line) + 1
+    return '\n'.join(parts)
+
+
+def generate_html(size_mb: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = ['<html><body>']
+    total = 0
+    section = 0
+    while total < size_mb * 1024 * 1024:
+        if rng.random() < 0.05:
+            section += 1
+            line = f'<h2 id="section-{section}">Section {section}</h2>'
+        else:
+            line = (
+                f'<p>Some prose with a <a href="docs/page{rng.randint(0, 999)}.html#section-{section}">'
+                f'link <b>{total}</b></a> and an image '
+                f'<img src="img/d{rng.randint(0, 99)}.png" alt="diagram">.</p>'
+            )
+        parts.append(line)
+        total += len(line) + 1
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def bench(label: str, content: str, suffix: str, repeat: int):
+    parser = LinkParser()
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        links, headings = parser.parse_document(content, suffix, with_headings=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    size_mb = len(content.encode('utf-8')) / (1024 * 1024)
+    print(f"{label:<9} {size_mb:6.1f} MB  {len(links):>8} links  {len(headings):>6} headings  "
+          f"{best:7.3f}s  {size_mb / best:7.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=float, default=8, help='Size of each generated file in MB')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per file, the best one is reported')
+    args = parser.parse_args()
+
+    bench('markdown', generate_markdown(args.size), '.md', args.repeat)
+    bench('html', generate_html(args.size), '.html', args.repeat)
+
+
+if __name__ == '__main__':
+    main()
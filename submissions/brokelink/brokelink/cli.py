@@ -9,8 +9,9 @@ from pathlib import Path
 import click
 from colorama import init, Fore, Style
 
-from .parser import LinkParser
 from .utils import LinkChecker, BrokenLinkReport
+from .scanner import scan_files
+from .incremental import IncrementalScanner, DEFAULT_CACHE_FILE
 
  
 init(autoreset=True)
@@ -31,7 +32,14 @@ init(autoreset=True)
               help='Only show errors')
 @click.option('--format', '-f', type=click.Choice(['text', 'json']), default='text',
               help='Output format')
-def main(path, include, exclude, check_images, check_anchors, verbose, quiet, format):
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=None,
+              help='Worker processes for parsing (default: number of CPUs)')
+@click.option('--incremental', is_flag=True,
+              help='Only recheck files that changed since the last run, and files linking to them')
+@click.option('--cache-file', type=click.Path(dir_okay=False),
+              help=f'Cache used by --incremental (default: PATH/{DEFAULT_CACHE_FILE})')
+def main(path, include, exclude, check_images, check_anchors, verbose, quiet, format, jobs,
+         incremental, cache_file):
     """
     🔗 BrokeLink - Scan for broken links in Markdown and HTML files.
     
@@ -42,7 +50,6 @@ def main(path, include, exclude, check_images, check_anchors, verbose, quiet, fo
         click.echo(f"{Fore.CYAN}🔗 BrokeLink v1.0.0 - Scanning for broken links...{Style.RESET_ALL}")
     
     # Initialize components
-    parser = LinkParser()
     checker = LinkChecker(verbose=verbose)
     
     # Find files to scan
@@ -59,22 +66,32 @@ def main(path, include, exclude, check_images, check_anchors, verbose, quiet, fo
     total_broken = 0
     reports = []
     
-    for file_path in files_to_scan:
+    # Results come back in files_to_scan order whatever the number of workers
+    if incremental:
+        if cache_file is None:
+            root = Path(path) if Path(path).is_dir() else Path(path).parent
+            cache_file = str(root / DEFAULT_CACHE_FILE)
+        incremental_scanner = IncrementalScanner(cache_file, check_images, check_anchors, jobs, checker)
+        scans = incremental_scanner.scan(files_to_scan)
+    else:
+        scans = scan_files(files_to_scan, check_images, check_anchors, jobs, checker)
+    for file_path, broken_links, error in scans:
         if verbose:
             click.echo(f"{Fore.BLUE}🔍 Scanning: {file_path}{Style.RESET_ALL}")
         
-        try:
-            links = parser.extract_links(file_path)
-            broken_links = checker.check_links(links, file_path, check_images, check_anchors)
-            
-            if broken_links.has_issues():
-                report = BrokenLinkReport(file_path, broken_links)
-                reports.append(report)
-                total_broken += broken_links.total_count()
-                
-        except Exception as e:
+        if error is not None:
             if not quiet:
-                click.echo(f"{Fore.RED}❌ Error scanning {file_path}: {e}{Style.RESET_ALL}")
+                click.echo(f"{Fore.RED}❌ Error scanning {file_path}: {error}{Style.RESET_ALL}")
+            continue
+            
+        if broken_links.has_issues():
+            report = BrokenLinkReport(file_path, broken_links)
+            reports.append(report)
+            total_broken += broken_links.total_count()
+    
+    if incremental and verbose:
+        click.echo(f"{Fore.BLUE}♻️  Parsed {incremental_scanner.parsed} and rechecked "
+                   f"{incremental_scanner.rechecked} of {len(files_to_scan)} files{Style.RESET_ALL}")
     
     # Output results
     if format == 'json':
@@ -0,0 +1,206 @@
+"""
+Incremental scanning - Only recheck what changed since the last run.
+"""
+
+import json
+import os
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .parser import Link
+from .scanner import FileScan, check_scan, parse_files
+from .utils import BrokenLinks, LinkChecker
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = ".brokelink-cache.json"
+CATEGORIES = ("missing_files", "missing_images", "invalid_anchors")
+
+
+class ScanCache:
+    """
+    Links, headings and results of every file from the previous run.
+
+    Entries are keyed by resolved path and hold the mtime and size the file
+    had when it was parsed, so an unchanged file is never read again. The
+    existence of every link target is kept too, which is how a deleted or
+    newly added image is noticed without parsing anything.
+    """
+
+    def __init__(self, path: str, options: Dict):
+        self.path = path
+        self.options = options
+        self.files: Dict[str, Dict] = {}
+        self.targets: Dict[str, bool] = {}
+
+    @classmethod
+    def load(cls, path: str, options: Dict) -> "ScanCache":
+        """Load the cache at path, or start empty if it is missing, unreadable or was written with other options."""
+        cache = cls(path, options)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cache
+
+        if data.get("version") == CACHE_VERSION and data.get("options") == options:
+            cache.files = data.get("files", {})
+            cache.targets = data.get("targets", {})
+        return cache
+
+    def save(self):
+        """Write the cache next to its final location first, so a crash never leaves half of it behind."""
+        data = {
+            "version": CACHE_VERSION,
+            "options": self.options,
+            "files": self.files,
+            "targets": self.targets,
+        }
+        partial = f"{self.path}.{os.getpid()}.tmp"
+        # dumps runs the C encoder, dump() would encode chunk by chunk in Python
+        with open(partial, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data, separators=(",", ":")))
+        os.replace(partial, self.path)
+
+    def reverse_dependencies(self) -> Dict[str, Set[str]]:
+        """Map every link target to the files that link to it."""
+        dependents = defaultdict(set)
+        for key, entry in self.files.items():
+            for target in entry["targets"]:
+                if target is not None:
+                    dependents[target].add(key)
+        return dependents
+
+
+def _stat(file_path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _to_scan(file_path: str, key: str, entry: Dict) -> FileScan:
+    return FileScan(
+        file_path,
+        key,
+        [Link(*link) for link in entry["links"]],
+        entry["targets"],
+        entry["headings"],
+        entry["error"],
+    )
+
+
+def _broken_from_entry(entry: Dict) -> BrokenLinks:
+    # only the broken links are turned back into Link objects
+    broken = BrokenLinks()
+    for category in CATEGORIES:
+        getattr(broken, category).extend(Link(*entry["links"][i]) for i in entry["broken"][category])
+    return broken
+
+
+def _broken_to_entry(scan: FileScan, broken: BrokenLinks) -> Dict[str, List[int]]:
+    position = {id(link): i for i, link in enumerate(scan.links)}
+    return {
+        category: [position[id(link)] for link in getattr(broken, category)]
+        for category in CATEGORIES
+    }
+
+
+class IncrementalScanner:
+    """
+    Scan files like scan_files, but only recheck what changed.
+
+    A file is parsed again when its mtime or size changed. It is checked
+    again when it was parsed again, or when one of its targets changed,
+    appeared or disappeared (found through the reverse dependency graph).
+    Every other file reports its cached result.
+    """
+
+    def __init__(
+        self,
+        cache_path: str,
+        check_images: bool = True,
+        check_anchors: bool = False,
+        jobs: Optional[int] = None,
+        checker: Optional[LinkChecker] = None,
+    ):
+        self.check_images = check_images
+        self.check_anchors = check_anchors
+        self.jobs = jobs
+        self.checker = checker or LinkChecker()
+        self.cache = ScanCache.load(
+            cache_path, {"check_images": check_images, "check_anchors": check_anchors}
+        )
+        self.parsed = 0
+        self.rechecked = 0
+
+    def scan(self, files: List[str]) -> Iterator[Tuple[str, BrokenLinks, Optional[str]]]:
+        """Yields (file_path, broken_links, error) in the order of `files`."""
+        cache = self.cache
+        checker = self.checker
+        keys = [os.path.realpath(file_path) for file_path in files]
+        stats = [_stat(file_path) for file_path in files]
+
+        # Parse new and modified files (and files that failed last time)
+        changed = [
+            i for i, (key, stat) in enumerate(zip(keys, stats))
+            if key not in cache.files or cache.files[key]["stat"] != list(stat or ())
+            or cache.files[key]["error"] is not None
+        ]
+        scans: Dict[str, FileScan] = {}
+        for i, scan in zip(changed, parse_files([files[i] for i in changed], self.check_anchors, self.jobs)):
+            scans[keys[i]] = scan._replace(resolved_path=keys[i])
+            cache.files[keys[i]] = {
+                "stat": list(stats[i] or ()),
+                "links": [list(link) for link in scan.links],
+                "targets": scan.targets,
+                "headings": scan.headings,
+                "error": scan.error,
+                "broken": None,
+            }
+        self.parsed = len(changed)
+
+        # Files that are gone are targets that changed too
+        current = set(keys)
+        removed = [key for key in cache.files if key not in current]
+        for key in removed:
+            del cache.files[key]
+
+        changed_targets = {keys[i] for i in changed} | set(removed)
+        flipped = False
+        for target, existed in cache.targets.items():
+            if checker.path_exists(target) != existed:
+                changed_targets.add(target)
+                flipped = True
+
+        dependents = cache.reverse_dependencies()
+        recheck = {keys[i] for i in changed}
+        for target in changed_targets:
+            recheck.update(dependents.get(target, ()))
+        self.rechecked = len(recheck)
+
+        if self.check_anchors:
+            for file_path, key in zip(files, keys):
+                headings = cache.files[key]["headings"]
+                if headings is not None:
+                    checker.seed_headings(file_path, headings)
+                    checker.seed_headings(key, headings)
+
+        for file_path, key in zip(files, keys):
+            entry = cache.files[key]
+            if entry["error"] is not None:
+                yield file_path, BrokenLinks(), entry["error"]
+                continue
+
+            if key in recheck or entry["broken"] is None:
+                scan = scans.get(key) or _to_scan(file_path, key, entry)
+                broken = check_scan(scan, checker, self.check_images, self.check_anchors)
+                entry["broken"] = _broken_to_entry(scan, broken)
+            else:
+                broken = _broken_from_entry(entry)
+            yield file_path, broken, None
+
+        # Nothing to write when nothing changed, the common case in a hook
+        if changed or removed or flipped or len(dependents) != len(cache.targets):
+            cache.targets = {target: checker.path_exists(target) for target in dependents}
+            cache.save()
@@ -4,9 +4,10 @@ Link Parser - Extract links from Markdown and HTML files.
 
 import re
 import os
+from bisect import bisect_right
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import List, Dict, NamedTuple
-from bs4 import BeautifulSoup
+from typing import List, Dict, NamedTuple, Optional, Tuple
 
 class Link(NamedTuple):
     """Represents a link found in a document."""
@@ -15,13 +16,82 @@ class Link(NamedTuple):
     line_number: int
     link_type: str  # 'markdown_link', 'markdown_image', 'html_link', 'html_image'
 
+class LineIndex:
+    """Offsets of every newline in a text, to turn match offsets into line numbers."""
+    
+    def __init__(self, content: str):
+        self.newlines = [match.start() for match in re.finditer('\n', content)]
+    
+    def line_number(self, offset: int) -> int:
+        """1-based line of the character at offset."""
+        return bisect_right(self.newlines, offset - 1) + 1
+
+class _HTMLScanner(HTMLParser):
+    """Single pass over HTML collecting links, images and heading ids as the tags stream by."""
+    
+    HEADINGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[Optional[Link]] = []
+        self.headings: List[str] = []
+        # <a> tags still open: (slot in links, href, line, collected text),
+        # the slot is taken at the start tag to keep document order
+        self._open_links: List[Tuple[int, str, int, List[str]]] = []
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        line = self.getpos()[0]
+        if tag == 'a' and attrs.get('href') is not None:
+            self._open_links.append((len(self.links), attrs['href'], line, []))
+            self.links.append(None)
+        elif tag == 'img' and attrs.get('src') is not None:
+            self.links.append(Link(
+                text=attrs.get('alt') or '',
+                url=attrs['src'],
+                line_number=line,
+                link_type='html_image'
+            ))
+        if tag in self.HEADINGS and attrs.get('id'):
+            self.headings.append(f"#{attrs['id']}")
+    
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == 'a':
+            self.handle_endtag(tag)
+    
+    def handle_data(self, data):
+        for _, _, _, text in self._open_links:
+            text.append(data)
+    
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._open_links:
+            self._close_link()
+    
+    def _close_link(self):
+        slot, href, line, text = self._open_links.pop()
+        self.links[slot] = Link(
+            text=''.join(text),
+            url=href,
+            line_number=line,
+            link_type='html_link'
+        )
+    
+    def close(self):
+        super().close()
+        # unclosed <a> tags run to the end of the document
+        while self._open_links:
+            self._close_link()
+
 class LinkParser:
     """Parse and extract links from Markdown and HTML files."""
     
     def __init__(self):
-        # Markdown patterns
-        self.md_link_pattern = re.compile(r'\[([^\]]*)\]\(([^)]+)\)', re.MULTILINE)
-        self.md_image_pattern = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)', re.MULTILINE)
+        # Markdown pattern, links and images in one scan. The optional "!"
+        # marks an image and the text can't contain "[", so the image inside
+        # a badge like [![alt](img)](url) is found once, as an image
+        self.md_link_pattern = re.compile(r'(!?)\[([^\[\]]*)\]\(([^)]+)\)')
+        self.md_heading_pattern = re.compile(r'^#+\s+(.+)$', re.MULTILINE)
         
     def extract_links(self, file_path: str) -> List[Link]:
         """Extract all links from a file."""
@@ -33,83 +103,63 @@ class LinkParser:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
         
-        if file_path.suffix.lower() == '.md':
-            return self._parse_markdown(content)
-        elif file_path.suffix.lower() in ['.html', '.htm']:
-            return self._parse_html(content)
-        else:
-            # Try to parse as markdown by default
-            return self._parse_markdown(content)
+        return self.parse_content(content, file_path.suffix)
+    
+    def parse_content(self, content: str, suffix: str) -> List[Link]:
+        """Extract all links from already loaded content of a file with the given suffix."""
+        return self.parse_document(content, suffix)[0]
+    
+    def parse_document(self, content: str, suffix: str,
+                       with_headings: bool = False) -> Tuple[List[Link], Optional[List[str]]]:
+        """Extract links and, if asked for, heading anchors in a single pass over content."""
+        if suffix.lower() in ['.html', '.htm']:
+            return self._parse_html(content, with_headings)
+        
+        # Markdown, also the default for any other file type
+        links = self._parse_markdown(content)
+        if with_headings and suffix.lower() == '.md':
+            return links, self._markdown_headings(content)
+        return links, [] if with_headings else None
     
     def _parse_markdown(self, content: str) -> List[Link]:
         """Parse links from Markdown content."""
         links = []
-        lines = content.split('\n')
+        index = None
         
-        # Find regular links
         for match in self.md_link_pattern.finditer(content):
-            line_num = content[:match.start()].count('\n') + 1
-            links.append(Link(
-                text=match.group(1),
-                url=match.group(2),
-                line_number=line_num,
-                link_type='markdown_link'
-            ))
-        
-        # Find image links
-        for match in self.md_image_pattern.finditer(content):
-            line_num = content[:match.start()].count('\n') + 1
+            if index is None:
+                index = LineIndex(content)
             links.append(Link(
-                text=match.group(1),
-                url=match.group(2),
-                line_number=line_num,
-                link_type='markdown_image'
+                text=match.group(2),
+                url=match.group(3),
+                line_number=index.line_number(match.start()),
+                link_type='markdown_image' if match.group(1) else 'markdown_link'
             ))
         
         return links
     
-    def _parse_html(self, content: str) -> List[Link]:
-        """Parse links from HTML content."""
-        links = []
+    def _parse_html(self, content: str, with_headings: bool = False) -> Tuple[List[Link], Optional[List[str]]]:
+        """Parse links (and heading ids) from HTML content."""
+        scanner = _HTMLScanner()
         
         try:
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Find <a> tags
-            for tag in soup.find_all('a', href=True):
-                line_num = self._get_line_number(content, str(tag))
-                links.append(Link(
-                    text=tag.get_text(),
-                    url=tag['href'],
-                    line_number=line_num,
-                    link_type='html_link'
-                ))
-            
-            # Find <img> tags
-            for tag in soup.find_all('img', src=True):
-                line_num = self._get_line_number(content, str(tag))
-                links.append(Link(
-                    text=tag.get('alt', ''),
-                    url=tag['src'],
-                    line_number=line_num,
-                    link_type='html_image'
-                ))
-                
-        except Exception as e:
-            # If HTML parsing fails, return empty list
+            scanner.feed(content)
+            scanner.close()
+        except Exception:
+            # If HTML parsing fails, keep what was found up to that point
             pass
         
-        return links
+        links = [link for link in scanner.links if link is not None]
+        return links, scanner.headings if with_headings else None
     
-    def _get_line_number(self, content: str, tag_str: str) -> int:
-        """Get approximate line number for an HTML tag."""
-        try:
-            index = content.find(tag_str)
-            if index != -1:
-                return content[:index].count('\n') + 1
-        except:
-            pass
-        return 1
+    def _markdown_headings(self, content: str) -> List[str]:
+        headings = []
+        for match in self.md_heading_pattern.finditer(content):
+            heading = match.group(1).strip()
+            # Convert to anchor format (simplified)
+            anchor = heading.lower().replace(' ', '-').replace('.', '').replace(',', '')
+            headings.append(f"#{anchor}")
+        return headings
     
     def extract_headings(self, file_path: str) -> List[str]:
         """Extract heading anchors from a file (for anchor checking)."""
@@ -121,24 +171,12 @@ class LinkParser:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
         
-        headings = []
-        
-        if file_path.suffix.lower() == '.md':
-            # Markdown headings
-            heading_pattern = re.compile(r'^#+\s+(.+)$', re.MULTILINE)
-            for match in heading_pattern.finditer(content):
-                heading = match.group(1).strip()
-                # Convert to anchor format (simplified)
-                anchor = heading.lower().replace(' ', '-').replace('.', '').replace(',', '')
-                headings.append(f"#{anchor}")
-        
-        elif file_path.suffix.lower() in ['.html', '.htm']:
-            try:
-                soup = BeautifulSoup(content, 'html.parser')
-                for tag in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                    if tag.get('id'):
-                        headings.append(f"#{tag['id']}")
-            except:
-                pass
-        
-        return headings
\ No newline at end of file
+        return self.headings_from_content(content, file_path.suffix)
+    
+    def headings_from_content(self, content: str, suffix: str) -> List[str]:
+        """Extract heading anchors from already loaded content of a file with the given suffix."""
+        if suffix.lower() == '.md':
+            return self._markdown_headings(content)
+        elif suffix.lower() in ['.html', '.htm']:
+            return self._parse_html(content, with_headings=True)[1]
+        return []
@@ -0,0 +1,123 @@
+"""
+Scanner - Parse files on a process pool and check them against shared caches.
+"""
+
+import os
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from .parser import Link, LinkParser
+from .utils import BrokenLinks, LinkChecker
+
+# Below this many files starting the workers costs more than it saves
+MIN_PARALLEL_FILES = 64
+# Chunks per worker, small enough to keep the pool evenly busy
+CHUNKS_PER_JOB = 8
+
+
+class FileScan(NamedTuple):
+    """Everything a worker extracted from one file."""
+    file_path: str
+    resolved_path: str
+    links: List[Link]
+    targets: List[Optional[str]]
+    headings: Optional[List[str]]
+    error: Optional[str]
+
+
+# Parser and checker of a worker process, reused across its chunks so the
+# resolve cache keeps growing instead of starting over for every file
+_worker: Optional[Tuple[LinkParser, LinkChecker]] = None
+
+
+def _init_worker():
+    global _worker
+    _worker = (LinkParser(), LinkChecker())
+
+
+def scan_file(file_path: str, check_anchors: bool,
+              parser: LinkParser, checker: LinkChecker) -> FileScan:
+    """Read a file once and extract its links, their resolved targets and (if needed) its headings."""
+    try:
+        path = Path(file_path)
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        links, headings = parser.parse_document(content, path.suffix, with_headings=check_anchors)
+        targets = checker.resolve_targets(links, file_path)
+        return FileScan(file_path, str(path.resolve()), links, targets, headings, None)
+    except Exception as e:
+        return FileScan(file_path, file_path, [], [], None, str(e))
+
+
+def _scan_chunk(files: List[str], check_anchors: bool) -> List[FileScan]:
+    return [scan_file(file_path, check_anchors, *_worker) for file_path in files]
+
+
+def _chunks(files: List[str], jobs: int) -> List[List[str]]:
+    size = max(1, len(files) // (jobs * CHUNKS_PER_JOB))
+    return [files[i:i + size] for i in range(0, len(files), size)]
+
+
+def parse_files(files: List[str], check_anchors: bool = False,
+                jobs: Optional[int] = None) -> List[FileScan]:
+    """Parse files on `jobs` processes (default: one per CPU), results in the order of `files`."""
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1 or len(files) < MIN_PARALLEL_FILES:
+        parser, checker = LinkParser(), LinkChecker()
+        return [scan_file(file_path, check_anchors, parser, checker) for file_path in files]
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        return [
+            scan
+            for chunk in pool.map(partial(_scan_chunk, check_anchors=check_anchors), _chunks(files, jobs))
+            for scan in chunk
+        ]
+
+
+def seed_headings(checker: LinkChecker, scans: List[FileScan]):
+    """Make the headings of every scanned file known before the first anchor check."""
+    for scan in scans:
+        if scan.headings is not None:
+            checker.seed_headings(scan.file_path, scan.headings)
+            checker.seed_headings(scan.resolved_path, scan.headings)
+
+
+def check_scan(scan: FileScan, checker: LinkChecker, check_images: bool = True,
+               check_anchors: bool = False) -> BrokenLinks:
+    return checker.check_links(scan.links, scan.file_path, check_images,
+                               check_anchors, targets=scan.targets)
+
+
+def scan_files(
+    files: List[str],
+    check_images: bool = True,
+    check_anchors: bool = False,
+    jobs: Optional[int] = None,
+    checker: Optional[LinkChecker] = None,
+) -> Iterator[Tuple[str, BrokenLinks, Optional[str]]]:
+    """
+    Scan files for broken links.
+
+    Parsing is fanned out over `jobs` processes (default: one per CPU). The
+    existence checks then run in this process against one LinkChecker, so
+    every target is stat'ed once no matter how many files link to it, and
+    the headings the workers extracted are shared by every anchor check.
+
+    Yields (file_path, broken_links, error) in the order of `files`, so the
+    output does not depend on which worker finished first.
+    """
+    checker = checker or LinkChecker()
+    scans = parse_files(files, check_anchors, jobs)
+
+    if check_anchors:
+        seed_headings(checker, scans)
+
+    for scan in scans:
+        if scan.error is not None:
+            yield scan.file_path, BrokenLinks(), scan.error
+            continue
+        yield scan.file_path, check_scan(scan, checker, check_images, check_anchors), None
@@ -5,7 +5,7 @@ Utilities for link checking and reporting.
 import os
 import urllib.parse
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 from colorama import Fore, Style
 
@@ -38,21 +38,80 @@ class LinkChecker:
 
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
-        self._file_cache: Set[str] = set()
+        # Shared by every file checked with this checker, so each target is
+        # resolved, stat'ed and parsed for headings only once per run
+        self._file_cache: Dict[str, bool] = {}
+        self._resolve_cache: Dict[Tuple[str, str], str] = {}
+        self._realpath_cache: Dict[str, str] = {}
+        self._url_cache: Dict[str, Tuple[str, str]] = {}
         self._anchor_cache: Dict[str, List[str]] = {}
 
+    def resolve_targets(self, links: List[Link], base_file: str) -> List[Optional[str]]:
+        """Resolve the local file every link points to (None for external URLs, same-file anchors and empty paths)."""
+        base_dir = str(Path(base_file).parent)
+        targets = []
+
+        for link in links:
+            if self._is_external_url(link.url) or link.url.startswith("#"):
+                targets.append(None)
+                continue
+
+            # Parse URL and remove anchor
+            file_path, _ = self._split_url(link.url)
+            if not file_path:
+                targets.append(None)
+                continue
+
+            targets.append(self._resolve(base_dir, file_path))
+
+        return targets
+
+    def _split_url(self, url: str) -> Tuple[str, str]:
+        """Path and fragment of a URL."""
+        if url not in self._url_cache:
+            parsed = urllib.parse.urlparse(url)
+            self._url_cache[url] = (parsed.path, parsed.fragment)
+        return self._url_cache[url]
+
+    def _resolve(self, base_dir: str, file_path: str) -> str:
+        """Resolve a relative path, following the symlinks of each directory only once."""
+        key = (base_dir, file_path)
+        if key in self._resolve_cache:
+            return self._resolve_cache[key]
+
+        directory, name = os.path.split(file_path)
+        if name in ("", ".", ".."):
+            directory, name = file_path, ""
+
+        # symlinks are followed before ".." is applied, like Path.resolve(),
+        # and every link into the same directory shares one realpath
+        target_dir = self._realpath(os.path.join(base_dir, directory))
+        self._resolve_cache[key] = os.path.join(target_dir, name) if name else target_dir
+        return self._resolve_cache[key]
+
+    def _realpath(self, path: str) -> str:
+        if path not in self._realpath_cache:
+            self._realpath_cache[path] = os.path.realpath(path)
+        return self._realpath_cache[path]
+
+    def seed_headings(self, file_path: str, headings: List[str]):
+        """Store headings that were already extracted elsewhere (e.g. by a worker process)."""
+        self._anchor_cache[file_path] = headings
+
     def check_links(
         self,
         links: List[Link],
         base_file: str,
         check_images: bool = True,
         check_anchors: bool = False,
+        targets: Optional[List[Optional[str]]] = None,
     ) -> BrokenLinks:
         """Check a list of links for broken references."""
         broken = BrokenLinks()
-        base_dir = Path(base_file).parent
+        if targets is None:
+            targets = self.resolve_targets(links, base_file)
 
-        for link in links:
+        for link, target_path in zip(links, targets):
             if self._is_external_url(link.url):
                 # Skip external URLs (would require network requests)
                 continue
@@ -64,19 +123,11 @@ class LinkChecker:
                         broken.invalid_anchors.append(link)
                 continue
 
-            # Parse URL and remove anchor
-            parsed = urllib.parse.urlparse(link.url)
-            file_path = parsed.path
-            anchor = parsed.fragment
-
-            if not file_path:
+            if target_path is None:
                 continue
 
-            # Resolve relative path
-            target_path = (base_dir / file_path).resolve()
-
             # Check if file exists
-            if not target_path.exists():
+            if not self.path_exists(target_path):
                 if link.link_type in ["markdown_image", "html_image"]:
                     if check_images:
                         broken.missing_images.append(link)
@@ -85,12 +136,19 @@ class LinkChecker:
                 continue
 
             # Check anchor if present
+            _, anchor = self._split_url(link.url)
             if anchor and check_anchors:
-                if not self._check_anchor(str(target_path), f"#{anchor}"):
+                if not self._check_anchor(target_path, f"#{anchor}"):
                     broken.invalid_anchors.append(link)
 
         return broken
 
+    def path_exists(self, path: str) -> bool:
+        """Check if a resolved path exists, remembering the answer."""
+        if path not in self._file_cache:
+            self._file_cache[path] = os.path.exists(path)
+        return self._file_cache[path]
+
     def _is_external_url(self, url: str) -> bool:
         """Check if URL is external (http/https/ftp/etc)."""
         return url.startswith(("http://", "https://", "ftp://", "mailto:"))
@@ -0,0 +1,77 @@
+import struct
+import numpy as np
+
+# Shared LSB engine for images and audio.
+# A "carrier" is one byte whose lowest bit holds one bit of data: an R, G or B
+# channel of a pixel, or the lowest byte of a little endian PCM sample (which
+# is where the lowest bit of a 8, 16, 24 or 32 bit sample lives). The data is
+# a 32 bit big endian count of message bits followed by the message, most
+# significant bit first, same as the original per pixel loops wrote it.
+
+HEADER_BITS = 32
+# frames per block when streaming WAV files
+AUDIO_BLOCK = 1 << 16
+
+
+def xorBytes(data, key):
+    # repeat the key over the whole payload and xor in one go
+    data = np.frombuffer(data, dtype=np.uint8)
+    key = np.frombuffer(key, dtype=np.uint8)
+    if len(data) == 0 or len(key) == 0:
+        return data.tobytes()
+    return (data ^ np.resize(key, len(data))).tobytes()
+
+
+def toBits(payload):
+    # header + payload as an array of 0/1
+    header = struct.pack(">I", len(payload) * 8)
+    return np.unpackbits(np.frombuffer(header + payload, dtype=np.uint8))
+
+
+def headerLength(bits):
+    # number of message bits announced by the first HEADER_BITS carriers
+    return int.from_bytes(np.packbits(bits[:HEADER_BITS]).tobytes(), "big")
+
+
+def fromBits(bits):
+    return np.packbits(bits).tobytes().decode('utf-8', errors='replace')
+
+
+def embedBits(carriers, bits):
+    """
+    Write bits into the lowest bit of the first len(bits) carriers, in place.
+
+    A carrier whose bit is wrong goes up by one (down from 255), so nothing
+    changes by more than ±1 and a multi byte audio sample never carries into
+    its higher bytes.
+    """
+    target = carriers[:len(bits)]
+    flip = (target & 1) ^ bits
+    top = target == 255
+    target += flip
+    target[top & (flip == 1)] = 254
+    return carriers
+
+
+def readBits(carriers):
+    return carriers & 1
+
+
+def sampleCarriers(frames, sample_width):
+    # lowest byte of every sample in a block of little endian PCM frames
+    return np.frombuffer(frames, dtype=np.uint8)[::sample_width]
+
+
+def pixelCarriers(pixels, count):
+    """
+    R, G, B bytes of the first pixels of an (height, width, 4) array, enough
+    for count carriers. Returns the carriers and a function writing them back.
+    """
+    flat = pixels.reshape(-1, 4)
+    used = min(len(flat), -(-count // 3))
+    carriers = flat[:used, :3].reshape(-1)
+
+    def writeBack():
+        flat[:used, :3] = carriers.reshape(used, 3)
+
+    return carriers, writeBack
@@ -5,19 +5,18 @@ from PIL import Image
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.panel import Panel
+import numpy as np
 import wave
-import struct
 import os
 import tempfile
+from engine import (AUDIO_BLOCK, HEADER_BITS, embedBits, fromBits, headerLength,
+                    pixelCarriers, readBits, sampleCarriers, toBits, xorBytes)
 
 console = Console()
 
 
 def encrypt(text, password):
-    data = text.encode('utf-8')
-    key = password.encode('utf-8')
-    encrypted = bytes([data[i] ^ key[i % len(key)] for i in range(len(data))])
-    return encrypted.hex()
+    return xorBytes(text.encode('utf-8'), password.encode('utf-8')).hex()
 
 def decrypt(encrypted_hex, password):
     try:
@@ -25,8 +24,7 @@ def decrypt(encrypted_hex, password):
     except ValueError:
         console.print("[red]Error: The encrypted data is not valid hex.[/red]")
         return None
-    key = password.encode('utf-8')
-    decrypted_bytes = bytes([encrypted[i] ^ key[i % len(key)] for i in range(len(encrypted))])
+    decrypted_bytes = xorBytes(encrypted, password.encode('utf-8'))
     try:
         return decrypted_bytes.decode('utf-8')
     except UnicodeDecodeError:
@@ -34,38 +32,6 @@ def decrypt(encrypted_hex, password):
         return None
 
 
-def toBinary(text):
-    bits = []
-    for byte in text.encode('utf-8'):
-        bits.extend(list(f"{byte:08b}"))
-    return bits
-
-def toPlain(bits):
-    bytes_list = []
-    for i in range(0, len(bits), 8):
-        byte_str = ''.join(bits[i:i+8])
-        bytes_list.append(int(byte_str, 2))
-    return bytes(bytes_list).decode('utf-8', errors='replace')
-
-
-def embedBit(channel, bit):
-    # Check if the least significant bit of the channel is the same as the bit to be embed
-    # change by max of +- 1 otherwise difference is noticeable
-    
-    current_bit = channel & 1
-    if current_bit == bit:
-    
-        return channel
-    else:
- 
-        if channel == 255:
-            return channel - 1  
-        elif channel == 0:
-            return channel + 1  
-        else:
-            return channel + 1
-
-
 def encodeImg(image_path, message, output_path):
     try:
         img = Image.open(image_path)
@@ -75,44 +41,20 @@ def encodeImg(image_path, message, output_path):
 
 
     img = img.convert('RGBA') # RGBA For transparent and bg removed
-    pixels = list(img.getdata())
+    pixels = np.array(img)
 
-  
-    message_bits = toBinary(message)
-    message_length = len(message_bits)
-    length_bin = f"{message_length:032b}"
-    data_bits = list(length_bin) + message_bits
+    data_bits = toBits(message.encode('utf-8'))
 
-    max_capacity = len(pixels) * 3  # max 3 bits pp
+    max_capacity = pixels.shape[0] * pixels.shape[1] * 3  # max 3 bits pp
     if len(data_bits) > max_capacity:
         console.print("[red]Error: The image is too small for the message.[/red]")
         return
 
-    new_pixels = []
-    data_index = 0
-
-    for pixel in pixels:
-        r, g, b, a = pixel
-
-
-        if data_index < len(data_bits):
-            bit = int(data_bits[data_index])
-            r = embedBit(r, bit)
-            data_index += 1
-
-        if data_index < len(data_bits):
-            bit = int(data_bits[data_index])
-            g = embedBit(g, bit)
-            data_index += 1
-
-        if data_index < len(data_bits):
-            bit = int(data_bits[data_index])
-            b = embedBit(b, bit)
-            data_index += 1
-
-        new_pixels.append((r, g, b, a))
-
-    img.putdata(new_pixels)
+    # only the pixels holding the message are touched
+    carriers, writeBack = pixelCarriers(pixels, len(data_bits))
+    embedBits(carriers, data_bits)
+    writeBack()
+    img = Image.fromarray(pixels, 'RGBA')
 
     try:
         img.save(output_path)
@@ -131,31 +73,23 @@ def decodeImg(image_path):
         return None
 
     img = img.convert('RGBA')
-    pixels = list(img.getdata())
-
-    bits = []
-    for pixel in pixels:
-        r, g, b, a = pixel
-    # encode for transparent 
-        bits.append(str(r & 1))
-        bits.append(str(g & 1))
-        bits.append(str(b & 1))
-
- 
-    length_bits = bits[:32]
-    message_length = int(''.join(length_bits), 2)
-
-    
-    start = 32
-    end = 32 + message_length
-    if end > len(bits):
+    pixels = np.asarray(img)
+    max_capacity = pixels.shape[0] * pixels.shape[1] * 3
+
+    # read the length first, then only as many pixels as the message needs
+    carriers, _ = pixelCarriers(pixels, HEADER_BITS)
+    message_length = headerLength(readBits(carriers))
+
+    end = HEADER_BITS + message_length
+    if end > max_capacity:
         console.print("[red]Error: Not enough data to decode the full message.[/red]")
         return None
 
-    message_bits = bits[start:end]
+    carriers, _ = pixelCarriers(pixels, end)
+    message_bits = readBits(carriers[HEADER_BITS:end])
 
     try:
-        message = toPlain(message_bits)
+        message = fromBits(message_bits)
     except Exception as e:
         console.print(f"[red]Error decoding message: {e}[/red]")
         return None
@@ -164,154 +98,125 @@ def decodeImg(image_path):
 
 def encodeAudio(location, message, output_path):
 # wave does not support RF64 because it is not standard and usually files in this are bigger than 4gb so i  use a temp file to convert it into wav 
+    temp_location = None
     try:
         with open(location, 'rb') as f:
             header = f.read(4)
         if header != b'RIFF':
             console.print("[yellow]Unsupported file type! Hang Tight , fixing it ....[/yellow]")
-            with open(location, 'rb') as f:
-                raw_data = f.read()
           
             sampwidth = 2   # 16-bit
             channels = 1    # mono
             framerate = 44100
-            num_samples = len(raw_data) // sampwidth
-            nframes = num_samples // channels  # noqa: F841
            # double solution if jsut changing the type does not work
             temp_wav = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-            with wave.open(temp_wav.name, 'wb') as temp_wave:
+            temp_wav.close()
+            with open(location, 'rb') as f, wave.open(temp_wav.name, 'wb') as temp_wave:
                 temp_wave.setnchannels(channels)
                 temp_wave.setsampwidth(sampwidth)
                 temp_wave.setframerate(framerate)
-                temp_wave.writeframes(raw_data)
+                # copy in blocks, these files tend to be huge
+                while True:
+                    raw_data = f.read(AUDIO_BLOCK * sampwidth)
+                    if not raw_data:
+                        break
+                    temp_wave.writeframes(raw_data[:len(raw_data) - len(raw_data) % sampwidth])
             # Use the temporary WAV file as the input.
-            location = temp_wav.name
+            location = temp_location = temp_wav.name
     except Exception as e:
         console.print(f"[red]Error checking/converting audio: {e}[/red]")
         return
 
-    
     try:
-        with wave.open(location, 'rb') as wave_read:
-            params = wave_read.getparams() 
-            frames = wave_read.readframes(params.nframes)
-            sample_width = params.sampwidth
-            if sample_width != 2:
-                console.print("[yellow]Warning: Only 16-bit PCM WAV files are fully supported.[/yellow]") # some 64 bit files when very small work but its like an edge case
-            num_samples = params.nframes * params.nchannels
-            sample_format = "<" + "h" * num_samples
-            samples = list(struct.unpack(sample_format, frames))
+        _embedAudio(location, message, output_path)
+    finally:
+        # clean the temp file
+        if temp_location:
+            try:
+                os.remove(temp_location)
+            except Exception:
+                pass
+
+def _embedAudio(location, message, output_path):
+    # samples are streamed block by block, only one block is ever in memory
+    try:
+        wave_read = wave.open(location, 'rb')
     except Exception as e:
         console.print(f"[red]Error opening audio: {e}[/red]")
         return
 
-    message_bits = toBinary(message)
-    message_length = len(message_bits)
-    length_bin = f"{message_length:032b}"
-    data_bits = list(length_bin) + message_bits
-
-    max_capacity = len(samples)  # one bit per sample
-    if len(data_bits) > max_capacity:
-        console.print("[red]Error: The audio file is too small for the message.[/red]")
-        return
+    with wave_read:
+        params = wave_read.getparams()
+        sample_width = params.sampwidth
+        # any PCM width works, the lowest bit of a little endian sample is always in its first byte
+        if sample_width not in (1, 2, 3, 4):
+            console.print("[yellow]Warning: Only 8, 16, 24 and 32-bit PCM WAV files are supported.[/yellow]")
+            return
 
-    # embed bits into low depth as audio is more sensitive to changes
-    data_index = 0
-    new_samples = []
-    for sample in samples:
-        new_sample = sample
-        if data_index < len(data_bits):
-            bit = int(data_bits[data_index])
-            new_sample = embedBit(sample, bit)
-            data_index += 1
-        new_samples.append(new_sample)
+        data_bits = toBits(message.encode('utf-8'))
 
-    try:
-        new_frames = struct.pack(sample_format, *new_samples)
-        with wave.open(output_path, 'wb') as wave_write:
-            wave_write.setparams(params)
-            wave_write.writeframes(new_frames)
-        console.print(f"[green]Message encoded successfully into [bold]{output_path}[/bold].[/green]")
-    except Exception as e:
-        console.print(f"[red]Error saving audio: {e}[/red]")
+        max_capacity = params.nframes * params.nchannels  # one bit per sample
+        if len(data_bits) > max_capacity:
+            console.print("[red]Error: The audio file is too small for the message.[/red]")
+            return
 
-  # clean the temp file
-    if os.path.basename(location).startswith("tmp"):
+        # embed bits into low depth as audio is more sensitive to changes
         try:
-            os.remove(location)
-        except Exception:
-            pass
-    try:
-        with wave.open(location, 'rb') as wave_read:
-            params = wave_read.getparams() 
-            frames = wave_read.readframes(params.nframes)
-            sample_width = params.sampwidth
-            # 32 bit pcm wav can tbe done as id have to write different logic for 4 bytes per sample
-            # the logic in theory is the same as image but with 4 bytes per sample 
-            if sample_width != 2:
-                console.print("[yellow]Warning: Only 16-bit PCM WAV files are fully supported.[/yellow]")
-            num_samples = params.nframes * params.nchannels
-            sample_format = "<" + "h" * num_samples
-            samples = list(struct.unpack(sample_format, frames))
-    except Exception as e:
-        console.print(f"[red]Error opening audio: {e}[/red]")
-        return
-
-    message_bits = toBinary(message)
-    message_length = len(message_bits)
-    length_bin = f"{message_length:032b}"
-    data_bits = list(length_bin) + message_bits
+            with wave.open(output_path, 'wb') as wave_write:
+                wave_write.setparams(params)
+                data_index = 0
+                while True:
+                    frames = bytearray(wave_read.readframes(AUDIO_BLOCK))
+                    if not frames:
+                        break
+                    if data_index < len(data_bits):
+                        carriers = sampleCarriers(frames, sample_width)
+                        block_bits = data_bits[data_index:data_index + len(carriers)]
+                        embedBits(carriers, block_bits)
+                        data_index += len(block_bits)
+                    wave_write.writeframes(frames)
+            console.print(f"[green]Message encoded successfully into [bold]{output_path}[/bold].[/green]")
+        except Exception as e:
+            console.print(f"[red]Error saving audio: {e}[/red]")
 
-    max_capacity = len(samples)  # one bit per sample
-    if len(data_bits) > max_capacity:
-        console.print("[red]Error: The audio file is too small for the message.[/red]")
-        return
-# embed the bit but with low depth as audio is more sensitive to changes
-    data_index = 0
-    new_samples = []
-    for sample in samples:
-        new_sample = sample
-        if data_index < len(data_bits):
-            bit = int(data_bits[data_index])
-            new_sample = embedBit(sample, bit)
-            data_index += 1
-        new_samples.append(new_sample)
-
-    try:
-        new_frames = struct.pack(sample_format, *new_samples)
-        with wave.open(output_path, 'wb') as wave_write:
-            wave_write.setparams(params)
-            wave_write.writeframes(new_frames)
-        console.print(f"[green]Message encoded successfully into [bold]{output_path}[/bold].[/green]")
-    except Exception as e:
-        console.print(f"[red]Error saving audio: {e}[/red]")
 def decodeAudio(location):
     try:
-        with wave.open(location, 'rb') as wave_read:
-            params = wave_read.getparams()
-            frames = wave_read.readframes(params.nframes)
-            num_samples = params.nframes * params.nchannels
-            sample_format = "<" + "h" * num_samples
-            samples = list(struct.unpack(sample_format, frames))
+        wave_read = wave.open(location, 'rb')
     except Exception as e:
         console.print(f"[red]Error opening audio: {e}[/red]")
         return None
 
-    bits = []
-    for sample in samples:
-        bits.append(str(sample & 1))
-
-    length_bits = bits[:32]
-    message_length = int(''.join(length_bits), 2)
-    start = 32
-    end = 32 + message_length
-    if end > len(bits):
+    # read blocks only until the whole message is in
+    with wave_read:
+        params = wave_read.getparams()
+        sample_width = params.sampwidth
+        max_capacity = params.nframes * params.nchannels
+        blocks = []
+        have = 0
+        message_length = None
+        needed = HEADER_BITS
+        while have < needed:
+            frames = wave_read.readframes(AUDIO_BLOCK)
+            if not frames:
+                break
+            blocks.append(readBits(sampleCarriers(frames, sample_width)))
+            have += len(blocks[-1])
+            if message_length is None and have >= HEADER_BITS:
+                bits = np.concatenate(blocks)
+                blocks = [bits]
+                message_length = headerLength(bits)
+                needed = HEADER_BITS + message_length
+                if needed > max_capacity:
+                    break
+
+    end = needed
+    if message_length is None or end > have:
         console.print("[red]Error: Not enough data to decode the full message.[/red]")
         return None
 
-    message_bits = bits[start:end]
+    message_bits = np.concatenate(blocks)[HEADER_BITS:end]
     try:
-        message = toPlain(message_bits)
+        message = fromBits(message_bits)
     except Exception as e:
         console.print(f"[red]Error decoding message from audio: {e}[/red]")
         return None
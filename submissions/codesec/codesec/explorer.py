@@ -1,105 +1,223 @@
 from pathlib import Path
 import ast
-from typing import Dict, List, Set
+import difflib
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 from tree_sitter import Language, Parser
 import networkx as nx
 
+INDEX_VERSION = 1
+INDEX_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'codesec'
+# Below this many changed files the pool costs more than it saves
+MIN_PARALLEL_FILES = 16
+
+
+def analyze_source(source: str) -> Dict:
+    """Parse Python source once and extract its functions and call edges."""
+    tree = ast.parse(source)
+
+    class CallVisitor(ast.NodeVisitor):
+        def __init__(self):
+            self.current_function = None
+            self.nodes = []
+            self.edges = []
+
+        def visit_FunctionDef(self, node):
+            prev_function = self.current_function
+            self.current_function = node.name
+            self.nodes.append(node.name)
+            self.generic_visit(node)
+            self.current_function = prev_function
+
+        def visit_Call(self, node):
+            if isinstance(node.func, ast.Name) and self.current_function:
+                self.edges.append([self.current_function, node.func.id])
+            self.generic_visit(node)
+
+    visitor = CallVisitor()
+    visitor.visit(tree)
+    return {
+        'functions': CodeExplorer._extract_functions(tree),
+        'nodes': visitor.nodes,
+        'edges': visitor.edges,
+    }
+
+
+def _analyze_file(file: str) -> Optional[Dict]:
+    """Worker entry point, None for files that can't be read or parsed."""
+    try:
+        with open(file, 'r', encoding='utf-8') as f:
+            return analyze_source(f.read())
+    except Exception:
+        return None
+
+
+def _file_hash(file: Path) -> str:
+    return hashlib.sha256(file.read_bytes()).hexdigest()
+
+
 class CodeExplorer:
     """Code exploration and analysis functionality."""
-    
-    def __init__(self):
+
+    def __init__(self, index_dir: Optional[Path] = None, workers: Optional[int] = None):
         self.parser = self._setup_parser()
         self.call_graph = nx.DiGraph()
-        
+        self.index_dir = Path(index_dir) if index_dir else INDEX_DIR
+        self.workers = workers
+        self.analyses: Dict[str, Optional[Dict]] = {}
+        self.function_index: Dict[str, List[Dict]] = {}
+        # Number of files parsed by the last explore_directory, the rest came from the index
+        self.parsed_files = 0
+
     def _setup_parser(self) -> Parser:
         """Set up the tree-sitter parser."""
         # TODO: Build and load language support
         parser = Parser()
         # parser.set_language(Language('build/my-languages.so', 'python'))
         return parser
-        
+
     def explore_directory(self, path: Path) -> Dict:
         """Explore a directory and generate code insights."""
-        files = list(path.rglob('*'))
+        files = self._list_files(path)
+        analyses = self._analyze_python_files(path, [f for f in files if f.suffix == '.py'])
         insights = {
             'total_files': len(files),
             'file_types': self._count_file_types(files),
-            'call_graph': self._generate_call_graph(files),
-            'function_index': self._index_functions(files)
+            'call_graph': self._generate_call_graph(analyses),
+            'function_index': self._index_functions(analyses)
         }
         return insights
-        
+
+    def _list_files(self, path: Path) -> List[Path]:
+        """List every file under path with a single directory walk."""
+        files = []
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            root_path = Path(root)
+            files.extend(root_path / name for name in sorted(names))
+        return files
+
     def _count_file_types(self, files: List[Path]) -> Dict[str, int]:
         """Count files by their extension."""
         counts = {}
         for file in files:
-            if file.is_file():
-                ext = file.suffix
-                counts[ext] = counts.get(ext, 0) + 1
+            ext = file.suffix
+            counts[ext] = counts.get(ext, 0) + 1
         return counts
-        
-    def _generate_call_graph(self, files: List[Path]) -> nx.DiGraph:
+
+    def _index_path(self, path: Path) -> Path:
+        root = str(Path(path).resolve())
+        return self.index_dir / f"{hashlib.sha256(root.encode('utf-8')).hexdigest()[:16]}.json"
+
+    def _load_index(self, path: Path) -> Dict:
+        try:
+            with open(self._index_path(path), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == INDEX_VERSION:
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'version': INDEX_VERSION, 'files': {}, 'analyses': {}}
+
+    def _save_index(self, path: Path, index: Dict):
+        index_path = self._index_path(path)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        with open(partial, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(index, separators=(',', ':')))
+        os.replace(partial, index_path)
+
+    def _analyze_python_files(self, path: Path, files: List[Path]) -> Dict[str, Dict]:
+        """
+        Functions and call edges of every Python file, keyed by str(file).
+
+        Results are stored in an on-disk index keyed by the hash of the file
+        contents. A file whose mtime and size didn't change is not even read
+        again, and only new or modified files are parsed, on a process pool.
+        """
+        index = self._load_index(path)
+        known_files = index['files']
+        analyses_by_hash = index['analyses']
+
+        hashes: Dict[str, str] = {}
+        current_files = {}
+        for file in files:
+            key = str(file.relative_to(path))
+            try:
+                stat = file.stat()
+                signature = [stat.st_mtime_ns, stat.st_size]
+                known = known_files.get(key)
+                if known and known['stat'] == signature:
+                    digest = known['hash']
+                else:
+                    digest = _file_hash(file)
+            except OSError:
+                continue
+            hashes[str(file)] = digest
+            current_files[key] = {'stat': signature, 'hash': digest}
+
+        # One parse per distinct content that isn't in the index yet
+        pending: Dict[str, str] = {}
+        for file, digest in hashes.items():
+            if digest not in analyses_by_hash:
+                pending.setdefault(digest, file)
+        self.parsed_files = len(pending)
+
+        if pending:
+            for digest, analysis in zip(pending, self._parse_files(list(pending.values()))):
+                analyses_by_hash[digest] = analysis
+
+        # Drop contents no file has any more
+        used = set(hashes.values())
+        index['analyses'] = {digest: analysis for digest, analysis in analyses_by_hash.items() if digest in used}
+        if pending or current_files != known_files:
+            index['files'] = current_files
+            self._save_index(path, index)
+
+        self.analyses = {file: index['analyses'][digest] for file, digest in hashes.items()}
+        return self.analyses
+
+    def _parse_files(self, files: List[str]) -> List[Optional[Dict]]:
+        """Parse files on a process pool, results in the order of files."""
+        workers = self.workers or os.cpu_count() or 1
+        if workers == 1 or len(files) < MIN_PARALLEL_FILES:
+            return [_analyze_file(file) for file in files]
+        chunksize = max(1, len(files) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_analyze_file, files, chunksize=chunksize))
+
+    def _generate_call_graph(self, analyses: Dict[str, Dict]) -> nx.DiGraph:
         """Generate a call graph of the codebase."""
         self.call_graph.clear()
-        
-        for file in files:
-            if file.suffix == '.py':
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        tree = ast.parse(f.read())
-                        self._analyze_calls(tree, str(file))
-                except:
-                    continue
-                    
+
+        for filename, analysis in analyses.items():
+            if analysis is None:
+                continue
+            self.call_graph.add_nodes_from(f"{filename}:{name}" for name in analysis['nodes'])
+            self.call_graph.add_edges_from(
+                (f"{filename}:{caller}", f"{filename}:{called}")
+                for caller, called in analysis['edges']
+            )
+
         return self.call_graph
-        
-    def _analyze_calls(self, tree: ast.AST, filename: str):
-        """Analyze function calls in an AST."""
-        class CallVisitor(ast.NodeVisitor):
-            def __init__(self, explorer):
-                self.current_function = None
-                self.explorer = explorer
-                
-            def visit_FunctionDef(self, node):
-                prev_function = self.current_function
-                self.current_function = f"{filename}:{node.name}"
-                self.explorer.call_graph.add_node(self.current_function)
-                self.generic_visit(node)
-                self.current_function = prev_function
-                
-            def visit_Call(self, node):
-                if isinstance(node.func, ast.Name) and self.current_function:
-                    called = node.func.id
-                    self.explorer.call_graph.add_edge(
-                        self.current_function,
-                        f"{filename}:{called}"
-                    )
-                self.generic_visit(node)
-                
-        visitor = CallVisitor(self)
-        visitor.visit(tree)
-        
-    def _index_functions(self, files: List[Path]) -> Dict[str, List[Dict]]:
+
+    def _index_functions(self, analyses: Dict[str, Dict]) -> Dict[str, List[Dict]]:
         """Create an index of functions in the codebase."""
-        index = {}
-        
-        for file in files:
-            if file.suffix == '.py':
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        tree = ast.parse(f.read())
-                        functions = self._extract_functions(tree)
-                        if functions:
-                            index[str(file)] = functions
-                except:
-                    continue
-                    
-        return index
-        
-    def _extract_functions(self, tree: ast.AST) -> List[Dict]:
+        self.function_index = {
+            filename: analysis['functions']
+            for filename, analysis in analyses.items()
+            if analysis is not None and analysis['functions']
+        }
+        return self.function_index
+
+    @staticmethod
+    def _extract_functions(tree: ast.AST) -> List[Dict]:
         """Extract function definitions from an AST."""
         functions = []
-        
+
         for node in ast.walk(tree):
             if isinstance(node, ast.FunctionDef):
                 func = {
@@ -109,14 +227,53 @@ class CodeExplorer:
                     'docstring': ast.get_docstring(node)
                 }
                 functions.append(func)
-                
+
         return functions
-        
+
+    @staticmethod
+    def _fuzzy_score(query: str, candidate: str) -> float:
+        """Score between 0 and 1, substring and in-order character matches score highest."""
+        query = query.lower()
+        candidate = candidate.lower()
+        if not query:
+            return 0.0
+        if query == candidate:
+            return 1.0
+        if candidate.startswith(query):
+            return 0.9 + 0.1 * len(query) / len(candidate)
+        if query in candidate:
+            return 0.8 + 0.1 * len(query) / len(candidate)
+
+        # all characters of the query in order, e.g. "gcg" in "generate_call_graph"
+        position = 0
+        for char in query:
+            position = candidate.find(char, position) + 1
+            if position == 0:
+                break
+        else:
+            return 0.5 + 0.3 * len(query) / len(candidate)
+
+        return 0.5 * difflib.SequenceMatcher(None, query, candidate).ratio()
+
     def fuzzy_search(self, query: str, max_results: int = 10) -> List[Dict]:
         """Perform fuzzy search across the codebase."""
-        # TODO: Implement fuzzy search using rapidfuzz or similar
-        pass
-        
+        # Answered from the function index of the last explore_directory,
+        # files match on their name and functions on theirs
+        results = []
+        for filename, functions in self.function_index.items():
+            file_score = self._fuzzy_score(query, Path(filename).name)
+            if file_score >= 0.5:
+                results.append({'type': 'file', 'name': Path(filename).name,
+                                'file': filename, 'line': 1, 'score': file_score})
+            for func in functions:
+                score = self._fuzzy_score(query, func['name'])
+                if score >= 0.5:
+                    results.append({'type': 'function', 'name': func['name'], 'file': filename,
+                                    'line': func['line'], 'args': func['args'], 'score': score})
+
+        results.sort(key=lambda result: (-result['score'], result['file'], result['line']))
+        return results[:max_results]
+
     def generate_ascii_graph(self) -> str:
         """Generate an ASCII representation of the call graph."""
         # TODO: Implement ASCII graph generation
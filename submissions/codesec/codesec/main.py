@@ -71,6 +71,7 @@ def main():
     parser = argparse.ArgumentParser(description="CodeSec CLI - Security and Privacy Analyzer")
     parser.add_argument("path", help="Path to analyze", type=Path)
     parser.add_argument("--report", help="Generate report file", type=Path)
+    parser.add_argument("--workers", help="Processes used to scan a directory (default: one per CPU)", type=int)
     
     args = parser.parse_args()
     
@@ -78,7 +79,10 @@ def main():
         # Run in report mode
         scanner = SecurityScanner()
         report_gen = ReportGenerator()
-        issues = scanner.scan_file(args.path)
+        if args.path.is_dir():
+            issues = scanner.scan_directory(args.path, workers=args.workers)
+        else:
+            issues = scanner.scan_file(args.path)
         report_gen.generate_markdown({"issues": issues}, args.report)
     else:
         # Run in TUI mode
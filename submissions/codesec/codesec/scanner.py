@@ -1,10 +1,27 @@
 import re
+import os
 from pathlib import Path
 from typing import Dict, List, Optional
 import json
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 
+# Files are read in chunks of this many characters
+CHUNK_SIZE = 1 << 20
+# Characters every chunk shares with the next one, so a match straddling two
+# chunks is still found whole (the longest match that is guaranteed whole)
+CHUNK_OVERLAP = 1 << 16
+# Below this many files the pool costs more than it saves
+MIN_PARALLEL_FILES = 16
+# Version control metadata, compressed objects that would only report decode errors
+SKIP_DIRS = {'.git', '.hg', '.svn'}
+
+ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+BROWSER_CREDENTIAL_INDICATORS = ['credentials', 'cookies', 'passwords', 'logins']
+
+
 @dataclass
 class SecurityIssue:
     type: str
@@ -12,9 +29,57 @@ class SecurityIssue:
     line: Optional[int] = None
     severity: str = "HIGH"
 
+
+def _prefix_pattern(words: List[str]) -> str:
+    """
+    Regex matching any of the words, factored into a trie ("a(?:kia|pi)"
+    rather than "akia|api") so re can rule out most positions by their
+    first character.
+    """
+    if '' in words:
+        return ''
+    groups = {}
+    for word in words:
+        groups.setdefault(word[0], []).append(word[1:])
+    alternatives = [re.escape(char) + _prefix_pattern(rest) for char, rest in sorted(groups.items())]
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return '(?:' + '|'.join(alternatives) + ')'
+
+
+def _contains_indicator(data, indicators: List[str]) -> bool:
+    """Look for indicators in the keys and strings of parsed JSON, stopping at the first one."""
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, str):
+            lowered = item.lower()
+            if any(indicator in lowered for indicator in indicators):
+                return True
+    return False
+
+
+# Scanner of a worker process, sent once when the worker starts
+_worker: Optional['SecurityScanner'] = None
+
+
+def _init_worker(scanner: 'SecurityScanner'):
+    global _worker
+    _worker = scanner
+
+
+def _scan_in_worker(file: str) -> List[Dict]:
+    return _worker.scan_file(Path(file))
+
+
 class SecurityScanner:
     """Scanner for detecting security and privacy issues in code."""
-    def __init__(self):
+    def __init__(self, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
         patterns = {
             'aws_key': r'(?:AKIA|A3T|AGPA|AIDA|AROA|AIPA|ANPA|ANVA|ASIA)[A-Z0-9]{16}',
             'api_token': r'(?i)(api[_-]?key|token|secret)[_-]?[a-zA-Z0-9]{32,}',
@@ -25,6 +90,20 @@ class SecurityScanner:
         self.patterns = {
             name: re.compile(pattern) for name, pattern in patterns.items()
         }
+        # Every match of a pattern starts with one of its prefixes, ignoring case
+        prefixes = {
+            'aws_key': ['AKIA', 'A3T', 'AGPA', 'AIDA', 'AROA', 'AIPA', 'ANPA', 'ANVA', 'ASIA'],
+            'api_token': ['api', 'token', 'secret'],
+            'suspicious_domains': ['tracking.', 'analytics.', 'telemetry.'],
+            'plaintext_storage': ['password', 'secret', 'token', 'key']
+        }
+        # All prefixes in one case sensitive pattern, searched in lowercased
+        # text: one fast pass finds every position where any pattern can match
+        self.prefilter = re.compile(_prefix_pattern(sorted({
+            prefix.lower() for names in prefixes.values() for prefix in names
+        })))
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         
     def scan_file(self, file_path: Path) -> List[Dict]:
         """Scan a single file for security issues."""
@@ -32,16 +111,15 @@ class SecurityScanner:
         
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+                matches = self._scan_stream(f)
                 
             # Check for hard-coded credentials
-            for pattern_name, pattern in self.patterns.items():
-                matches = re.finditer(pattern, content)
-                for match in matches:
+            for pattern_name, lines in matches.items():
+                for line in lines:
                     issues.append({
                         'type': pattern_name,
                         'message': f'Potential {pattern_name} found',
-                        'line': content.count('\n', 0, match.start()) + 1
+                        'line': line
                     })
             
             # Special handling for browser credential files
@@ -59,6 +137,92 @@ class SecurityScanner:
             })
             
         return issues
+
+    def _scan_stream(self, stream) -> Dict[str, List[int]]:
+        """
+        Line numbers of every match of every pattern, reading the stream in chunks.
+
+        The patterns are only tried, anchored, at the positions the prefilter
+        finds, so text without any prefix is read by one regex pass instead of
+        one per pattern. Line numbers are counted forward from the previous
+        hit instead of from the start of the file.
+
+        Each chunk keeps the last chunk_overlap characters of the previous
+        one. Matches starting in that tail are left for the next chunk, and
+        each pattern resumes after its last reported match, so the results are
+        the same as running every pattern over the whole file.
+        """
+        matches = {name: [] for name in self.patterns}
+        # Absolute offset each pattern may match again from
+        resume = dict.fromkeys(self.patterns, 0)
+        offset = 0
+        lines_before = 0
+        buffer = ''
+
+        while True:
+            chunk = stream.read(self.chunk_size)
+            buffer += chunk
+            last = not chunk
+            cutoff = len(buffer) if last else max(0, len(buffer) - self.chunk_overlap)
+
+            lowered = buffer.lower()
+            if len(lowered) != len(buffer):
+                # a few characters grow when lowered ('İ'), keep offsets aligned
+                lowered = buffer.translate(ASCII_LOWER)
+
+            position = 0
+            line = lines_before + 1
+            hit = self.prefilter.search(lowered)
+            while hit and hit.start() < cutoff:
+                start = hit.start()
+                for name, pattern in self.patterns.items():
+                    if offset + start < resume[name]:
+                        continue
+                    match = pattern.match(buffer, start)
+                    if match:
+                        line += buffer.count('\n', position, start)
+                        position = start
+                        matches[name].append(line)
+                        resume[name] = offset + match.end()
+                hit = self.prefilter.search(lowered, start + 1)
+
+            if last:
+                return matches
+            lines_before += buffer.count('\n', 0, cutoff)
+            offset += cutoff
+            buffer = buffer[cutoff:]
+
+    def scan_directory(self, path: Path, workers: Optional[int] = None) -> List[Dict]:
+        """
+        Scan every file under a directory.
+
+        Files are scanned on a process pool (one worker per CPU by default).
+        Every issue gets the file it was found in, and issues come back in the
+        order of the sorted file list, whichever worker finished first.
+        """
+        files = self._list_files(path)
+        issues = []
+        for file, file_issues in zip(files, self._scan_files(files, workers)):
+            for issue in file_issues:
+                issue['file'] = file
+                issues.append(issue)
+        return issues
+
+    def _list_files(self, path: Path) -> List[str]:
+        files = []
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(name for name in dirs if name not in SKIP_DIRS)
+            files.extend(os.path.join(root, name) for name in sorted(names))
+        return files
+
+    def _scan_files(self, files: List[str], workers: Optional[int] = None) -> List[List[Dict]]:
+        """Scan files on a process pool, results in the order of files."""
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(files) < MIN_PARALLEL_FILES:
+            return [self.scan_file(Path(file)) for file in files]
+        chunksize = max(1, len(files) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as pool:
+            return list(pool.map(_scan_in_worker, files, chunksize=chunksize))
     
     def _check_browser_creds(self, file_path: Path) -> bool:
         """Check if a file contains browser credentials."""
@@ -87,8 +251,7 @@ class SecurityScanner:
                     data = json.load(f)
                     
                 # Check for common browser credential JSON structures
-                credential_indicators = ['credentials', 'cookies', 'passwords', 'logins']
-                return any(indicator in str(data).lower() for indicator in credential_indicators)
+                return _contains_indicator(data, BROWSER_CREDENTIAL_INDICATORS)
             except:
                 return False
                 
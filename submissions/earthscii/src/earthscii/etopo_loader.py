@@ -1,5 +1,6 @@
 import rasterio
 import math
+import numpy as np
 
 EARTH_RADIUS = 6371000  # meters
 
@@ -14,6 +15,51 @@ def latlon_to_xyz(lat, lon, elevation):
     return (x, y, z)
 
 
+def latlon_to_xyz_array(lat, lon, elevation):
+    """latlon_to_xyz for whole arrays, returns an (N, 3) array."""
+    lat_rad = np.radians(lat)
+    lon_rad = np.radians(lon)
+    r = EARTH_RADIUS + elevation
+    cos_lat = np.cos(lat_rad)
+    return np.stack([r * cos_lat * np.cos(lon_rad),
+                     r * cos_lat * np.sin(lon_rad),
+                     r * np.sin(lat_rad)], axis=-1)
+
+
+def sphere_points(elevation, transform, nodata, stride=32, z_scale=1.0,
+                  dtype=np.float64):
+    """
+    Sample an elevation raster every stride pixels as 3D sphere points.
+
+    Args
+    ----
+    elevation: 2D elevation array as read from the GeoTIFF
+    transform: affine transform of the raster
+    nodata: nodata value of the raster, or None
+    stride: sampling stride in pixels
+    z_scale: scale factor for exaggerating elevation
+
+    Returns
+    -------
+    points: (N, 3) array of 3D sphere points
+
+    """
+    rows = np.arange(0, elevation.shape[0], stride)
+    cols = np.arange(0, elevation.shape[1], stride)
+    z = elevation[::stride, ::stride]
+
+    # same as rasterio.transform.xy(transform, row, col), pixel centers
+    col_grid = cols[np.newaxis, :] + 0.5
+    row_grid = rows[:, np.newaxis] + 0.5
+    lon = transform.a * col_grid + transform.b * row_grid + transform.c
+    lat = transform.d * col_grid + transform.e * row_grid + transform.f
+    lon, lat = np.broadcast_arrays(lon, lat)
+
+    valid = np.ones(z.shape, dtype=bool) if nodata is None else z != nodata
+    points = latlon_to_xyz_array(lat[valid], lon[valid], z[valid] * z_scale)
+    return points.astype(dtype, copy=False)
+
+
 def load_etopo_as_sphere_points(path, stride=32, z_scale=1.0):
     """
     Convert a GeoTIFF file to a list of 3D sphere points.
@@ -26,24 +72,10 @@ def load_etopo_as_sphere_points(path, stride=32, z_scale=1.0):
 
     Returns
     -------
-    points: list of 3D sphere points
+    points: (N, 3) array of 3D sphere points
 
     """
-    points = []
-
     with rasterio.open(path) as dataset:
         elevation = dataset.read(1)
-        transform = dataset.transform
-        nodata = dataset.nodata
-        height, width = elevation.shape
-
-        for y in range(0, height, stride):
-            for x in range(0, width, stride):
-                z = elevation[y][x]
-                if z == nodata:
-                    continue
-                lon, lat = rasterio.transform.xy(transform, y, x)
-                p = latlon_to_xyz(lat, lon, z * z_scale)
-                points.append(p)
-
-    return points
+        return sphere_points(elevation, dataset.transform, dataset.nodata,
+                             stride, z_scale)
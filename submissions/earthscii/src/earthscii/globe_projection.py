@@ -1,19 +1,13 @@
 import math
 import numpy as np
+from earthscii.renderer import rasterize
 from earthscii.utils import log
 
 
-def project_globe(points, angle_x=0, angle_y=0, angle_z=0, zoom=1.0,
-                  offset_x=0, offset_y=0, screen_width=80, screen_height=24,
-                  aspect_ratio=0.5):
-    log(f"[\033[32mINFO\033[0m] Projecting {len(points)} points")
-    projected = []
-    EARTH_RADIUS = 6371000  # in meters
-
-    # Compute camera rotation
+def camera_basis(angle_x, angle_y):
+    """Forward, right and up unit vectors of the orbit camera."""
     ax = math.radians(angle_x)
     ay = math.radians(angle_y)
-    az = math.radians(angle_z)
 
     # Camera forward vector
     fx = math.cos(ay) * math.cos(ax)
@@ -26,24 +20,51 @@ def project_globe(points, angle_x=0, angle_y=0, angle_z=0, zoom=1.0,
     right = np.cross(world_up, forward)
     right /= np.linalg.norm(right)
     up = np.cross(forward, right)
+    return forward, right, up
+
 
-    for p in points:
-        rel = np.array(p)
+def project_globe(points, angle_x=0, angle_y=0, angle_z=0, zoom=1.0,
+                  offset_x=0, offset_y=0, screen_width=80, screen_height=24,
+                  aspect_ratio=0.5, rows=None, cols=None):
+    """
+    Project sphere points onto the screen.
+
+    Args
+    ----
+    points: (N, 3) float array of points in meters (a list of tuples works too)
+    rows, cols: size of the cell buffer to fill, defaults to the screen size
+
+    Returns
+    -------
+    cells: CellBuffer of rows x cols, the nearest point wins every cell
+
+    """
+    points = np.asarray(points)
+    if points.dtype.kind != "f":
+        points = points.astype(np.float64)
+    points = points.reshape(-1, 3)
+    log(f"[\033[32mINFO\033[0m] Projecting {len(points)} points")
+    EARTH_RADIUS = 6371000  # in meters
+    rows = screen_height if rows is None else rows
+    cols = screen_width if cols is None else cols
 
-        # Discard back-facing hemisphere
-        if np.dot(forward, rel / np.linalg.norm(rel)) < 0:
-            continue
+    forward, right, up = camera_basis(angle_x, angle_y)
 
-        # Dynamic scale: map full screen width to ~2 Earth radii
-        SCALE = (screen_width / (2 * EARTH_RADIUS)) / zoom
+    # Discard back-facing hemisphere, the sign of the dot product is all we
+    # need so there is no point normalising every point first
+    sz = points @ forward
+    front = sz >= 0
+    points = points[front]
+    sz = sz[front]
 
-        sx = int(np.dot(rel, right)* SCALE) + offset_x
-        sy = int(np.dot(rel, up) * SCALE * aspect_ratio) + offset_y
-        sz = np.dot(rel, forward)
-        projected.append((sx, sy, sz))
-        if len(projected) < 5:
-            log(f"[\033[96mPOINT\033[0m] sx={sx}, sy={sy}, sz={sz:.2f}")
+    # Dynamic scale: map full screen width to ~2 Earth radii
+    SCALE = (screen_width / (2 * EARTH_RADIUS)) / zoom
 
+    # truncate towards zero like int() did for a single point
+    sx = np.trunc((points @ right) * SCALE).astype(np.int64) + offset_x
+    sy = np.trunc((points @ up) * SCALE * aspect_ratio).astype(np.int64) + offset_y
+    for i in range(min(4, len(sz))):
+        log(f"[\033[96mPOINT\033[0m] sx={sx[i]}, sy={sy[i]}, sz={sz[i]:.2f}")
 
-    log(f"[\033[32mINFO\033[0m] Projected {len(projected)} front-facing points")
-    return projected
+    log(f"[\033[32mINFO\033[0m] Projected {len(sz)} front-facing points")
+    return rasterize(sx, sy, sz, rows, cols)
@@ -1,14 +1,20 @@
 import math
+import os
 import shutil
+import urllib.error
 import urllib.request
 from pathlib import Path
-from earthscii.etopo_loader import load_etopo_as_sphere_points
+import numpy as np
+from earthscii.tile_cache import TileCache
 from earthscii.utils import log
 
 
 TILE_DIR = Path("./tiles")
 TILE_DIR.mkdir(parents=True, exist_ok=True)
 PARTIAL_SUFFIX = ".partial"
+ETOPO_BASE_URL = "https://www.ngdc.noaa.gov/mgg/global/relief/ETOPO2022/data/15s/15s_surface_elev_gtif/"
+# where tiles come from, a URL or a local directory holding the same file names
+TILE_SOURCE = os.environ.get("EARTHSCII_TILE_SOURCE", ETOPO_BASE_URL)
 
 
 def estimate_fov_from_screen(forward_vec, zoom, screen_width, screen_height,
@@ -31,33 +37,61 @@ def etopo2022_filename(lat, lon):
     return f"ETOPO_2022_v1_15s_{ns}{abs(lat):02d}{ew}{abs(lon):03d}_surface.tif"
 
 
-def download_etopo2022_tile(lat, lon):
+def download_etopo2022_tile(lat, lon, source=None):
+    """
+    Fetch a tile into TILE_DIR and return its local path, or None if the
+    source has no such tile (like most of the ocean). Any other failure
+    (timeout, dropped connection) is raised so the tile is tried again later.
+
+    source is the base URL to download from or a local directory to copy
+    the tiles out of, TILE_SOURCE when not given.
+    """
     fname = etopo2022_filename(lat, lon)
     local_path = TILE_DIR / fname
     partial_path = local_path.with_suffix(local_path.suffix + PARTIAL_SUFFIX)
+    source = source or TILE_SOURCE
 
     if local_path.exists():
         return str(local_path)
     if partial_path.exists():
-        print(f"Removing incomplete download: {partial_path}")
+        log(f"[\033[33mWARN\033[0m] Removing incomplete download: {partial_path}")
         partial_path.unlink()
 
-    base_url = "https://www.ngdc.noaa.gov/mgg/global/relief/ETOPO2022/data/15s/15s_surface_elev_gtif/"
-    url = base_url + fname
-    print(f"Downloading {fname}...")
+    if not source.startswith(("http://", "https://")):
+        source_path = Path(source) / fname
+        if not source_path.exists():
+            return None
+        shutil.copyfile(source_path, partial_path)
+        partial_path.rename(local_path)
+        return str(local_path)
+
+    url = source.rstrip("/") + "/" + fname
+    # this runs on the prefetch threads while curses owns the screen, so
+    # everything goes to the log instead of stdout
+    log(f"[\033[32mINFO\033[0m] Downloading {fname}...")
     try:
         with urllib.request.urlopen(url) as response:
             with open(partial_path, "wb") as out_file:
                 shutil.copyfileobj(response, out_file)
             partial_path.rename(local_path)
             return str(local_path)
-    except Exception as e:
-        print(f"Error downloading {url}: {e}")
+    except urllib.error.HTTPError as e:
         if partial_path.exists():
             partial_path.unlink()
+        if e.code != 404:
+            raise
+        log(f"[\033[33mWARN\033[0m] No tile at {url}")
+    except Exception:
+        if partial_path.exists():
+            partial_path.unlink()
+        raise
     return None
 
 
+# decoded tiles at every LOD, so panning only loads the tiles that just came into view
+TILE_CACHE = TileCache(download_etopo2022_tile)
+
+
 def latlon_from_vector(v):
     x, y, z = v
     lat = math.degrees(math.asin(z / math.sqrt(x*x + y*y + z*z)))
@@ -75,6 +109,13 @@ def vector_from_latlon(lat, lon):
     return x, y, z
 
 
+def forward_from_angles(angle_x, angle_y):
+    fx = np.cos(np.radians(angle_y)) * np.cos(np.radians(angle_x))
+    fy = np.sin(np.radians(angle_x))
+    fz = np.sin(np.radians(angle_y)) * np.cos(np.radians(angle_x))
+    return np.array([fx, fy, fz])
+
+
 def down_to_15(x): return (x // 15) * 15
 
 def up_to_15(x): return ((x+14) // 15) * 15
@@ -102,39 +143,55 @@ def get_visible_tile_coords(forward_vec, fov_lat, fov_lon, padding):
     ]
 
 
-def load_visible_globe_points(forward_vec, zoom, screen_width, screen_height,
-                              aspect_ratio=0.5):
+def visible_tile_keys(forward_vec, zoom, screen_width, screen_height,
+                      aspect_ratio=0.5):
+    """(lat, lon, stride) of every tile the view needs."""
     fov_horiz, fov_vert = estimate_fov_from_screen(forward_vec, zoom,
                                                    screen_width, screen_height,
                                                    aspect_ratio)
     tile_coords = get_visible_tile_coords(forward_vec, fov_vert, fov_horiz,
                                           padding=1)
-    paths = []
-    for lat, lon in tile_coords:
-        path = download_etopo2022_tile(lat, lon)
-        log(f"[\033[32mINFO\033[0m] Downloading tile: lat={lat}, lon={lon}")
-        if path:
-            paths.append(path)
-
     stride = compute_lod_stride(zoom)
+    return [(lat, lon, stride) for lat, lon in tile_coords]
+
+
+def load_visible_globe_points(forward_vec, zoom, screen_width, screen_height,
+                              aspect_ratio=0.5, prefetcher=None):
+    """
+    Points of every visible tile as one (N, 3) array.
+
+    Without a prefetcher missing tiles are fetched right here. With one they
+    are queued on it and left out until they are ready, so this never blocks.
+    """
+    tile_keys = visible_tile_keys(forward_vec, zoom, screen_width,
+                                  screen_height, aspect_ratio)
     all_points = []
-    for path in paths:
-        try:
-            points = load_etopo_as_sphere_points(path, stride=stride)
+    loaded = 0
+    for lat, lon, stride in tile_keys:
+        if prefetcher is not None:
+            # one locked lookup, a tile evicted after a separate "in" check
+            # would otherwise be fetched right here on the render thread
+            points = TILE_CACHE.peek(lat, lon, stride)
             if points is None:
-                log(f"[\033[31mERROR\033[0m] No points returned from: {path}")
+                # no-op for tiles that are cached as missing
+                prefetcher.request(lat, lon, stride)
                 continue
-        except Exception as e:
-            log(f"[\033[31mEXCEPTION\033[0m] Failed to load {path}: {e}")
+        else:
+            if (lat, lon, stride) not in TILE_CACHE:
+                log(f"[\033[32mINFO\033[0m] Loading tile: lat={lat}, lon={lon}, stride={stride}")
+            points = TILE_CACHE.get(lat, lon, stride)
+        if points is None or len(points) == 0:
             continue
-        all_points.extend(points)
+        loaded += 1
+        all_points.append(points)
 
     log(f"[\033[92mDEBUG\033[0m] Looking for tiles near: {latlon_from_vector(forward_vec)}")
-    log(f"[\033[92mDEBUG\033[0m] Tile coords to load: {tile_coords}")
-    log(f"[\033[32mINFO\033[0m] Loaded {len(paths)} tile(s)")
+    log(f"[\033[92mDEBUG\033[0m] Tile coords to load: {tile_keys}")
+    log(f"[\033[32mINFO\033[0m] Loaded {loaded} tile(s)")
+    all_points = np.concatenate(all_points) if all_points else np.empty((0, 3), dtype=np.float32)
     log(f"[\033[32mINFO\033[0m] Loaded {len(all_points)} points")
 
-    if not all_points:
+    if len(all_points) == 0 and prefetcher is None:
         log("[\033[91mFATAL\033[0m] No points to render!")
         raise RuntimeError("No terrain data loaded.")
 
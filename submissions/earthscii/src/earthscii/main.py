@@ -14,6 +14,10 @@ from earthscii.map_loader import load_dem_as_points
 from earthscii.globe_projection import project_globe
 from earthscii.globe_tile_manager import load_visible_globe_points
 from earthscii.globe_tile_manager import vector_from_latlon
+from earthscii.globe_tile_manager import forward_from_angles
+from earthscii.globe_tile_manager import TILE_CACHE
+from earthscii import globe_tile_manager
+from earthscii.prefetcher import TilePrefetcher
 from earthscii.utils import log
 from importlib.resources import files
 
@@ -28,6 +32,7 @@ def parse_args():
     parser.add_argument("--demo", action="store_true", help="Run with a bundled demo tile")
     parser.add_argument("--tilewalk", action="store_true", help="Explore ETOPO tiles one at a time (requires internet)")
     parser.add_argument("--debug", action="store_true", help="Enable verbose debug output on crash")
+    parser.add_argument("--tile-source", help="Base URL or local directory to fetch ETOPO tiles from—global view only")
 
     return parser, parser.parse_args()
 
@@ -51,7 +56,8 @@ def tilewalk_mode(stdscr, args):
     raise KeyboardInterrupt()
 
 
-def globe_mode(stdscr, args, angle_x, angle_y, zoom, width, height, aspect_ratio):
+def globe_mode(stdscr, args, angle_x, angle_y, zoom, width, height, aspect_ratio,
+               prefetcher=None):
     """Run with a globe view"""
     if args.lat is not None and args.lon is not None:
         forward_vec = np.array(vector_from_latlon(args.lat, args.lon))
@@ -66,7 +72,7 @@ def globe_mode(stdscr, args, angle_x, angle_y, zoom, width, height, aspect_ratio
         log(f"[\033[92mDEBUG\033[0m] zoom = {zoom}, screen = {width}x{height}")
 
     globe_points = load_visible_globe_points(
-        forward_vec, zoom, width, height, aspect_ratio
+        forward_vec, zoom, width, height, aspect_ratio, prefetcher=prefetcher
     )
 
     return forward_vec, angle_x, angle_y, globe_points
@@ -95,12 +101,18 @@ def main(stdscr, args):
 
     offset_x, offset_y = width // 2, height // 2
     prev_state = None
+    prefetcher = None
 
     if args.tilewalk:
         tilewalk_mode(stdscr, args)
     elif args.globe:
+        if args.tile_source:
+            globe_tile_manager.TILE_SOURCE = args.tile_source
+        # tiles are downloaded and decoded off the render loop
+        prefetcher = TilePrefetcher(TILE_CACHE)
         forward_vec, angle_x, angle_y, globe_points = globe_mode(
-            stdscr, args, angle_x, angle_y, zoom, width, height, aspect_ratio
+            stdscr, args, angle_x, angle_y, zoom, width, height, aspect_ratio,
+            prefetcher=prefetcher
         )
         is_global = True
     else:
@@ -140,11 +152,13 @@ def main(stdscr, args):
         is_global = False
 
     buffer = curses.newwin(height, width, 0, 0)
+    velocity = (0, 0)
 
     while True:
         try:
             key = stdscr.getch()
 
+            prev_angles = (angle_x, angle_y)
             angle_x, angle_y, angle_z, zoom, offset_x, offset_y, changed = handle_keys(
                 key, angle_x, angle_y, angle_z, zoom, offset_x, offset_y
             )
@@ -152,10 +166,23 @@ def main(stdscr, args):
             if changed:
                 stdscr.refresh()
                 if is_global:
+                    velocity = (angle_x - prev_angles[0], angle_y - prev_angles[1])
                     forward_vec = forward_from_angles(angle_x, angle_y)
                     globe_points = load_visible_globe_points(
-                        forward_vec, zoom, width, height, aspect_ratio
+                        forward_vec, zoom, width, height, aspect_ratio,
+                        prefetcher=prefetcher
                     )
+                    prefetcher.prefetch_ahead(
+                        angle_x, angle_y, velocity, zoom, width, height, aspect_ratio
+                    )
+
+            if is_global and prefetcher.poll():
+                # tiles finished in the background, swap them in and redraw
+                globe_points = load_visible_globe_points(
+                    forward_vec, zoom, width, height, aspect_ratio,
+                    prefetcher=prefetcher
+                )
+                prev_state = None
 
 
             state = (angle_x, angle_y, angle_z, zoom, offset_x, offset_y)
@@ -169,7 +196,8 @@ def main(stdscr, args):
                         globe_points,
                         angle_x, angle_y, angle_z,
                         zoom, offset_x, offset_y,
-                        aspect_ratio=aspect_ratio
+                        aspect_ratio=aspect_ratio,
+                        rows=height, cols=width
                     )
 
                 else:
@@ -198,7 +226,8 @@ def main(stdscr, args):
                     from earthscii.globe_tile_manager import latlon_from_vector
                     lat, lon = latlon_from_vector(forward_vec)
 
-            render_overlay(buffer, angle_x, angle_y, angle_z, zoom, lat, lon)
+            render_overlay(buffer, angle_x, angle_y, angle_z, zoom, lat, lon,
+                           loading=is_global and prefetcher.busy())
 
             buffer.noutrefresh()
             curses.doupdate()
@@ -209,6 +238,9 @@ def main(stdscr, args):
 
         time.sleep(0.016)
 
+    if prefetcher is not None:
+        prefetcher.close()
+
 
 if __name__ == '__main__':
     args = parse_args()
@@ -272,7 +304,8 @@ def handle_keys(key, angle_x, angle_y, angle_z, zoom, offset_x, offset_y):
     return angle_x, angle_y, angle_z, zoom, offset_x, offset_y, changed
 
 
-def render_overlay(buffer, angle_x, angle_y, angle_z, zoom, lat=None, lon=None):
+def render_overlay(buffer, angle_x, angle_y, angle_z, zoom, lat=None, lon=None,
+                   loading=False):
     buffer.addstr(0, 0, "@")  # This should always appear in top-left
     if lat is not None and lon is not None:
         buffer.addstr(0, 1, f"Lat: {lat:.4f}, Lon: {lon:.4f}")
@@ -280,6 +313,8 @@ def render_overlay(buffer, angle_x, angle_y, angle_z, zoom, lat=None, lon=None):
     buffer.addstr(1, 50, f"angle_y = {angle_y}", curses.color_pair(3))
     buffer.addstr(2, 50, f"angle_z = {angle_z}", curses.color_pair(3))
     buffer.addstr(3, 50, f"zoom = {zoom:.2f}", curses.color_pair(3))
+    if loading:
+        buffer.addstr(4, 50, "loading tiles...", curses.color_pair(3))
 
 
 def init_curses(stdscr):
@@ -296,13 +331,6 @@ def init_curses(stdscr):
     curses.init_pair(4, curses.COLOR_RED, curses.COLOR_BLACK)
 
 
-def forward_from_angles(angle_x, angle_y):
-    fx = np.cos(np.radians(angle_y)) * np.cos(np.radians(angle_x))
-    fy = np.sin(np.radians(angle_x))
-    fz = np.sin(np.radians(angle_y)) * np.cos(np.radians(angle_x))
-    return np.array([fx, fy, fz])
-
-
 def fatal(stdscr, message, debug=False, exception=None):
     stdscr.clear()
     try:
@@ -0,0 +1,105 @@
+"""Fetch and decode globe tiles in the background."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from earthscii.globe_tile_manager import forward_from_angles, visible_tile_keys
+from earthscii.utils import log
+
+PREFETCH_WORKERS = 4
+# how many more key presses in the same direction we prepare for
+PREFETCH_STEPS = 3
+
+
+class TilePrefetcher:
+    """
+    Loads tiles into a TileCache on a thread pool.
+
+    The render loop calls request() for tiles it is missing and
+    prefetch_ahead() after every move, and checks poll() every frame to find
+    out when new tiles landed in the cache. None of these wait for a download.
+    """
+
+    def __init__(self, cache, workers=PREFETCH_WORKERS):
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=workers,
+                                        thread_name_prefix="earthscii-prefetch")
+        self._pending = {}
+        self._predicted = set()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+
+    def request(self, lat, lon, stride):
+        """Queue a tile the view needs now, unless it is cached or already on its way."""
+        key = (lat, lon, stride)
+        with self._lock:
+            # needed now, so a later prediction must not cancel it
+            self._predicted.discard(key)
+            return self._submit(key)
+
+    def _submit(self, key):
+        if key in self._pending or key in self.cache:
+            return False
+        self._pending[key] = self._pool.submit(self._load, key)
+        return True
+
+    def _load(self, key):
+        try:
+            self.cache.get(*key)
+        except Exception as e:
+            log(f"[\033[31mEXCEPTION\033[0m] Prefetch of {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            self._ready.set()
+
+    def predict(self, angle_x, angle_y, velocity, zoom, screen_width,
+                screen_height, aspect_ratio=0.5):
+        """Tiles the view will need if the camera keeps turning at velocity (dx, dy degrees per move)."""
+        vx, vy = velocity
+        keys = []
+        for step in range(1, PREFETCH_STEPS + 1):
+            forward_vec = forward_from_angles(angle_x + vx * step,
+                                              angle_y + vy * step)
+            for key in visible_tile_keys(forward_vec, zoom, screen_width,
+                                         screen_height, aspect_ratio):
+                if key not in keys:
+                    keys.append(key)
+        return keys
+
+    def prefetch_ahead(self, angle_x, angle_y, velocity, zoom, screen_width,
+                       screen_height, aspect_ratio=0.5):
+        """Queue the predicted tiles, dropping older predictions that have not started yet."""
+        if velocity == (0, 0):
+            return
+        keys = self.predict(angle_x, angle_y, velocity, zoom, screen_width,
+                            screen_height, aspect_ratio)
+        with self._lock:
+            was_busy = bool(self._pending)
+            for key in self._predicted.difference(keys):
+                future = self._pending.get(key)
+                if future is not None and future.cancel():
+                    del self._pending[key]
+            queued = sum(self._submit(key) for key in keys)
+            self._predicted = {key for key in keys if key in self._pending}
+            if was_busy and not self._pending:
+                # nothing left to load, the next poll() redraws without the
+                # loading overlay
+                self._ready.set()
+        log(f"[\033[92mDEBUG\033[0m] Prefetching {queued} tile(s) ahead")
+
+    def poll(self):
+        """True once after one or more tiles finished loading."""
+        if self._ready.is_set():
+            self._ready.clear()
+            return True
+        return False
+
+    def busy(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def close(self):
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+        self._pool.shutdown(wait=False)
@@ -1,44 +1,98 @@
 """Map depth to ASCII and place chars."""
 import curses
+from collections import namedtuple
+import numpy as np
 from earthscii.utils import log
 
+CHARS = ".,:-=+*#%@"
 
-def render_map(buffer, projected_points):
-    chars = ".,:-=+*#%@"
-    if not projected_points:
-        log("[\033[93mWARN\033[0m] No projected points")
-        return
+# One character and one curses color pair per screen cell, 0 means empty.
+CellBuffer = namedtuple("CellBuffer", ["chars", "colors"])
 
-    height, width = buffer.getmaxyx()
-    min_depth = min(p[2] for p in projected_points)
-    max_depth = max(p[2] for p in projected_points)
+
+def rasterize(xs, ys, depths, height, width):
+    """
+    Z-buffer projected points into a dense height x width CellBuffer.
+
+    When several points land on the same cell the one with the largest depth
+    wins. Depth is normalised over every point passed in, not just the ones
+    that end up on screen.
+    """
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    depths = np.asarray(depths, dtype=np.float64)
+    chars = np.zeros((height, width), dtype=np.uint8)
+    colors = np.zeros((height, width), dtype=np.uint8)
+    if depths.size == 0:
+        return CellBuffer(chars, colors)
+
+    min_depth = depths.min()
+    max_depth = depths.max()
     depth_range = max_depth - min_depth or 1
     log(f"[\033[94mRENDER\033[0m] Screen size = {width}x{height}")
     log(f"[\033[94mRENDER\033[0m] Depth range: {min_depth} to {max_depth}")
-    log(f"[\033[94mRENDER\033[0m] First few points: {projected_points[:5]}")
-
-    for x, y, depth in projected_points:
-        ix, iy = int(x), int(y)
-        if 0 <= iy < height and 0 <= ix < width:
-            norm = (depth - min_depth) / depth_range  # normalized depth
-            ch = chars[int(norm * (len(chars) - 1))]
-
-            # Assign color based on height
-            if norm < 0.045:
-                color = curses.color_pair(1)
-            elif norm < 0.6:
-                color = curses.color_pair(2)
-            else:
-                color = curses.color_pair(3)
 
+    visible = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+    cell = ys[visible] * width + xs[visible]
+    depth = depths[visible]
+    if cell.size == 0:
+        return CellBuffer(chars, colors)
+
+    # sort by cell, then by depth, and keep the last (deepest) point per cell
+    order = np.lexsort((depth, cell))
+    cell = cell[order]
+    depth = depth[order]
+    last = np.ones(cell.size, dtype=bool)
+    last[:-1] = cell[1:] != cell[:-1]
+    cell = cell[last]
+    norm = (depth[last] - min_depth) / depth_range  # normalized depth
+
+    lut = np.frombuffer(CHARS.encode("ascii"), dtype=np.uint8)
+    chars.ravel()[cell] = lut[(norm * (len(CHARS) - 1)).astype(np.int64)]
+
+    # Assign color based on height
+    colors.ravel()[cell] = np.where(norm < 0.045, 1, np.where(norm < 0.6, 2, 3))
+    return CellBuffer(chars, colors)
+
+
+def draw_cells(buffer, cells):
+    """Write a CellBuffer to a curses window, one addstr per run of one color."""
+    height, width = buffer.getmaxyx()
+    chars = cells.chars[:height, :width]
+    colors = cells.colors[:height, :width]
+    for y in np.flatnonzero(colors.any(axis=1)):
+        row_colors = colors[y].astype(np.int16)
+        row = chars[y].tobytes().replace(b"\0", b" ").decode("ascii")
+        starts = np.flatnonzero(np.diff(row_colors, prepend=-1))
+        ends = np.append(starts[1:], len(row_colors))
+        for start, end in zip(starts, ends):
+            color = row_colors[start]
+            if color == 0:
+                continue
             try:
-                buffer.addch(iy, ix, ch, color)
-            except:
-                pass # silently ignore out-of-bounds
-
-        # Draw center marker
-        try:
-            buffer.addstr(height // 2, width // 2, "X",
-                          curses.color_pair(3))
-        except:
-            log("[ERROR] Failed to draw center marker")
+                buffer.addstr(y, start, row[start:end], curses.color_pair(int(color)))
+            except curses.error:
+                pass  # writing the bottom right cell moves the cursor off screen
+
+
+def render_map(buffer, projected_points):
+    if isinstance(projected_points, CellBuffer):
+        cells = projected_points
+    else:
+        if not projected_points:
+            log("[\033[93mWARN\033[0m] No projected points")
+            return
+        log(f"[\033[94mRENDER\033[0m] First few points: {projected_points[:5]}")
+        xs, ys, depths = np.asarray(projected_points, dtype=np.float64).T
+        height, width = buffer.getmaxyx()
+        cells = rasterize(xs, ys, depths, height, width)
+
+    draw_cells(buffer, cells)
+
+    # Draw center marker
+    height, width = buffer.getmaxyx()
+    try:
+        buffer.addstr(height // 2, width // 2, "X",
+                      curses.color_pair(3))
+    except:
+        log("[ERROR] Failed to draw center marker")
@@ -0,0 +1,143 @@
+"""Multi-resolution cache of decoded ETOPO tiles."""
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+import rasterio
+from earthscii.etopo_loader import sphere_points
+from earthscii.utils import log
+
+# Every stride compute_lod_stride can hand out. A tile is decoded once and
+# written out at all of them, so changing zoom never touches the GeoTIFF again.
+LOD_STRIDES = (2, 4, 8, 16, 32)
+LOD_DIR = Path("./tiles/lod")
+LRU_SIZE = 64
+# seconds before a tile whose download failed (timeout, dropped connection)
+# is tried again, so a flaky network doesn't leave it blank for good
+RETRY_AFTER = 30.0
+
+
+def lod_path(tile_path, stride):
+    return LOD_DIR / f"{Path(tile_path).stem}_s{stride}.npy"
+
+
+def build_pyramid(tile_path, strides=LOD_STRIDES):
+    """Decode a GeoTIFF once and store its sphere points at every stride."""
+    LOD_DIR.mkdir(parents=True, exist_ok=True)
+    log(f"[\033[32mINFO\033[0m] Building LOD pyramid for {tile_path}")
+    with rasterio.open(tile_path) as dataset:
+        elevation = dataset.read(1)
+        transform = dataset.transform
+        nodata = dataset.nodata
+
+    for stride in strides:
+        target = lod_path(tile_path, stride)
+        if target.exists():
+            continue
+        points = sphere_points(elevation, transform, nodata, stride,
+                               dtype=np.float32)
+        # write next to the target and rename, a half written file would
+        # otherwise be picked up as a finished level next time
+        partial = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.partial")
+        try:
+            with open(partial, "wb") as f:
+                np.save(f, points)
+            os.replace(partial, target)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+
+def load_level(tile_path, stride):
+    """Memory map the points of tile_path at stride, building the pyramid first if needed."""
+    target = lod_path(tile_path, stride)
+    if not target.exists():
+        build_pyramid(tile_path)
+    return np.load(target, mmap_mode="r")
+
+
+class TileCache:
+    """
+    LRU of decoded tiles keyed by (lat, lon, stride).
+
+    Values are (N, 3) float32 arrays memory mapped from the LOD pyramid, or
+    None for a tile that does not exist. Keeping the misses means an ocean
+    tile is not asked for again on every redraw. A fetch that raises is not
+    kept, the tile only counts as cached for retry_after seconds and is then
+    fetched again.
+    """
+
+    def __init__(self, fetch, maxsize=LRU_SIZE, retry_after=RETRY_AFTER):
+        # fetch(lat, lon) -> local GeoTIFF path, None if there is no such
+        # tile, raises if it could not be fetched right now
+        self.fetch = fetch
+        self.maxsize = maxsize
+        self.retry_after = retry_after
+        self._tiles = OrderedDict()
+        # (lat, lon) -> time.monotonic() after which a failed fetch is retried
+        self._failed = {}
+        self._lock = threading.Lock()
+        # one lock per (lat, lon) so two strides of the same tile are never
+        # downloaded or decoded at the same time from different threads
+        self._tile_locks = {}
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._tiles or self._failed_recently(key[:2])
+
+    def _failed_recently(self, tile):
+        retry_at = self._failed.get(tile)
+        return retry_at is not None and time.monotonic() < retry_at
+
+    def peek(self, lat, lon, stride):
+        """Cached points of a tile, None if it isn't cached. Never fetches."""
+        key = (lat, lon, stride)
+        with self._lock:
+            points = self._tiles.get(key)
+            if points is not None:
+                self._tiles.move_to_end(key)
+            return points
+
+    def get(self, lat, lon, stride):
+        key = (lat, lon, stride)
+        with self._lock:
+            if key in self._tiles:
+                self._tiles.move_to_end(key)
+                return self._tiles[key]
+
+            tile_lock = self._tile_locks.setdefault((lat, lon), threading.Lock())
+
+        with tile_lock:
+            with self._lock:
+                if key in self._tiles:
+                    # another thread loaded it while we waited
+                    return self._tiles[key]
+                if self._failed_recently((lat, lon)):
+                    return None
+            points = None
+            try:
+                path = self.fetch(lat, lon)
+            except Exception as e:
+                log(f"[\033[31mEXCEPTION\033[0m] Failed to fetch tile {lat}, {lon}, retrying in {self.retry_after:.0f}s: {e}")
+                with self._lock:
+                    self._failed[(lat, lon)] = time.monotonic() + self.retry_after
+                return None
+            with self._lock:
+                self._failed.pop((lat, lon), None)
+            if path:
+                try:
+                    points = load_level(path, stride)
+                except Exception as e:
+                    log(f"[\033[31mEXCEPTION\033[0m] Failed to load {path}: {e}")
+
+            self.put(key, points)
+        return points
+
+    def put(self, key, points):
+        with self._lock:
+            self._tiles[key] = points
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.maxsize:
+                self._tiles.popitem(last=False)
@@ -0,0 +1,157 @@
+import functools
+import importlib
+import os
+import sys
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import Affine
+
+# Add the src directory to the Python path
+src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, src_dir)
+
+TILE_PIXELS = 64
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    """Tile modules with their tile, LOD and log files inside tmp_path."""
+    # globe_tile_manager creates ./tiles on import and log() writes ./debug.log
+    monkeypatch.chdir(tmp_path)
+    tile_cache = importlib.import_module("earthscii.tile_cache")
+    globe_tile_manager = importlib.import_module("earthscii.globe_tile_manager")
+    monkeypatch.setattr(globe_tile_manager, "TILE_DIR", tmp_path / "tiles")
+    monkeypatch.setattr(tile_cache, "LOD_DIR", tmp_path / "lod")
+    (tmp_path / "tiles").mkdir(exist_ok=True)
+    (tmp_path / "source").mkdir()
+    return tile_cache, globe_tile_manager, tmp_path
+
+
+def write_tile(globe_tile_manager, directory, lat, lon):
+    """A small GeoTIFF under the file name the ETOPO source uses."""
+    path = directory / globe_tile_manager.etopo2022_filename(lat, lon)
+    rng = np.random.default_rng(abs(lat) * 1000 + abs(lon))
+    elevation = rng.integers(-5000, 5000, (TILE_PIXELS, TILE_PIXELS)).astype(np.int16)
+    elevation[0, :] = -32768
+    # one degree square, north up
+    transform = Affine(1 / TILE_PIXELS, 0, lon, 0, -1 / TILE_PIXELS, lat + 1)
+    with rasterio.open(path, "w", driver="GTiff", height=TILE_PIXELS, width=TILE_PIXELS,
+                       count=1, dtype="int16", transform=transform, nodata=-32768) as dataset:
+        dataset.write(elevation, 1)
+    return path
+
+
+def directory_fetch(globe_tile_manager, source, calls):
+    """download_etopo2022_tile against a local directory, counting the calls."""
+    def fetch(lat, lon):
+        calls.append((lat, lon))
+        return globe_tile_manager.download_etopo2022_tile(lat, lon, source=str(source))
+    return fetch
+
+
+def test_build_pyramid_matches_sphere_points(env):
+    tile_cache, globe_tile_manager, tmp_path = env
+    path = write_tile(globe_tile_manager, tmp_path / "source", 10, 20)
+
+    tile_cache.build_pyramid(path)
+
+    with rasterio.open(path) as dataset:
+        elevation = dataset.read(1)
+        transform = dataset.transform
+    for stride in tile_cache.LOD_STRIDES:
+        points = tile_cache.load_level(path, stride)
+        expected = tile_cache.sphere_points(elevation, transform, -32768, stride, dtype=np.float32)
+        assert points.dtype == np.float32
+        np.testing.assert_array_equal(points, expected)
+    assert sorted(os.listdir(tmp_path / "lod")) == sorted(
+        tile_cache.lod_path(path, stride).name for stride in tile_cache.LOD_STRIDES)
+
+
+def test_build_pyramid_leaves_no_partial_files(env, monkeypatch):
+    tile_cache, globe_tile_manager, tmp_path = env
+    path = write_tile(globe_tile_manager, tmp_path / "source", 10, 20)
+    real_save = np.save
+
+    def failing_save(file, points):
+        if points.shape[0] < 200:
+            # a write that dies halfway, at the coarser levels
+            file.write(b"\x93NUMPY")
+            raise OSError("disk full")
+        real_save(file, points)
+
+    monkeypatch.setattr(tile_cache.np, "save", failing_save)
+    with pytest.raises(OSError):
+        tile_cache.build_pyramid(path)
+    # only finished levels were renamed into place, and nothing else is left behind
+    finished = os.listdir(tmp_path / "lod")
+    assert finished and all(name.endswith(".npy") for name in finished)
+    for name in finished:
+        assert np.load(tmp_path / "lod" / name).shape[1] == 3
+
+    monkeypatch.setattr(tile_cache.np, "save", real_save)
+    tile_cache.build_pyramid(path)
+    assert len(os.listdir(tmp_path / "lod")) == len(tile_cache.LOD_STRIDES)
+
+
+def test_tile_cache_evicts_least_recently_used(env):
+    tile_cache, globe_tile_manager, tmp_path = env
+    for lat, lon in ((0, 0), (0, 1), (1, 0)):
+        write_tile(globe_tile_manager, tmp_path / "source", lat, lon)
+    calls = []
+    cache = tile_cache.TileCache(directory_fetch(globe_tile_manager, tmp_path / "source", calls), maxsize=2)
+
+    assert cache.get(0, 0, 8) is not None
+    assert cache.get(0, 1, 8) is not None
+    cache.get(0, 0, 8)  # (0, 1) is now the oldest
+    assert cache.get(1, 0, 8) is not None
+    assert (0, 0, 8) in cache and (1, 0, 8) in cache
+    assert (0, 1, 8) not in cache
+    assert cache.peek(0, 1, 8) is None
+
+    assert cache.get(0, 1, 8) is not None
+    assert calls == [(0, 0), (0, 1), (1, 0), (0, 1)]
+    # tiles are copied out of the source whole, no partial download is left
+    assert not [name for name in os.listdir(tmp_path / "tiles") if name.endswith(".partial")]
+
+
+def test_missing_tile_is_cached(env):
+    tile_cache, globe_tile_manager, tmp_path = env
+    calls = []
+    cache = tile_cache.TileCache(directory_fetch(globe_tile_manager, tmp_path / "source", calls))
+
+    # not in the source at all, like an ocean tile
+    assert cache.get(-40, -150, 8) is None
+    assert cache.get(-40, -150, 8) is None
+    assert (-40, -150, 8) in cache
+    assert calls == [(-40, -150)]
+
+
+def test_failed_fetch_is_retried_after_retry_after(env, monkeypatch):
+    tile_cache, globe_tile_manager, tmp_path = env
+    write_tile(globe_tile_manager, tmp_path / "source", 5, 5)
+    clock = [1000.0]
+    monkeypatch.setattr(tile_cache.time, "monotonic", lambda: clock[0])
+    calls = []
+    fetch_from_source = directory_fetch(globe_tile_manager, tmp_path / "source", calls)
+    failures = [TimeoutError("timed out")]
+
+    def flaky_fetch(lat, lon):
+        if failures:
+            calls.append((lat, lon))
+            raise failures.pop()
+        return fetch_from_source(lat, lon)
+
+    cache = tile_cache.TileCache(flaky_fetch)
+    assert cache.get(5, 5, 8) is None
+    # counts as cached until RETRY_AFTER, so redraws don't fetch again
+    assert (5, 5, 8) in cache
+    assert cache.get(5, 5, 16) is None
+    assert calls == [(5, 5)]
+
+    clock[0] += tile_cache.RETRY_AFTER + 1
+    assert (5, 5, 8) not in cache
+    points = cache.get(5, 5, 8)
+    assert points is not None and len(points) > 0
+    assert calls == [(5, 5), (5, 5)]
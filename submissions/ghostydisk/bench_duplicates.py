@@ -0,0 +1,108 @@
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from utils import hash_file
+from duplicates import find_duplicates
+from display import format_size
+
+# Quick benchmark for the duplicate engine.
+# Builds a synthetic tree and compares the old "hash every file" path with
+# the size -> partial hash -> full hash pipeline.
+#
+#   python bench_duplicates.py --files 5000 --workers 8
+
+
+def build_tree(root, n_files, seed=1337):
+    rng = random.Random(seed)
+    # a handful of common sizes so stage 1 can't settle everything on its own
+    sizes = [0, 512, 4 * 1024, 200 * 1024, 1024 * 1024, 3 * 1024 * 1024]
+    originals = []
+    files = []
+
+    for i in range(n_files):
+        folder = os.path.join(root, f"dir_{i % 50:02d}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"file_{i}.bin")
+        roll = rng.random()
+
+        if originals and roll < 0.15:
+            # exact copy of an earlier file
+            with open(rng.choice(originals), 'rb') as f:
+                data = f.read()
+        elif originals and roll < 0.25:
+            # same size and same head/tail as an earlier file, different middle
+            with open(rng.choice(originals), 'rb') as f:
+                data = bytearray(f.read())
+            if len(data) > 256 * 1024:
+                data[len(data) // 2] ^= 0xFF
+            data = bytes(data)
+        elif roll < 0.6:
+            data = rng.randbytes(rng.choice(sizes))
+        else:
+            data = rng.randbytes(rng.randint(1, 2 * 1024 * 1024))
+
+        with open(path, 'wb') as f:
+            f.write(data)
+        originals.append(path)
+        files.append((path, len(data)))
+
+    return files
+
+
+def legacy_duplicates(files, algorithm='md5'):
+    hashes = {}
+    dups = {}
+    for path, _ in files:
+        h = hash_file(path, algorithm=algorithm)
+        if h in hashes:
+            dups.setdefault(h, [hashes[h]]).append(path)
+        else:
+            hashes[h] = path
+    return dups, sum(size for _, size in files)
+
+
+def normalize(dups):
+    return sorted(sorted(paths) for paths in dups.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GhostyDisk duplicate detection")
+    parser.add_argument('--files', type=int, default=2000, help='Number of synthetic files')
+    parser.add_argument('--workers', type=int, default=None, help='Hash workers for the new engine')
+    parser.add_argument('--pool', type=str, choices=['thread', 'process'], default='thread')
+    parser.add_argument('--hash-algo', type=str, choices=['md5', 'sha1', 'sha256'], default='md5')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="ghostydisk_bench_")
+    try:
+        print(f"Building {args.files} files in {root} ...")
+        files = build_tree(root, args.files)
+        print(f"Tree size: {format_size(sum(size for _, size in files))}\n")
+
+        start = time.perf_counter()
+        old, old_bytes = legacy_duplicates(files, args.hash_algo)
+        old_time = time.perf_counter() - start
+
+        stats = {}
+        start = time.perf_counter()
+        new = find_duplicates(files, algorithm=args.hash_algo, workers=args.workers, executor=args.pool, stats=stats)
+        new_time = time.perf_counter() - start
+
+        print(f"{'':<12}{'wall time':>12}{'bytes read':>16}{'dup sets':>10}")
+        print(f"{'hash all':<12}{old_time:>11.2f}s{format_size(old_bytes):>16}{len(old):>10}")
+        print(f"{'staged':<12}{new_time:>11.2f}s{format_size(stats['bytes_read']):>16}{len(new):>10}")
+        print(f"\nSpeedup: {old_time / max(new_time, 1e-9):.1f}x, "
+              f"read {100 * stats['bytes_read'] / max(old_bytes, 1):.1f}% of the bytes")
+
+        if normalize(old) != normalize(new):
+            print("WARNING: duplicate sets differ between the two paths!")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -230,6 +230,25 @@ def show_scan_summary(results, scan_path):
           border_style="blue", box=box.ROUNDED))
 
 
+def show_scan_changes(changes, scan_path):
+    if changes["first_scan"]:
+        note_print(f"No previous scan of {scan_path} in the index yet, this one will be the baseline.")
+        return
+
+    table = Table(box=box.ROUNDED, show_header=True, header_style="bold")
+    table.add_column("Change", width=10)
+    table.add_column("Path")
+    for path in changes["new"]:
+        table.add_row("[green]+ new[/green]", escape(format_path(path, 80)))
+    for path in changes["vanished"]:
+        table.add_row("[red]- gone[/red]", escape(format_path(path, 80)))
+
+    print("\n")
+    print(Panel(table if changes["new"] or changes["vanished"] else "Nothing changed since the last scan.",
+          title=f"🔁 Since Last Scan ({len(changes['new'])} new, {len(changes['vanished'])} vanished)",
+          border_style="blue", box=box.ROUNDED))
+
+
 # I hate this function but it works - some day I'll rewrite it
 def get_key():
     fd = sys.stdin.fileno()
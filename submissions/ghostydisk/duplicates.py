@@ -0,0 +1,136 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from utils import get_hasher, hash_file, hash_file_partial, partial_hash_bytes, PARTIAL_HASH_BLOCK
+
+# Duplicate detection in three stages, cheapest first:
+#   1. group by exact size (free, we already stat every file)
+#   2. hash the head + tail block of files that share a size
+#   3. fully hash only what still collides after stage 2
+# Most files have a unique size, so they are never opened at all.
+
+HASH_EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+
+def _safe_full_hash(job):
+    path, algorithm = job
+    try:
+        return hash_file(path, algorithm=algorithm)
+    except Exception:
+        return None
+
+
+def _safe_partial_hash(job):
+    path, size, algorithm = job
+    try:
+        return hash_file_partial(path, size, algorithm=algorithm)
+    except Exception:
+        return None
+
+
+def _group(keys, paths):
+    groups = {}
+    for key, path in zip(keys, paths):
+        if key is not None:
+            groups.setdefault(key, []).append(path)
+    return {k: v for k, v in groups.items() if len(v) > 1}
+
+
+def _cached(index, paths, algorithm, which):
+    if index is None:
+        return [None] * len(paths)
+    return [index.get_hashes(path, algorithm)[which] for path in paths]
+
+
+def _hash_missing(pool, func, jobs, cached, chunksize):
+    # only send the jobs without a cached hash to the pool
+    todo = [job for job, h in zip(jobs, cached) if h is None]
+    fresh = iter(pool.map(func, todo, chunksize=chunksize)) if todo else iter(())
+    return [h if h is not None else next(fresh) for h in cached], todo
+
+
+def find_duplicates(files, algorithm='md5', workers=None, executor='thread', stats=None, index=None):
+    """
+    files is an iterable of (path, size) tuples. Returns {hash: [paths]}
+    for every set of identical files, same shape scan_all always returned.
+
+    Pass a dict as stats to get 'bytes_read' and 'files_hashed' back.
+    Pass a ScanIndex as index to reuse hashes of files that didn't change
+    since the last scan, and to remember the new ones.
+    """
+    if executor not in HASH_EXECUTORS:
+        raise ValueError(f"Unsupported hash executor: {executor}. Supported executors are: {', '.join(HASH_EXECUTORS.keys())}")
+    get_hasher(algorithm)  # fail early on a bad algorithm, not inside a worker
+
+    if stats is None:
+        stats = {}
+    stats.setdefault('bytes_read', 0)
+    stats.setdefault('files_hashed', 0)
+
+    # Stage 1 - size buckets
+    by_size = {}
+    for path, size in files:
+        by_size.setdefault(size, []).append(path)
+
+    duplicates = {}
+    partial_jobs = []
+    for size, paths in by_size.items():
+        if len(paths) < 2:
+            continue
+        if size == 0:
+            # every empty file is a duplicate of every other one
+            duplicates.setdefault(get_hasher(algorithm).hexdigest(), []).extend(paths)
+            continue
+        partial_jobs.extend((path, size, algorithm) for path in paths)
+
+    if not partial_jobs:
+        return duplicates
+
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    with HASH_EXECUTORS[executor](max_workers=workers) as pool:
+        # Stage 2 - head/tail hash within each size bucket
+        chunksize = 1 if executor == 'thread' else max(1, len(partial_jobs) // (workers * 4))
+        partial_paths = [path for path, _, _ in partial_jobs]
+        partial_hashes, hashed = _hash_missing(pool, _safe_partial_hash, partial_jobs,
+                                               _cached(index, partial_paths, algorithm, 0), chunksize)
+        stats['files_hashed'] += len(hashed)
+        stats['bytes_read'] += sum(partial_hash_bytes(size) for _, size, _ in hashed)
+        if index is not None:
+            for path, h in zip(partial_paths, partial_hashes):
+                index.set_hashes(path, algorithm, partial_hash=h)
+
+        keys = [(size, h) if h is not None else None for (_, size, _), h in zip(partial_jobs, partial_hashes)]
+        candidates = _group(keys, partial_paths)
+
+        full_jobs = []
+        full_sizes = {}
+        for (size, partial), paths in candidates.items():
+            if size <= 2 * PARTIAL_HASH_BLOCK:
+                # the partial hash already covered the whole file
+                duplicates.setdefault(partial, []).extend(paths)
+                if index is not None:
+                    for path in paths:
+                        index.set_hashes(path, algorithm, full_hash=partial)
+                continue
+            full_jobs.extend((path, algorithm) for path in paths)
+            full_sizes.update((path, size) for path in paths)
+
+        # Stage 3 - full hash of the survivors
+        if full_jobs:
+            chunksize = 1 if executor == 'thread' else max(1, len(full_jobs) // (workers * 4))
+            full_paths = [path for path, _ in full_jobs]
+            full_hashes, hashed = _hash_missing(pool, _safe_full_hash, full_jobs,
+                                                _cached(index, full_paths, algorithm, 1), chunksize)
+            stats['files_hashed'] += len(hashed)
+            stats['bytes_read'] += sum(full_sizes[path] for path, _ in hashed)
+            if index is not None:
+                for path, h in zip(full_paths, full_hashes):
+                    index.set_hashes(path, algorithm, full_hash=h)
+
+            for h, paths in _group(full_hashes, full_paths).items():
+                duplicates.setdefault(h, []).extend(paths)
+
+    return duplicates
@@ -1,7 +1,8 @@
 from time import sleep
 from typing import Any, Dict
 from scanner import scan_all
-from display import animate_ghost_logo, logo, MultiSelectList, ScrollableList, display_results, display_options, interactive_display_options, clear, center_print, error_print, show_details, show_scan_summary, show_thank_you_message, success_print, note_print, cyberbunk_display_options, console
+from scan_index import ScanIndex, DEFAULT_INDEX_PATH
+from display import animate_ghost_logo, logo, MultiSelectList, ScrollableList, display_results, display_options, interactive_display_options, clear, center_print, error_print, show_details, show_scan_summary, show_thank_you_message, show_scan_changes, success_print, note_print, cyberbunk_display_options, console
 from colorama import Fore
 from rich.prompt import Prompt
 import os
@@ -447,10 +448,14 @@ def parse_arguments():
     parser.add_argument('--export', type=str, help='Export report to file')
     parser.add_argument('--hash-algo', type=str, choices=['md5', 'sha1'], help='Choose hash algo for duplicates')
     parser.add_argument('--exclude', type=str, help='Read exclude patterns from txt/json')
+    parser.add_argument('--hash-workers', type=int, help='Number of workers used to hash duplicate candidates')
+    parser.add_argument('--hash-pool', type=str, choices=['thread', 'process'], default='thread', help='Hash duplicates on a thread or process pool')
+    parser.add_argument('--index', type=str, nargs='?', const=DEFAULT_INDEX_PATH, help=f'Keep a scan index so rescans only hash changed files (default: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--since-last-scan', action='store_true', help='Report files that appeared or vanished since the last indexed scan')
     return parser.parse_args()
 
 def should_show_ui(args):
-    action_args = ['ghost', 'delete', 'dry_run', 'export']
+    action_args = ['ghost', 'delete', 'dry_run', 'export', 'since_last_scan']
     has_actions = any(getattr(args, arg, False) for arg in action_args)
     
     return not has_actions
@@ -530,6 +535,10 @@ def main():
 
     # Handle action arguments
     if args.ghost or args.large or args.old or not args.no_dupes:
+        index = None
+        if args.index or args.since_last_scan:
+            index = ScanIndex(args.index)
+
         scan_result = scan_all(
             working_directory,
             live_ui=True,
@@ -540,8 +549,17 @@ def main():
             scan_old=args.old is not None,
             scan_duplicates=not args.no_dupes,
             hash_algo=args.hash_algo or 'md5',
-            exclude_patterns=args.exclude
+            exclude_patterns=args.exclude,
+            hash_workers=args.hash_workers,
+            hash_executor=args.hash_pool,
+            index=index
         )
+
+        if index is not None:
+            index.close()
+
+        if args.since_last_scan:
+            show_scan_changes(scan_result["changes"], working_directory)
         
         if args.dry_run:
             note_print("Dry run: No files will be deleted.")
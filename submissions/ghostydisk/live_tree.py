@@ -0,0 +1,86 @@
+import heapq
+import os
+from rich.tree import Tree
+
+# Incrementally updated directory tree for the live scan UI.
+# bld_tree re-lists the whole hierarchy from disk, which is fine once but
+# way too slow to call for every scanned file. This model is fed the files
+# as the walker yields them and is only turned into a rich Tree when the UI
+# actually draws a frame.
+
+STATUS_STYLES = [
+    ('is_ghost', 'magenta'),
+    ('is_large', 'yellow'),
+    ('is_old', 'red'),
+    ('is_duplicate', 'blue'),
+]
+
+
+class _Node:
+    __slots__ = ('dirs', 'files')
+
+    def __init__(self):
+        self.dirs = {}
+        self.files = {}
+
+
+class LiveTree:
+    def __init__(self, start_path, max_depth=2, max_entries=40):
+        self.start_path = start_path
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        self.root = _Node()
+
+    def _parts(self, path):
+        # the walker builds paths by joining onto start_path, so a prefix
+        # strip is enough and a lot cheaper than os.path.relpath
+        if path.startswith(self.start_path):
+            rel = path[len(self.start_path):].lstrip(os.sep)
+        else:
+            rel = os.path.relpath(path, self.start_path)
+        return rel.split(os.sep)
+
+    def add(self, path, status):
+        parts = self._parts(path)
+        node = self.root
+        for depth, part in enumerate(parts[:-1]):
+            node = node.dirs.setdefault(part, _Node())
+            if depth + 1 >= self.max_depth:
+                # deeper than we draw, having the folder in the tree is enough
+                return
+        node.files[parts[-1]] = status
+
+    def mark(self, path, flag):
+        parts = self._parts(path)
+        node = self.root
+        for part in parts[:-1]:
+            node = node.dirs.get(part)
+            if node is None:
+                return
+        if parts[-1] in node.files:
+            node.files[parts[-1]][flag] = True
+
+    def _fill(self, tree, node, depth):
+        # only the first max_entries names are drawn, so a folder with a huge
+        # number of files isn't fully sorted again on every frame
+        shown = 0
+        for name in heapq.nsmallest(self.max_entries, node.dirs):
+            subtree = tree.add(f"📁 {name}")
+            if depth + 1 < self.max_depth:
+                self._fill(subtree, node.dirs[name], depth + 1)
+            shown += 1
+
+        for name in heapq.nsmallest(self.max_entries - shown, node.files):
+            status = node.files[name]
+            style = next((style for flag, style in STATUS_STYLES if status.get(flag)), 'green')
+            tree.add(f"[{style}]📄 {name}[/{style}]")
+            shown += 1
+
+        rest = len(node.dirs) + len(node.files) - shown
+        if rest > 0:
+            tree.add(f"[dim]… {rest} more[/dim]")
+
+    def render(self):
+        tree = Tree(f"📁 {os.path.basename(self.start_path) or self.start_path}")
+        self._fill(tree, self.root, 0)
+        return tree
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import time
+
+# Persistent index of what we saw on the last scan, so a rescan only has to
+# hash files whose (size, mtime, inode) changed since then.
+# One SQLite file holds every root that was ever scanned, keyed by path.
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ghostydisk", "index.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    algo TEXT,
+    partial_hash TEXT,
+    full_hash TEXT,
+    last_seen REAL NOT NULL
+)
+"""
+
+
+class ScanIndex:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or DEFAULT_INDEX_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+        # Everything is loaded up front: a single SELECT is a lot faster than
+        # one query per file when the tree has millions of entries.
+        # path -> [size, mtime_ns, inode, algo, partial_hash, full_hash]
+        self.previous = {
+            row[0]: list(row[1:])
+            for row in self.conn.execute(
+                "SELECT path, size, mtime_ns, inode, algo, partial_hash, full_hash FROM files")
+        }
+        self.current = {}
+
+    def record(self, path, st):
+        """Note that path exists with stat result st. Cached hashes survive only if the metadata didn't change."""
+        path = os.path.abspath(path)
+        meta = [st.st_size, st.st_mtime_ns, st.st_ino]
+        old = self.previous.get(path)
+        if old is not None and old[:3] == meta:
+            self.current[path] = old
+        else:
+            self.current[path] = meta + [None, None, None]
+
+    def get_hashes(self, path, algorithm):
+        """Returns (partial_hash, full_hash) cached for path, either may be None."""
+        entry = self.current.get(os.path.abspath(path))
+        if entry is None or entry[3] != algorithm:
+            return None, None
+        return entry[4], entry[5]
+
+    def set_hashes(self, path, algorithm, partial_hash=None, full_hash=None):
+        entry = self.current.get(os.path.abspath(path))
+        if entry is None:
+            return
+        if entry[3] != algorithm:
+            entry[3:6] = [algorithm, None, None]
+        if partial_hash is not None:
+            entry[4] = partial_hash
+        if full_hash is not None:
+            entry[5] = full_hash
+
+    def changes(self, root):
+        """Paths under root that appeared or vanished since the last saved scan."""
+        prefix = os.path.join(os.path.abspath(root), "")
+        known = [p for p in self.previous if p.startswith(prefix)]
+        new = sorted(p for p in self.current if p not in self.previous)
+        vanished = sorted(p for p in known if p not in self.current)
+        # on the very first scan of a root everything would show up as "new"
+        return {"first_scan": not known, "new": new, "vanished": vanished}
+
+    def save(self, root=None):
+        """Write this scan back. Vanished files under root are dropped from the index."""
+        now = time.time()
+        vanished = self.changes(root)["vanished"] if root is not None else []
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in vanished))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((path, *entry, now) for path, entry in self.current.items()))
+        for p in vanished:
+            self.previous.pop(p, None)
+        self.previous.update(self.current)
+
+    def close(self):
+        self.conn.close()
@@ -1,6 +1,10 @@
 import os
+import time
 from os.path import isfile, isdir
-from utils import get_file_size, get_file_age, hash_file
+from utils import get_file_size, get_file_age
+from duplicates import find_duplicates
+from walker import walk_files, ExcludeMatcher
+from live_tree import LiveTree
 from tqdm import tqdm
 from rich.console import Group
 from rich.live import Live
@@ -12,6 +16,9 @@ from rich.tree import Tree
 
 GHOSTY_EXTENSIONS = [".tmp", ".bak", ".swp"]
 
+# how often the live UI redraws while scanning, independent of how fast files come in
+UI_FRAMES_PER_SECOND = 10
+
 DEFAULT_EXCLUDE_PATTERNS = [
     # Version control
     '.git',
@@ -117,20 +124,12 @@ def scan_large_files(start_path, start_size=50 * 1024 * 1024, progress=False):
     size = None
 
     if isdir(start_path):
-        all_files = []
-        for root, _, files in os.walk(start_path):
-            for name in files:
-                all_files.append(os.path.join(root, name))
-
-        iterator = tqdm(all_files, desc="Scanning Large Files") if progress else all_files
+        files = walk_files(start_path)
+        iterator = tqdm(files, desc="Scanning Large Files") if progress else files
 
-        for path in iterator:
-            try:
-                size = get_file_size(path)
-                if size > start_size:
-                    sizes.append((path, size))
-            except Exception:
-                continue
+        for path, st in iterator:
+            if st.st_size > start_size:
+                sizes.append((path, st.st_size))
     else:
         sizer = get_file_size(start_path)
         if sizer > 50 * 1024 * 1024:
@@ -142,20 +141,14 @@ def scan_old_files(start_path, progress=False):
     results = []
 
     if isdir(start_path):
-        all_files = []
-        for root, _, files in os.walk(start_path):
-            for name in files:
-                all_files.append(os.path.join(root, name))
-
-        iterator = tqdm(all_files, desc="Scanning Old Files") if progress else all_files
-
-        for path in iterator:
-            try:
-                age = get_file_age(path)
-                if age > 180 * 24 * 3600:
-                    results.append((path, age))
-            except Exception:
-                continue
+        files = walk_files(start_path)
+        iterator = tqdm(files, desc="Scanning Old Files") if progress else files
+
+        now = time.time()
+        for path, st in iterator:
+            age = now - st.st_mtime
+            if age > 180 * 24 * 3600:
+                results.append((path, age))
     else:
         age = get_file_age(start_path)
         if age > 180 * 24 * 3600:
@@ -163,28 +156,12 @@ def scan_old_files(start_path, progress=False):
 
     return results if len(results) > 1 else results[0] if len(results) > 0 else None
 
-def scan_duplicates(start_path, progress=False):
-    hashes = {}
-    dups = {}
+def scan_duplicates(start_path, progress=False, hash_algo='md5', workers=None, executor='thread'):
+    files = walk_files(start_path)
+    iterator = tqdm(files, desc="Scanning Duplicates") if progress else files
 
-    all_files = []
-    for root, _, files in os.walk(start_path):
-        for name in files:
-            all_files.append(os.path.join(root, name))
-
-    iterator = tqdm(all_files, desc="Scanning Duplicates") if progress else all_files
-
-    for full_path in iterator:
-        try:
-            h = hash_file(full_path)
-            if h in hashes:
-                dups.setdefault(h, [hashes[h]]).append(full_path)
-            else:
-                hashes[h] = full_path
-        except Exception:
-            continue
-
-    return dups
+    sized = [(full_path, st.st_size) for full_path, st in iterator]
+    return find_duplicates(sized, algorithm=hash_algo, workers=workers, executor=executor)
 
 
 def scan_all(start_path, progress=False, live_ui=False, 
@@ -195,7 +172,10 @@ def scan_all(start_path, progress=False, live_ui=False,
              scan_old=True,
              scan_duplicates=True,
              hash_algo='md5',
-             exclude_patterns=None):
+             exclude_patterns=None,
+             hash_workers=None,
+             hash_executor='thread',
+             index=None):
 
     results = {
         "ghosts": [],
@@ -203,8 +183,7 @@ def scan_all(start_path, progress=False, live_ui=False,
         "old": [],
         "duplicates": {}
     }
-    hashes = {}
-    scanned_files = {}
+    dup_candidates = []
 
     # Combine default exclusions with user's ones
     if exclude_patterns is None:
@@ -219,18 +198,9 @@ def scan_all(start_path, progress=False, live_ui=False,
     else:
         exclude_patterns = DEFAULT_EXCLUDE_PATTERNS + exclude_patterns
 
-    all_files = []
-    for root, _, files in os.walk(start_path):
-        # Skip excluded dirs
-        if any(pattern in root for pattern in exclude_patterns):
-            continue
-            
-        for name in files:
-            full_path = os.path.join(root, name)
-            # Skip excluded files
-            if any(pattern in full_path or name.endswith(pattern.lstrip('*')) for pattern in exclude_patterns):
-                continue
-            all_files.append(full_path)
+    # Files are streamed straight from the walker into the checks below,
+    # excluded directories never get descended into
+    files = walk_files(start_path, ExcludeMatcher(exclude_patterns))
 
     if live_ui:
         progress_bar = Progress(
@@ -239,23 +209,39 @@ def scan_all(start_path, progress=False, live_ui=False,
             TimeElapsedColumn(),
             expand=True
         )
-        task = progress_bar.add_task("Scan", total=len(all_files))
-        
+        # total isn't known up front anymore, the bar just pulses until we're done
+        task = progress_bar.add_task("Scan", total=None)
+
+        tree = LiveTree(start_path)
         layout = Layout()
         layout.split_row(
-            Layout(Panel(bld_tree(start_path, scanned_files=scanned_files), title="📁 Directory Tree", border_style="magenta"), name="left", ratio=2),
+            Layout(Panel(tree.render(), title="📁 Directory Tree", border_style="magenta"), name="left", ratio=2),
             Layout(name="right", ratio=3)
         )
 
         scanned = ghost = large = old = duplicates = 0
-
-        with Live(layout, refresh_per_second=10, screen=True):
-            for path in all_files:
+        frame_interval = 1 / UI_FRAMES_PER_SECOND
+
+        def draw(current_file=None):
+            progress_bar.update(task, completed=scanned)
+            layout["left"].update(Panel(tree.render(), title="📁 Directory Tree", border_style="magenta"))
+            right_panel = drw_r_panel(progress_bar, scanned, ghost, large, old, duplicates, current_file=current_file)
+            layout["right"].update(Panel(right_panel, border_style="cyan"))
+            live.refresh()
+
+        # The scan loop only updates the tree model and the counters. The
+        # layout is rebuilt at most UI_FRAMES_PER_SECOND times a second.
+        with Live(layout, auto_refresh=False, screen=True) as live:
+            next_frame = 0
+            now = time.time()
+            for path, st in files:
                 try:
-                    size = get_file_size(path)
-                    age = get_file_age(path)
+                    size = st.st_size
+                    age = now - st.st_mtime
                     ext = os.path.splitext(path)[1].lower()
                     file_status = {}
+                    if index is not None:
+                        index.record(path, st)
 
                     if scan_ghosts and ext in GHOSTY_EXTENSIONS:
                         results["ghosts"].append((path, size, age))
@@ -273,33 +259,40 @@ def scan_all(start_path, progress=False, live_ui=False,
                         file_status['is_old'] = True
                     
                     if scan_duplicates:
-                        file_hash = hash_file(path, algorithm=hash_algo)
-                        if file_hash in hashes:
-                            if file_hash not in results["duplicates"]:
-                                results["duplicates"][file_hash] = [hashes[file_hash]]
-                                duplicates += 1
-                            results["duplicates"][file_hash].append(path)
-                            file_status['is_duplicate'] = True
-                        else:
-                            hashes[file_hash] = path
+                        dup_candidates.append((path, size))
                     
-                    scanned_files[path] = file_status
+                    tree.add(path, file_status)
+                    scanned += 1
                 except Exception:
                     continue
                 finally:
-                    scanned += 1
-                    progress_bar.update(task, advance=1)
-                    layout["left"].update(Panel(bld_tree(start_path, scanned_files=scanned_files), title="📁 Directory Tree", border_style="magenta"))
-                    right_panel = drw_r_panel(progress_bar, scanned, ghost, large, old, duplicates, current_file=path)
-                    layout["right"].update(Panel(right_panel, border_style="cyan"))
+                    tick = time.monotonic()
+                    if tick >= next_frame:
+                        now = time.time()
+                        next_frame = tick + frame_interval
+                        draw(current_file=path)
+
+            progress_bar.update(task, total=scanned)
+
+            if scan_duplicates:
+                draw(current_file="hashing duplicate candidates...")
+                results["duplicates"] = find_duplicates(dup_candidates, algorithm=hash_algo, workers=hash_workers, executor=hash_executor, index=index)
+                duplicates = len(results["duplicates"])
+                for paths in results["duplicates"].values():
+                    for dup_path in paths:
+                        tree.mark(dup_path, 'is_duplicate')
+
+            draw()
         
     else:
-        iterator = tqdm(all_files, desc="Full Scan") if progress else all_files
-        for path in iterator:
+        iterator = tqdm(files, desc="Full Scan") if progress else files
+        for path, st in iterator:
             try:
-                size = get_file_size(path)
-                age = get_file_age(path)
+                size = st.st_size
+                age = time.time() - st.st_mtime
                 ext = os.path.splitext(path)[1].lower()
+                if index is not None:
+                    index.record(path, st)
 
                 if scan_ghosts and ext in GHOSTY_EXTENSIONS:
                     results["ghosts"].append((path, size, age))
@@ -311,12 +304,15 @@ def scan_all(start_path, progress=False, live_ui=False,
                     results["old"].append((path, age))
                 
                 if scan_duplicates:
-                    file_hash = hash_file(path, algorithm=hash_algo)
-                    if file_hash in hashes:
-                        results["duplicates"].setdefault(file_hash, []).append(path)
-                    else:
-                        hashes[file_hash] = path
+                    dup_candidates.append((path, size))
             except Exception:
                 continue
 
+        if scan_duplicates:
+            results["duplicates"] = find_duplicates(dup_candidates, algorithm=hash_algo, workers=hash_workers, executor=hash_executor, index=index)
+
+    if index is not None:
+        results["changes"] = index.changes(start_path)
+        index.save(start_path)
+
     return results
@@ -18,17 +18,24 @@ def get_file_age(path):
     return time.time() - last_modified
 
 
+HASH_ALGORITHMS = {
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha256': hashlib.sha256
+}
+
+# how much of the head and tail we read for the cheap duplicate pre-check
+PARTIAL_HASH_BLOCK = 64 * 1024
+
+
+def get_hasher(algorithm='md5'):
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm: {algorithm}. Supported algorithms are: {', '.join(HASH_ALGORITHMS.keys())}")
+    return HASH_ALGORITHMS[algorithm]()
+
+
 def hash_file(path, algorithm='md5'):
-    hash_algorithms = {
-        'md5': hashlib.md5,
-        'sha1': hashlib.sha1,
-        'sha256': hashlib.sha256
-    }
-    
-    if algorithm not in hash_algorithms:
-        raise ValueError(f"Unsupported hash algorithm: {algorithm}. Supported algorithms are: {', '.join(hash_algorithms.keys())}")
-    
-    hasher = hash_algorithms[algorithm]()
+    hasher = get_hasher(algorithm)
     
     try:
         with open(path, 'rb') as f:
@@ -41,6 +48,28 @@ def hash_file(path, algorithm='md5'):
         raise Exception(f"Error calculating hash for {path}: {str(e)}")
 
 
+def hash_file_partial(path, size, algorithm='md5', block_size=PARTIAL_HASH_BLOCK):
+    # Hashes only the first and last block of the file. Two files with a
+    # different partial hash can't be duplicates, so this weeds out most
+    # same-size candidates without reading them fully.
+    hasher = get_hasher(algorithm)
+
+    try:
+        with open(path, 'rb') as f:
+            hasher.update(f.read(block_size))
+            if size > block_size:
+                f.seek(max(block_size, size - block_size))
+                hasher.update(f.read(block_size))
+        return hasher.hexdigest()
+    except Exception as e:
+        raise Exception(f"Error calculating partial hash for {path}: {str(e)}")
+
+
+def partial_hash_bytes(size, block_size=PARTIAL_HASH_BLOCK):
+    # bytes hash_file_partial reads for a file of the given size
+    return min(size, 2 * block_size)
+
+
 def results_to_list(results, show_both_duplicates=False, kind=False):
     out = []
 
@@ -0,0 +1,78 @@
+import os
+import re
+import fnmatch
+
+# os.scandir based tree walker.
+# Excluded directories are pruned before we descend into them, and the stat
+# result of every DirEntry is handed to the caller so nobody has to stat again.
+
+
+class ExcludeMatcher:
+    """
+    All exclude patterns compiled into one regex.
+
+    Patterns are globs ('node_modules', '*.log', 'build*') matched against a
+    single file or directory name. Patterns with a '/' in them are matched
+    against the path relative to the scan root instead ('assets/*.psd').
+    """
+
+    def __init__(self, patterns):
+        name_patterns = []
+        path_patterns = []
+        for pattern in patterns or []:
+            pattern = pattern.strip().rstrip('/')
+            if not pattern:
+                continue
+            if '/' in pattern:
+                path_patterns.append(fnmatch.translate(pattern.lstrip('/')))
+            else:
+                name_patterns.append(fnmatch.translate(pattern))
+
+        self._name = re.compile('|'.join(name_patterns)) if name_patterns else None
+        self._path = re.compile('|'.join(path_patterns)) if path_patterns else None
+
+    def __bool__(self):
+        return self._name is not None or self._path is not None
+
+    def match(self, name, rel_path):
+        if self._name is not None and self._name.match(name):
+            return True
+        if self._path is not None and self._path.match(rel_path.replace(os.sep, '/')):
+            return True
+        return False
+
+
+def walk_files(start_path, exclude=None):
+    """
+    Yields (path, stat_result) for every regular file under start_path.
+    exclude is an ExcludeMatcher or a list of patterns.
+    """
+    if exclude is not None and not isinstance(exclude, ExcludeMatcher):
+        exclude = ExcludeMatcher(exclude)
+    if not exclude:
+        exclude = None
+
+    stack = [(start_path, '')]
+    while stack:
+        folder, rel_folder = stack.pop()
+        try:
+            it = os.scandir(folder)
+        except OSError:
+            continue
+
+        subdirs = []
+        with it:
+            for entry in it:
+                rel_path = os.path.join(rel_folder, entry.name) if rel_folder else entry.name
+                if exclude is not None and exclude.match(entry.name, rel_path):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append((entry.path, rel_path))
+                    elif entry.is_file():
+                        yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+        # reversed so directories come out in listing order
+        stack.extend(reversed(subdirs))
@@ -0,0 +1,249 @@
+import asyncio
+import random
+from typing import Callable, List, Optional
+import openai
+from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
+
+# Requests in flight at once, unless --concurrency says otherwise
+DEFAULT_CONCURRENCY = 8
+# Attempts after the first one for rate limits, timeouts and server errors
+MAX_RETRIES = 5
+# Backoff before retry n is BACKOFF_BASE * 2**n seconds with jitter, capped at BACKOFF_MAX
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# Words of summaries combined by one reduce request, the same budget as chunk_text
+REDUCE_MAX_WORDS = 2000
+
+# Called with (finished requests, requests so far, reduce level) as requests complete
+ProgressCallback = Callable[[int, int, int], None]
+
+
+def build_prompt(detailed: bool, format_readme: bool, is_update: bool = False) -> str:
+    if is_update:
+        prompt = (
+            "You are tasked with updating an existing README.md file. "
+            "The content provided is structured as follows:\n"
+            "EXISTING_README_CONTENT_BEGINS:\n"
+            "[Content of the current README]\n"
+            "EXISTING_README_CONTENT_ENDS.\n\n"
+            "NEW_CONTENT_TO_INTEGRATE_BEGINS:\n"
+            "[Newly summarized information from project files or a specific file]\n"
+            "NEW_CONTENT_TO_INTEGRATE_ENDS.\n\n"
+            "Your goal is to intelligently integrate the new information into the existing README structure. "
+            "Preserve relevant existing sections and content. Update or add sections based on the new information. "
+            "If the existing README content is empty or minimal, generate a comprehensive README based on the new content to integrate. "
+            "The final output must be a single, coherent, and professional README.md file. "
+            "Focus on clarity, accuracy, and completeness. "
+        )
+        if detailed:
+            prompt += "Ensure the new sections and updates are thorough and provide in-depth explanations where appropriate for a technical audience. "
+        prompt += "The entire output should be valid markdown content, suitable for a README.md file. Do not wrap the entire response in a markdown code block (e.g., starting with ```markdown)."
+
+    elif format_readme:
+        prompt = (
+            "Write a professional README.md file for the following content. "
+            "Include sections like Description, Features, Usage, and (if possible) Installation. "
+        )
+        if detailed:
+            prompt += (
+                "The README should be extended, in-depth, and detailed, suitable for a technical audience. "
+                "Highlight structure, purpose, and key components. Infer project goals and usage if possible. "
+            )
+        prompt += "Only use information present in the text. The output should be raw markdown content, suitable for a README.md file. Do not wrap the entire response in a markdown code block (e.g., starting with ```markdown)."
+    elif detailed:
+        prompt = (
+            "Write an extended, in-depth, and detailed markdown summary of the following content as if for a technical audience. "
+            "Highlight structure, purpose, and key components. "
+            "If possible, infer project goals and usage. "
+            "Only use information present in the text. "
+            "Format as markdown. Do not wrap the entire response in a markdown code block unless the content itself is a code block."
+        )
+    else:
+        prompt = "Summarize the following content. Be concise and only use information present in the text. Format as markdown. Do not wrap the entire response in a markdown code block unless the content itself is a code block."
+    return prompt
+
+def clean_response(content: Optional[str]) -> str:
+    if content is not None:
+        stripped_content = content.strip()
+        lines = stripped_content.splitlines()
+
+        # Mitigate common issue: AI wrapping the entire response in a markdown code block.
+        if len(lines) >= 2:
+            first_line_trimmed = lines[0].strip()
+            last_line_trimmed = lines[-1].strip()
+
+            is_common_wrapper_start = (
+                first_line_trimmed == "```markdown" or
+                first_line_trimmed == "```"
+            )
+            is_common_wrapper_end = (last_line_trimmed == "```")
+
+            if is_common_wrapper_start and is_common_wrapper_end:
+                if len(lines) > 2:
+                    return "\n".join(lines[1:-1]).strip()
+                else:
+                    # Handles cases like "```markdown\n```" (empty wrapped block).
+                    return ""
+
+        return stripped_content
+    else:
+        return ""
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts, dropped connections and server errors are worth another try."""
+    if isinstance(error, openai.APIConnectionError):  # includes APITimeoutError
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+def group_by_words(texts: List[str], max_words: int) -> List[List[str]]:
+    """Split texts into runs of consecutive texts with at most max_words words each (at least two per run)."""
+    groups: List[List[str]] = []
+    group: List[str] = []
+    count = 0
+    for text in texts:
+        words = len(text.split())
+        if len(group) >= 2 and count + words > max_words:
+            groups.append(group)
+            group = []
+            count = 0
+        group.append(text)
+        count += words
+    if group:
+        groups.append(group)
+    return groups
+
+
+class Summarizer:
+    """
+    Map-reduce summarization over one OpenAI-compatible endpoint.
+
+    Every request goes through a single AsyncOpenAI client, so the HTTP
+    connections are pooled and kept alive across the whole run, and at most
+    `concurrency` requests are in flight at once. Rate limits, timeouts and
+    server errors are retried with exponential backoff and jitter, honouring
+    the server's Retry-After header when it sends one.
+
+    Chunks are summarized concurrently, then their summaries are combined
+    in groups of about REDUCE_MAX_WORDS words, level by level, until one
+    summary is left, so the combine step never sends the model more than a
+    chunk's worth of text however big the project is.
+
+    The blocking methods run on an event loop owned by the summarizer, so
+    the pooled client lives for as long as the summarizer is open.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_endpoint: str,
+        model: str,
+        detailed: bool,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.api_key = api_key
+        self.api_endpoint = api_endpoint
+        self.model = model
+        self.detailed = detailed
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.loop = asyncio.new_event_loop()
+        self.client: Optional[openai.AsyncOpenAI] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
+    def __enter__(self) -> "Summarizer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        if self.client is not None:
+            self.loop.run_until_complete(self.client.close())
+            self.client = None
+        self.loop.close()
+
+    def summarize(self, text: str, format_readme: bool = False, is_update: bool = False) -> str:
+        """Summarize a single text, blocking until it's done."""
+        return self.loop.run_until_complete(self.asummarize(text, format_readme, is_update))
+
+    def summarize_chunks(self, chunks: List[str], on_progress: Optional[ProgressCallback] = None) -> str:
+        """Summarize chunks concurrently and reduce them to one summary, blocking until it's done."""
+        return self.loop.run_until_complete(self.amap_reduce(chunks, on_progress))
+
+    def _connect(self) -> openai.AsyncOpenAI:
+        if self.client is None:
+            # retries are ours, so they share the concurrency limit
+            self.client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.api_endpoint, max_retries=0)
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self.client
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                return min(float(response.headers.get("retry-after", "")), BACKOFF_MAX)
+            except ValueError:
+                pass
+        return min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+    async def asummarize(self, text: str, format_readme: bool = False, is_update: bool = False) -> str:
+        client = self._connect()
+        messages = [
+            ChatCompletionSystemMessageParam(role="system", content=build_prompt(self.detailed, format_readme, is_update)),
+            ChatCompletionUserMessageParam(role="user", content=text)
+        ]
+        async with self.semaphore:
+            attempt = 0
+            while True:
+                try:
+                    response = await client.chat.completions.create(
+                        model=self.model,
+                        messages=messages
+                    )
+                    return clean_response(response.choices[0].message.content)
+                except Exception as e:
+                    if attempt >= self.max_retries or not is_retryable(e):
+                        raise
+                    await asyncio.sleep(self._backoff(attempt, e))
+                    attempt += 1
+
+    async def amap_reduce(self, chunks: List[str], on_progress: Optional[ProgressCallback] = None) -> str:
+        finished = 0
+        total = 0
+
+        async def track(text: str, level: int) -> str:
+            nonlocal finished
+            summary = await self.asummarize(text)
+            finished += 1
+            if on_progress:
+                on_progress(finished, total, level)
+            return summary
+
+        async def run_level(texts: List[str], level: int) -> List[str]:
+            nonlocal total
+            total += len(texts)
+            if on_progress:
+                on_progress(finished, total, level)
+            tasks = [asyncio.ensure_future(track(text, level)) for text in texts]
+            try:
+                return await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+        summaries = await run_level(chunks, 0)
+        level = 0
+        while len(summaries) > 1:
+            level += 1
+            groups = group_by_words(summaries, REDUCE_MAX_WORDS)
+            # a summary left on its own moves up a level as it is
+            combined = iter(await run_level(["\n\n".join(group) for group in groups if len(group) > 1], level))
+            summaries = [next(combined) if len(group) > 1 else group[0] for group in groups]
+        return summaries[0] if summaries else ""
@@ -6,12 +6,11 @@ from rich.console import Console
 from rich.markdown import Markdown
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
-import openai
-from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
 import chardet
 import pathspec # Assume pathspec is always available
 
 import config
+from summarizer import DEFAULT_CONCURRENCY, Summarizer
 
 console = Console()
 
@@ -107,92 +106,20 @@ def _get_adjusted_gitignore_patterns(gitignore_abs_path: str, project_root_abs_p
             adjusted_patterns.append(negation_prefix + full_pattern)
     return adjusted_patterns
 
-def summarize_chunk(
-    chunk: str,
-    api_key: str,
-    api_endpoint: str,
-    model: str,
-    detailed: bool,
-    format_readme: bool, # Kept for consistency, as is_update=True implies README format
-    is_update: bool = False
-) -> str:
-    if is_update:
-        prompt = (
-            "You are tasked with updating an existing README.md file. "
-            "The content provided is structured as follows:\n"
-            "EXISTING_README_CONTENT_BEGINS:\n"
-            "[Content of the current README]\n"
-            "EXISTING_README_CONTENT_ENDS.\n\n"
-            "NEW_CONTENT_TO_INTEGRATE_BEGINS:\n"
-            "[Newly summarized information from project files or a specific file]\n"
-            "NEW_CONTENT_TO_INTEGRATE_ENDS.\n\n"
-            "Your goal is to intelligently integrate the new information into the existing README structure. "
-            "Preserve relevant existing sections and content. Update or add sections based on the new information. "
-            "If the existing README content is empty or minimal, generate a comprehensive README based on the new content to integrate. "
-            "The final output must be a single, coherent, and professional README.md file. "
-            "Focus on clarity, accuracy, and completeness. "
-        )
-        if detailed:
-            prompt += "Ensure the new sections and updates are thorough and provide in-depth explanations where appropriate for a technical audience. "
-        prompt += "The entire output should be valid markdown content, suitable for a README.md file. Do not wrap the entire response in a markdown code block (e.g., starting with ```markdown)."
-
-    elif format_readme:
-        prompt = (
-            "Write a professional README.md file for the following content. "
-            "Include sections like Description, Features, Usage, and (if possible) Installation. "
-        )
-        if detailed:
-            prompt += (
-                "The README should be extended, in-depth, and detailed, suitable for a technical audience. "
-                "Highlight structure, purpose, and key components. Infer project goals and usage if possible. "
-            )
-        prompt += "Only use information present in the text. The output should be raw markdown content, suitable for a README.md file. Do not wrap the entire response in a markdown code block (e.g., starting with ```markdown)."
-    elif detailed:
-        prompt = (
-            "Write an extended, in-depth, and detailed markdown summary of the following content as if for a technical audience. "
-            "Highlight structure, purpose, and key components. "
-            "If possible, infer project goals and usage. "
-            "Only use information present in the text. "
-            "Format as markdown. Do not wrap the entire response in a markdown code block unless the content itself is a code block."
-        )
-    else:
-        prompt = "Summarize the following content. Be concise and only use information present in the text. Format as markdown. Do not wrap the entire response in a markdown code block unless the content itself is a code block."
-
-    messages = [
-        ChatCompletionSystemMessageParam(role="system", content=prompt),
-        ChatCompletionUserMessageParam(role="user", content=chunk)
-    ]
-    client = openai.OpenAI(api_key=api_key, base_url=api_endpoint)
-    response = client.chat.completions.create(
-        model=model,
-        messages=messages
-    )
-    content = response.choices[0].message.content
-    if content is not None:
-        stripped_content = content.strip()
-        lines = stripped_content.splitlines()
-        
-        # Mitigate common issue: AI wrapping the entire response in a markdown code block.
-        if len(lines) >= 2:
-            first_line_trimmed = lines[0].strip()
-            last_line_trimmed = lines[-1].strip()
-
-            is_common_wrapper_start = (
-                first_line_trimmed == "```markdown" or 
-                first_line_trimmed == "```"
-            )
-            is_common_wrapper_end = (last_line_trimmed == "```")
-
-            if is_common_wrapper_start and is_common_wrapper_end:
-                if len(lines) > 2:
-                    return "\n".join(lines[1:-1]).strip()
-                else:
-                    # Handles cases like "```markdown\n```" (empty wrapped block).
-                    return "" 
-        
-        return stripped_content
-    else:
-        return ""
+def summarize_chunks(summarizer: Summarizer, chunks: List[str], progress: Progress, label: str) -> str:
+    """Summarize chunks concurrently and combine their summaries, showing progress."""
+    summarize_task = progress.add_task(f"[cyan]Summarizing {len(chunks)} {label}(s)...", total=len(chunks))
+
+    def on_progress(finished: int, total: int, level: int):
+        if level == 0:
+            description = f"[cyan]Summarizing {label}s ({finished}/{len(chunks)} done)"
+        else:
+            description = f"[cyan]Combining summaries, level {level} ({finished}/{total} done)"
+        progress.update(summarize_task, completed=finished, total=total, description=description)
+
+    summary_text = summarizer.summarize_chunks(chunks, on_progress)
+    progress.remove_task(summarize_task)
+    return summary_text
 
 def scan_project_files(project_path: str, exclude: Optional[List[str]] = None) -> List[str]:
     """
@@ -305,6 +232,12 @@ def summary(
         "--debug",
         help="Enable debug output, including the list of files used for summarization.",
         hidden=True 
+    ),
+    concurrency: int = typer.Option(
+        DEFAULT_CONCURRENCY,
+        "--concurrency",
+        min=1,
+        help="Maximum number of summarization requests sent to the API at the same time."
     )
 ):
     """
@@ -331,7 +264,7 @@ def summary(
             console.print(f"[bold yellow]Warning: Existing README '{update_readme_path}' is empty. A new README will be generated based on project/file content and saved to this path.[/bold yellow]")
 
 
-    with Progress(
+    with Summarizer(api_key, api_endpoint, use_model, detailed, concurrency) as summarizer, Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         transient=True,
@@ -355,14 +288,15 @@ def summary(
                 raise typer.Exit(code=1)
             
             concat_task = progress.add_task(f"[cyan]Reading and concatenating files...", total=len(file_paths) if file_paths else None)
-            project_text = ""
+            project_parts = []
             if file_paths:
                 for file_path_item in file_paths:
                     progress.update(concat_task, description=f"[cyan]Reading {os.path.relpath(file_path_item, path)}")
                     content = read_text_file(file_path_item)
                     if content.strip():
-                        project_text += f"\n\n# FILE: {os.path.relpath(file_path_item, path)}\n\n{content}"
+                        project_parts.append(f"\n\n# FILE: {os.path.relpath(file_path_item, path)}\n\n{content}")
                     progress.advance(concat_task)
+            project_text = "".join(project_parts)
             progress.remove_task(concat_task)
             project_text_content_processed = project_text # Store the concatenated text
 
@@ -372,22 +306,8 @@ def summary(
                 new_content_chunks = chunk_text(project_text)
                 progress.update(chunk_task_new, completed=1); progress.remove_task(chunk_task_new)
 
-                summarize_task_new = progress.add_task(f"[cyan]Summarizing {len(new_content_chunks)} new content chunk(s)...", total=len(new_content_chunks))
-                new_content_summaries = []
-                for idx, chunk_item in enumerate(new_content_chunks):
-                    progress.update(summarize_task_new, description=f"[cyan]Summarizing new content chunk {idx+1}/{len(new_content_chunks)}")
-                    # Summarize new content: detailed if requested, but don't apply README formatting or update logic at this stage
-                    new_content_summaries.append(summarize_chunk(chunk_item, api_key, api_endpoint, use_model, detailed, False, is_update=False))
-                    progress.advance(summarize_task_new)
-                progress.remove_task(summarize_task_new)
-
-                if len(new_content_summaries) > 1:
-                    combine_task_new = progress.add_task("[cyan]Combining new content summaries...", total=None)
-                    combined_new_summary_text = "\n\n".join(new_content_summaries)
-                    new_content_summary = summarize_chunk(combined_new_summary_text, api_key, api_endpoint, use_model, detailed, False, is_update=False)
-                    progress.update(combine_task_new, completed=1); progress.remove_task(combine_task_new)
-                elif new_content_summaries:
-                    new_content_summary = new_content_summaries[0]
+                # Summarize new content: detailed if requested, but don't apply README formatting or update logic at this stage
+                new_content_summary = summarize_chunks(summarizer, new_content_chunks, progress, "new content chunk")
             
             if is_updating_readme:
                 if not new_content_summary.strip() and (not existing_readme_content or not existing_readme_content.strip()):
@@ -401,7 +321,7 @@ def summary(
                     f"EXISTING_README_CONTENT_BEGINS:\n{existing_readme_content}\nEXISTING_README_CONTENT_ENDS.\n\n"
                     f"NEW_CONTENT_TO_INTEGRATE_BEGINS:\n{new_content_summary}\nNEW_CONTENT_TO_INTEGRATE_ENDS."
                 )
-                final_summary = summarize_chunk(text_for_update, api_key, api_endpoint, use_model, detailed, True, is_update=True)
+                final_summary = summarizer.summarize(text_for_update, format_readme=True, is_update=True)
                 progress.update(update_task, completed=1); progress.remove_task(update_task)
             else: # Standard project summary (not updating an existing README)
                 # This check might be redundant if the earlier `if not file_paths` check covers it
@@ -411,7 +331,7 @@ def summary(
                 final_summary = new_content_summary
                 if effective_format_readme: # User explicitly asked for --format-readme (and not --update-readme)
                     readme_format_task = progress.add_task("[cyan]Formatting summary as README...", total=None)
-                    final_summary = summarize_chunk(final_summary, api_key, api_endpoint, use_model, detailed, True, is_update=False)
+                    final_summary = summarizer.summarize(final_summary, format_readme=True)
                     progress.update(readme_format_task, completed=1); progress.remove_task(readme_format_task)
 
         elif os.path.isfile(path):
@@ -435,22 +355,8 @@ def summary(
                 chunks = chunk_text(file_text)
                 progress.update(chunk_task, completed=1); progress.remove_task(chunk_task)
 
-                summarize_task = progress.add_task(f"[cyan]Summarizing {len(chunks)} chunk(s)...", total=len(chunks))
-                summaries = []
-                for idx, chunk_item in enumerate(chunks):
-                    progress.update(summarize_task, description=f"[cyan]Summarizing chunk {idx+1}/{len(chunks)}")
-                    # Summarize file content: detailed if requested, but don't apply README formatting or update logic at this stage
-                    summaries.append(summarize_chunk(chunk_item, api_key, api_endpoint, use_model, detailed, False, is_update=False))
-                    progress.advance(summarize_task)
-                progress.remove_task(summarize_task)
-
-                if len(summaries) > 1:
-                    combine_task = progress.add_task("[cyan]Combining chunk summaries...", total=None)
-                    combined_summary_text = "\n\n".join(summaries)
-                    single_file_summary_content = summarize_chunk(combined_summary_text, api_key, api_endpoint, use_model, detailed, False, is_update=False)
-                    progress.update(combine_task, completed=1); progress.remove_task(combine_task)
-                elif summaries:
-                    single_file_summary_content = summaries[0]
+                # Summarize file content: detailed if requested, but don't apply README formatting or update logic at this stage
+                single_file_summary_content = summarize_chunks(summarizer, chunks, progress, "chunk")
             
             if is_updating_readme:
                 if not single_file_summary_content.strip() and (not existing_readme_content or not existing_readme_content.strip()):
@@ -464,7 +370,7 @@ def summary(
                     f"EXISTING_README_CONTENT_BEGINS:\n{existing_readme_content}\nEXISTING_README_CONTENT_ENDS.\n\n"
                     f"NEW_CONTENT_TO_INTEGRATE_BEGINS:\n{single_file_summary_content}\nNEW_CONTENT_TO_INTEGRATE_ENDS."
                 )
-                final_summary = summarize_chunk(text_for_update, api_key, api_endpoint, use_model, detailed, True, is_update=True)
+                final_summary = summarizer.summarize(text_for_update, format_readme=True, is_update=True)
                 progress.update(update_task, completed=1); progress.remove_task(update_task)
             else: # Standard file summary (not updating an existing README)
                 # This check might be redundant if the earlier `if not file_text.strip()` covers it
@@ -474,7 +380,7 @@ def summary(
                 final_summary = single_file_summary_content
                 if effective_format_readme: # User explicitly asked for --format-readme (and not --update-readme)
                     readme_format_task = progress.add_task("[cyan]Formatting summary as README...", total=None)
-                    final_summary = summarize_chunk(final_summary, api_key, api_endpoint, use_model, detailed, True, is_update=False)
+                    final_summary = summarizer.summarize(final_summary, format_readme=True)
                     progress.update(readme_format_task, completed=1); progress.remove_task(readme_format_task)
 
         else:
@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import pytest
+
+# Add the src directory to the Python path
+src_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, src_dir)
+
+import summarizer
+from summarizer import Summarizer
+
+
+class StubServer(ThreadingHTTPServer):
+    """OpenAI-compatible /chat/completions stub that answers every rate_limit_every-th request with a 429."""
+
+    daemon_threads = True
+
+    def __init__(self, rate_limit_every=7, delay=0.05):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.rate_limit_every = rate_limit_every
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/v1"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            rate_limited = server.requests % server.rate_limit_every == 0
+            server.rate_limited += rate_limited
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            server.connections.add(self.client_address)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        if rate_limited:
+            self._send(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}}, {"Retry-After": "0"})
+            return
+        words = len(body["messages"][1]["content"].split())
+        content = f"```markdown\nsummary of {words} words " + "word " * 20 + "\n```"
+        self._send(200, {
+            "id": "stub",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_stub(**kwargs):
+    server = StubServer(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stub_server():
+    server = start_stub()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_map_reduce_against_stub_server(stub_server, monkeypatch):
+    # small reduce groups so 30 chunk summaries need several levels
+    monkeypatch.setattr(summarizer, "REDUCE_MAX_WORDS", 60)
+    chunks = [f"chunk {i} " + "text " * 100 for i in range(30)]
+    progress = []
+
+    with Summarizer("key", stub_server.url, "stub-model", False, concurrency=5) as s:
+        result = s.summarize_chunks(chunks, lambda *args: progress.append(args))
+
+    # the code fence is stripped from the final summary
+    assert result.startswith("summary of ")
+    # never more requests in flight than the limit, over pooled connections
+    assert 1 < stub_server.peak_in_flight <= 5
+    assert len(stub_server.connections) <= 5
+    # every rate limited request was retried
+    assert stub_server.rate_limited > 0
+    finished, total, level = progress[-1]
+    assert finished == total == stub_server.requests - stub_server.rate_limited
+    assert level >= 2
+
+
+def test_gives_up_after_max_retries():
+    server = start_stub(rate_limit_every=1, delay=0)
+    try:
+        with Summarizer("key", server.url, "stub-model", False, max_retries=2) as s:
+            with pytest.raises(openai.RateLimitError):
+                s.summarize("some text")
+        assert server.requests == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_group_by_words():
+    texts = ["a b c", "d e", "f g h i", "j"]
+    assert summarizer.group_by_words(texts, 5) == [["a b c", "d e"], ["f g h i", "j"]]
+    # every group holds at least two texts, so a reduce level always shrinks
+    assert summarizer.group_by_words(["a " * 10, "b " * 10, "c"], 5) == [["a " * 10, "b " * 10], ["c"]]
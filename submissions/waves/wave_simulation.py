@@ -4,6 +4,7 @@ Wave on String Simulation - Terminal ASCII Version
 A physics simulation of wave propagation on a string with interactive controls.
 """
 import numpy as np
+import argparse
 import time
 import sys
 import os
@@ -31,6 +32,9 @@ class DampingLevel(Enum):
 class TensionLevel(Enum):
     LOW = "low"
     HIGH = "high"
+class Integrator(Enum):
+    LEAPFROG = "leapfrog"
+    IMPLICIT = "implicit"
 @dataclass
 class SimulationParams:
     """Parameters for the wave simulation"""
@@ -47,6 +51,33 @@ class SimulationParams:
     string_length: float = 10.0  
     num_points: int = 80  
     dt: float = 0.01  
+    integrator: Integrator = Integrator.LEAPFROG
+def solve_tridiagonal(a, b, c, d):
+    """Solve a[i]*x[i-1] + b[i]*x[i] + c[i]*x[i+1] = d[i] by cyclic reduction (a[0] and c[-1] are ignored)"""
+    n = len(d)
+    if n == 1:
+        return d / b
+    # pad with identity rows so every row has a neighbour on both sides
+    A = np.concatenate(([0.0], a, [0.0]))
+    B = np.concatenate(([1.0], b, [1.0]))
+    C = np.concatenate(([0.0], c, [0.0]))
+    D = np.concatenate(([0.0], d, [0.0]))
+    A[1] = 0.0
+    C[n] = 0.0
+    keep = np.arange(1, n + 1, 2)
+    alpha = -A[keep] / B[keep - 1]
+    gamma = -C[keep] / B[keep + 1]
+    x = np.zeros(n + 2)
+    # every other row folded into its neighbours, then the half sized system is solved the same way
+    x[keep] = solve_tridiagonal(
+        alpha * A[keep - 1],
+        B[keep] + alpha * C[keep - 1] + gamma * A[keep + 1],
+        gamma * C[keep + 1],
+        D[keep] + alpha * D[keep - 1] + gamma * D[keep + 1],
+    )
+    rest = np.arange(2, n + 1, 2)
+    x[rest] = (D[rest] - A[rest] * x[rest - 1] - C[rest] * x[rest + 1]) / B[rest]
+    return x[1:n + 1]
 class TerminalDisplay:
     """Handle terminal display and input"""
     def __init__(self):
@@ -161,6 +192,9 @@ class TerminalDisplay:
         if self.input_thread:
             self.input_thread.join(timeout=0.5)
 class WaveSimulation:
+    TITLE = "                    WAVE ON STRING SIMULATION"
+    LEGEND = "  Legend: # (peaks) * (high) o (medium) . (low) , (tiny) - (zero)"
+    INTEGRATORS = tuple(Integrator)
     def __init__(self, params: SimulationParams):
         self.params = params
         self.running = False
@@ -172,15 +206,20 @@ class WaveSimulation:
         self._last_energy = 0.0
         self._last_freq = 0.0
         self._calc_counter = 0
-        self.x = np.linspace(0, params.string_length, params.num_points)
-        self.dx = self.x[1] - self.x[0]
-        self.y = np.zeros(params.num_points)  
-        self.y_prev = np.zeros(params.num_points)  
-        self.y_next = np.zeros(params.num_points)  
+        self.allocate_grid()
         self.wave_speed = 1.5 if params.tension == TensionLevel.HIGH else 0.8
         self.damping_coeff = 0.05 if params.damping == DampingLevel.LOTS else 0.0
         self.manual_amplitude = 0.0
+        self._implicit_key = None
+        self._implicit_bands = None
         self.initialize_wave()
+    def allocate_grid(self):
+        """Set up the positions and the three time levels of the string"""
+        self.x = np.linspace(0, self.params.string_length, self.params.num_points)
+        self.dx = self.x[1] - self.x[0]
+        self.y = np.zeros(self.params.num_points)  
+        self.y_prev = np.zeros(self.params.num_points)  
+        self.y_next = np.zeros(self.params.num_points)  
     def initialize_wave(self):
         """Initialize the wave with a small starting displacement"""
         if self.params.mode == WaveMode.PULSE:
@@ -220,16 +259,10 @@ class WaveSimulation:
                 self.y_next[-1] = self.y[-1] - (self.wave_speed * self.params.dt / self.dx) * (self.y[-1] - self.y[-2])
     def update_wave(self):
         """Update the wave using the finite difference method"""
-        courant = (self.wave_speed * self.params.dt / self.dx)
-        if courant > 0.5:
-            self.params.dt = 0.4 * self.dx / self.wave_speed
-        for i in range(1, len(self.y) - 1):
-            d2y_dx2 = (self.y[i+1] - 2*self.y[i] + self.y[i-1]) / (self.dx**2)
-            dy_dt = (self.y[i] - self.y_prev[i]) / self.params.dt
-            d2y_dt2 = (self.wave_speed**2) * d2y_dx2 - self.damping_coeff * dy_dt
-            self.y_next[i] = (2*self.y[i] - self.y_prev[i] + 
-                             (self.params.dt**2) * d2y_dt2)
-            self.y_next[i] = np.clip(self.y_next[i], -self.params.amplitude * 3, self.params.amplitude * 3)
+        if self.params.integrator == Integrator.IMPLICIT:
+            self.step_implicit()
+        else:
+            self.step_leapfrog()
         source_amplitude = self.generate_source()
         if self.params.boundary != BoundaryCondition.FIXED_END:
             self.y_next[0] = source_amplitude
@@ -237,13 +270,56 @@ class WaveSimulation:
             if len(self.y) > 5:
                 self.y_next[2] = source_amplitude * 0.8
         self.apply_boundary_conditions()
-        self.y_prev[:] = self.y[:]
-        self.y[:] = self.y_next[:]
+        self.y_prev, self.y, self.y_next = self.y, self.y_next, self.y_prev
+    def step_leapfrog(self):
+        """Explicit central difference step, only stable for courant <= 1 so dt gets capped"""
+        courant = (self.wave_speed * self.params.dt / self.dx)
+        if courant > 0.5:
+            self.params.dt = 0.4 * self.dx / self.wave_speed
+        dt = self.params.dt
+        y, y_prev = self.y, self.y_prev
+        d2y_dx2 = (y[2:] - 2*y[1:-1] + y[:-2]) / (self.dx**2)
+        dy_dt = (y[1:-1] - y_prev[1:-1]) / dt
+        d2y_dt2 = (self.wave_speed**2) * d2y_dx2 - self.damping_coeff * dy_dt
+        interior = self.y_next[1:-1]
+        np.multiply(y[1:-1], 2, out=interior)
+        interior -= y_prev[1:-1]
+        interior += (dt**2) * d2y_dt2
+        np.clip(interior, -self.params.amplitude * 3, self.params.amplitude * 3, out=interior)
+    def step_implicit(self):
+        """Implicit (Newmark average acceleration) step, unconditionally stable so dt stays as set"""
+        n = len(self.y) - 2
+        if n < 1:
+            return
+        dt = self.params.dt
+        y, y_prev = self.y, self.y_prev
+        a = (self.wave_speed * dt) ** 2
+        g = self.damping_coeff * dt / 2
+        inv_dx2 = 1.0 / (self.dx**2)
+        lap = (y[2:] - 2*y[1:-1] + y[:-2]) * inv_dx2
+        lap_prev = (y_prev[2:] - 2*y_prev[1:-1] + y_prev[:-2]) * inv_dx2
+        rhs = 2*y[1:-1] - (1 - g)*y_prev[1:-1] + a*(0.5*lap + 0.25*lap_prev)
+        # the ends of the next step aren't known yet, use the current ones
+        rhs[0] += 0.25 * a * y[0] * inv_dx2
+        rhs[-1] += 0.25 * a * y[-1] * inv_dx2
+        # (1 + g - a/4 L) y_next = rhs, a tridiagonal system
+        if self._implicit_key != (n, a, g, self.dx):
+            off = np.full(n, -0.25 * a * inv_dx2)
+            self._implicit_bands = (off, np.full(n, 1 + g + 0.5 * a * inv_dx2), off)
+            self._implicit_key = (n, a, g, self.dx)
+        interior = solve_tridiagonal(*self._implicit_bands, rhs)
+        np.clip(interior, -self.params.amplitude * 3, self.params.amplitude * 3, out=self.y_next[1:-1])
     def render_wave(self):
         """Render the wave as ASCII art with smooth curves using dots - optimized version"""
+        output = self.render_header()
+        output.extend(self.render_field())
+        output.extend(self.render_footer())
+        return "\n".join(output)
+    def render_header(self):
+        """Title, parameters and timer lines"""
         output = []
         output.append("=" * 80)
-        output.append("                    WAVE ON STRING SIMULATION")
+        output.append(self.TITLE)
         output.append("=" * 80)
         output.append("")
         param_line1 = f"Mode: {self.params.mode.value.upper():<10} "
@@ -251,7 +327,8 @@ class WaveSimulation:
         param_line1 += f"Pulse Width: {self.params.pulse_width:>5.2f}s"
         param_line2 = f"Damping: {self.params.damping.value.upper():<8} "
         param_line2 += f"Tension: {self.params.tension.value.upper():<6} "
-        param_line2 += f"Boundary: {self.params.boundary.value.replace('_', ' ').upper():<10}"
+        param_line2 += f"Boundary: {self.params.boundary.value.replace('_', ' ').upper():<10} "
+        param_line2 += f"Solver: {self.params.integrator.value.upper()}"
         output.append(param_line1)
         output.append(param_line2)
         output.append("")
@@ -261,12 +338,21 @@ class WaveSimulation:
                 timer_line += " [PAUSED]"
             output.append(timer_line)
             output.append("")
+        return output
+    def render_field(self):
+        """The string itself plus the ruler below it"""
+        output = []
         wave_height = 15  
         display_width = 65  
         wave_chars = [' ', ',', '.', 'o', '*', '#']  
         zero_char = '-'
         amplitude = self.params.amplitude
         row_spacing = amplitude * 2 / (wave_height - 1)
+        if len(self.y) > display_width:
+            # long strings are sampled down to the columns we actually have
+            display_y = self.y[np.linspace(0, len(self.y) - 1, display_width).astype(int)].tolist()
+        else:
+            display_y = self.y.tolist()
         threshold_base = amplitude / (wave_height - 1)
         for row in range(wave_height):
             line_parts = []
@@ -282,9 +368,7 @@ class WaveSimulation:
             y_level = amplitude * (1 - 2 * row / (wave_height - 1))
             is_zero_line = abs(y_level) < 0.1
             row_chars = []
-            num_points = min(display_width, len(self.y))
-            for i in range(num_points):
-                wave_val = self.y[i]
+            for wave_val in display_y:
                 distance = abs(wave_val - y_level)
                 if distance < threshold_base * 0.3:
                     abs_wave = abs(wave_val)
@@ -320,6 +404,10 @@ class WaveSimulation:
             ruler_line = ''.join(ruler_parts)[:80]
             output.append(ruler_line)
         output.append("")
+        return output
+    def render_footer(self):
+        """Controls and live statistics"""
+        output = []
         controls = [
             "CONTROLS:",
             "  SPACE: Pause/Resume    R: Restart    Q: Quit",
@@ -327,7 +415,8 @@ class WaveSimulation:
             "  W/E: Pulse Width +/-   D: Toggle Damping      T: Toggle Tension",
             "  B: Cycle Boundary      L: Toggle Slow Motion  U: Rulers On/Off",
             "  I/K: Manual Control    Z: Zero Wave           X: Add Disturbance",
-            "  V: Toggle Reference    C: Clear History       P/O: Save/Load Preset"
+            "  V: Toggle Reference    C: Clear History       P/O: Save/Load Preset",
+            "  N: Toggle Integrator (leapfrog/implicit)"
         ]
         output.extend(controls)
         if self.params.mode == WaveMode.MANUAL:
@@ -343,12 +432,12 @@ class WaveSimulation:
         if self._calc_counter % 10 == 0:
             self._last_freq = dominant_freq
         output.append(f"  Max Amplitude: {max_wave:5.2f} | Energy: {wave_energy:8.2f} | Freq: {dominant_freq:5.2f} Hz")
-        output.append(f"  Legend: # (peaks) * (high) o (medium) . (low) , (tiny) - (zero)")
+        output.append(self.LEGEND)
         if hasattr(self, '_last_update_time'):
             fps = 1.0 / max(0.001, time.time() - self._last_update_time)
             output.append(f"  FPS: {fps:4.1f}")
         self._last_update_time = time.time()
-        return "\n".join(output)
+        return output
     def handle_input(self):
         """Handle keyboard input"""
         try:
@@ -402,6 +491,9 @@ class WaveSimulation:
                     self.add_disturbance()
                 elif key.lower() == 'c':
                     self.y_prev[:] = self.y[:]
+                elif key.lower() == 'n':
+                    options = self.INTEGRATORS
+                    self.params.integrator = options[(options.index(self.params.integrator) + 1) % len(options)]
                 elif key.lower() == 'p':
                     self.save_preset()
                 elif key.lower() == 'o':
@@ -491,6 +583,14 @@ class WaveSimulation:
             self.display.stop_input_thread()
             self.display.show_cursor()
             print("\nSimulation ended.")
+    def run_headless(self, steps):
+        """Advance the simulation without rendering, returns steps per second"""
+        start = time.perf_counter()
+        for _ in range(steps):
+            self.update_wave()
+            self.current_time += self.params.dt
+        elapsed = time.perf_counter() - start
+        return steps / elapsed if elapsed > 0 else float('inf')
     def calculate_wave_energy(self):
         """Calculate the total wave energy"""
         kinetic_energy = 0.5 * np.sum((self.y - self.y_prev)**2) / (self.params.dt**2)
@@ -500,10 +600,8 @@ class WaveSimulation:
         """Calculate the dominant frequency in the wave"""
         if len(self.y) < 4:
             return 0.0
-        zero_crossings = 0
-        for i in range(1, len(self.y)):
-            if (self.y[i-1] >= 0 and self.y[i] < 0) or (self.y[i-1] < 0 and self.y[i] >= 0):
-                zero_crossings += 1
+        positive = self.y >= 0
+        zero_crossings = np.count_nonzero(positive[1:] != positive[:-1])
         if zero_crossings > 0:
             return zero_crossings / (2 * self.params.string_length / self.wave_speed)
         return 0.0
@@ -517,10 +615,138 @@ class WaveSimulation:
             pulse = amplitude * np.exp(-(distance * 3) ** 2)
             self.y[i] += pulse
             self.y_prev[i] += pulse * 0.8
+class MembraneSimulation(WaveSimulation):
+    """2D membrane on the same engine, num_points is the side of the square grid"""
+    TITLE = "                   WAVE ON MEMBRANE SIMULATION"
+    LEGEND = "  Legend: @ # * + = - : . (highest to lowest)  red: above rest  blue: below rest"
+    SHADES = np.array(list(" .:-=+*#@"))
+    FIELD_WIDTH = 64
+    FIELD_HEIGHT = 24
+    # the implicit solver is a tridiagonal one, only the explicit step exists in 2D
+    INTEGRATORS = (Integrator.LEAPFROG,)
+    def __init__(self, params: SimulationParams):
+        params.integrator = Integrator.LEAPFROG
+        super().__init__(params)
+    def allocate_grid(self):
+        """Set up a square grid with three time levels"""
+        n = self.params.num_points
+        self.x = np.linspace(0, self.params.string_length, n)
+        self.dx = self.x[1] - self.x[0]
+        self.y = np.zeros((n, n))
+        self.y_prev = np.zeros((n, n))
+        self.y_next = np.zeros((n, n))
+    def initialize_wave(self):
+        """The membrane starts flat, the source in the middle does the rest"""
+        pass
+    def update_wave(self):
+        """Leapfrog step with the 5-point Laplacian"""
+        courant = (self.wave_speed * self.params.dt / self.dx)
+        if courant > 0.5:
+            self.params.dt = 0.4 * self.dx / self.wave_speed
+        dt = self.params.dt
+        y, y_prev = self.y, self.y_prev
+        lap = (y[2:, 1:-1] + y[:-2, 1:-1] + y[1:-1, 2:] + y[1:-1, :-2] - 4 * y[1:-1, 1:-1]) / (self.dx**2)
+        dy_dt = (y[1:-1, 1:-1] - y_prev[1:-1, 1:-1]) / dt
+        d2y_dt2 = (self.wave_speed**2) * lap - self.damping_coeff * dy_dt
+        interior = self.y_next[1:-1, 1:-1]
+        np.multiply(y[1:-1, 1:-1], 2, out=interior)
+        interior -= y_prev[1:-1, 1:-1]
+        interior += (dt**2) * d2y_dt2
+        np.clip(interior, -self.params.amplitude * 3, self.params.amplitude * 3, out=interior)
+        source_amplitude = self.generate_source()
+        if source_amplitude != 0:
+            c = len(self.y) // 2
+            self.y_next[c - 1:c + 2, c - 1:c + 2] = source_amplitude * 0.8
+        self.apply_boundary_conditions()
+        self.y_prev, self.y, self.y_next = self.y, self.y_next, self.y_prev
+    def apply_boundary_conditions(self):
+        """Same three boundary types as the string, applied to all four edges"""
+        y, nxt = self.y, self.y_next
+        if self.params.boundary == BoundaryCondition.FIXED_END:
+            nxt[0, :] = nxt[-1, :] = 0
+            nxt[:, 0] = nxt[:, -1] = 0
+        elif self.params.boundary == BoundaryCondition.LOOSE_END:
+            nxt[0, :] = nxt[1, :]
+            nxt[-1, :] = nxt[-2, :]
+            nxt[:, 0] = nxt[:, 1]
+            nxt[:, -1] = nxt[:, -2]
+        else:
+            # first order outgoing wave condition on every edge
+            k = self.wave_speed * self.params.dt / self.dx
+            nxt[0, :] = y[0, :] + k * (y[1, :] - y[0, :])
+            nxt[-1, :] = y[-1, :] - k * (y[-1, :] - y[-2, :])
+            nxt[:, 0] = y[:, 0] + k * (y[:, 1] - y[:, 0])
+            nxt[:, -1] = y[:, -1] - k * (y[:, -1] - y[:, -2])
+    def render_field(self):
+        """Shaded heightmap, brightness is |height| and colour is the sign"""
+        n = len(self.y)
+        rows = np.linspace(0, n - 1, min(n, self.FIELD_HEIGHT)).astype(int)
+        cols = np.linspace(0, n - 1, min(n, self.FIELD_WIDTH)).astype(int)
+        field = self.y[np.ix_(rows, cols)]
+        levels = len(self.SHADES) - 1
+        shade = np.clip(np.abs(field) / self.params.amplitude * levels + 0.5, 0, levels).astype(int)
+        chars = self.SHADES[shade]
+        sign = np.sign(field).astype(int) * (shade > 0)
+        colours = {1: '\033[31m', -1: '\033[34m', 0: '\033[0m'}
+        output = []
+        border = "    +" + "-" * len(cols) + "+" if self.params.show_rulers else None
+        if border:
+            output.append(border)
+        for row_chars, row_sign in zip(chars, sign):
+            # only emit a colour code where the sign changes along the row
+            parts = []
+            current = 0
+            for ch, sg in zip(row_chars.tolist(), row_sign.tolist()):
+                if sg != current:
+                    parts.append(colours[sg])
+                    current = sg
+                parts.append(ch)
+            if current != 0:
+                parts.append(colours[0])
+            line = ''.join(parts)
+            output.append(f"    |{line}|" if self.params.show_rulers else line)
+        if border:
+            output.append(border)
+        output.append("")
+        return output
+    def calculate_wave_energy(self):
+        """Kinetic plus potential energy over the whole membrane"""
+        kinetic_energy = 0.5 * np.sum((self.y - self.y_prev)**2) / (self.params.dt**2)
+        gy, gx = np.gradient(self.y, self.dx)
+        potential_energy = 0.5 * (self.wave_speed**2) * np.sum(gx**2 + gy**2)
+        return kinetic_energy + potential_energy
+    def calculate_dominant_frequency(self):
+        """Zero crossings along the middle row"""
+        middle = self.y[len(self.y) // 2]
+        positive = middle >= 0
+        zero_crossings = np.count_nonzero(positive[1:] != positive[:-1])
+        if zero_crossings > 0:
+            return zero_crossings / (2 * self.params.string_length / self.wave_speed)
+        return 0.0
+    def add_disturbance(self):
+        """Drop a random gaussian bump somewhere on the membrane"""
+        n = len(self.y)
+        cy, cx = np.random.randint(n // 4, 3 * n // 4, size=2)
+        width = max(2, n // 20)
+        amplitude = 0.2 * self.params.amplitude * np.random.uniform(-1, 1)
+        idx = np.arange(n)
+        bump = amplitude * np.exp(-(((idx[:, None] - cy)**2 + (idx[None, :] - cx)**2) / width**2) * 3)
+        self.y += bump
+        self.y_prev += bump * 0.8
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Wave on String Simulation - Terminal Version")
+    parser.add_argument('--points', type=int, default=50, help='Number of points on the string')
+    parser.add_argument('--integrator', choices=[i.value for i in Integrator], default=Integrator.LEAPFROG.value,
+                        help='Time integrator (implicit stays stable with large point counts)')
+    parser.add_argument('--membrane', action='store_true',
+                        help='Simulate a 2D membrane (points x points grid) instead of a string')
+    parser.add_argument('--benchmark', type=int, metavar='STEPS',
+                        help='Run STEPS steps without rendering and report steps/sec')
+    return parser.parse_args()
 def main():
     """Main function"""
-    print("Wave on String Simulation - Terminal Version")
-    print("Loading...")
+    args = parse_args()
     params = SimulationParams(
         mode=WaveMode.PULSE,
         amplitude=1.8,  
@@ -533,13 +759,26 @@ def main():
         show_reference_line=True,
         slow_motion=False,
         string_length=8.0,  
-        num_points=50,  
-        dt=0.008  
+        num_points=args.points,  
+        dt=0.008,
+        integrator=Integrator(args.integrator)
     )
+    simulation_class = MembraneSimulation if args.membrane else WaveSimulation
+    if args.benchmark:
+        simulation = simulation_class(params)
+        steps_per_sec = simulation.run_headless(args.benchmark)
+        if args.membrane:
+            print(f"membrane: {params.num_points}x{params.num_points} grid, {args.benchmark} steps, dt={params.dt:.6f}s")
+        else:
+            print(f"{params.integrator.value}: {params.num_points} points, {args.benchmark} steps, dt={params.dt:.6f}s")
+        print(f"{steps_per_sec:,.1f} steps/sec ({steps_per_sec * params.dt:.2f} simulated seconds per wall second)")
+        return
+    print("Wave on String Simulation - Terminal Version")
+    print("Loading...")
     print("Starting simulation in 2 seconds...")
     print("Use SPACE to pause, Q to quit, M to change modes")
     time.sleep(2)
-    simulation = WaveSimulation(params)
+    simulation = simulation_class(params)
     simulation.start_simulation()
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,142 @@
+from typing import List, Optional, Tuple
+from zshhist import META, readhist
+import os
+import re
+
+# Bytes read at a time, only whole lines of them are decoded
+CHUNK_SIZE = 1 << 20
+# Bytes zsh always escapes, so they only show up unescaped in plain UTF-8 files
+# (bash, PowerShell), where unmetafying would garble the text
+UNESCAPED_META = re.compile(rb"[\x84-\x9d\xa0]")
+
+Entry = Tuple[Optional[int], str]
+
+
+def is_metafied(data: bytes) -> Optional[bool]:
+    """
+    Whether history bytes come from zsh's metafied format, None while they
+    look the same either way (no META byte and no byte zsh would escape).
+    """
+    if UNESCAPED_META.search(data):
+        return False
+    if META not in data:
+        return None
+    # plain UTF-8 has 0x83 continuation bytes too ("у", "Ã"), but metafied
+    # non-ASCII text is almost never valid UTF-8
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def decode(data: bytes, metafied: Optional[bool] = None) -> str:
+    """Decode history bytes, undoing zsh's metafication if the data is metafied."""
+    if metafied is None:
+        metafied = is_metafied(data)
+    if metafied:
+        data = readhist(data)
+    return data.decode("utf-8", errors="replace")
+
+
+def chronological(entries: List[Entry]) -> List[str]:
+    """Commands oldest first, by timestamp where the history has them."""
+    timestamp = 0
+    keyed = []
+    for entry_timestamp, command in entries:
+        # a command without a timestamp stays right after the one before it
+        if entry_timestamp is not None:
+            timestamp = entry_timestamp
+        keyed.append((timestamp, command))
+    keyed.sort(key=lambda entry: entry[0])
+    return [command for _, command in keyed]
+
+
+class HistoryFile:
+    """
+    Streams a shell history file and follows what gets appended to it.
+
+    Every read() only reads the bytes added since the previous one, and only
+    decodes whole entries, so a command the shell is halfway through writing
+    is picked up by the next call. Lines ending with the continuation
+    character (a backslash for zsh, a backtick for PowerShell) are joined
+    with the next one into a single multi-line command.
+
+    Entries are split out of each chunk by one regex, with the ": <start>:
+    <elapsed>;" prefix of zsh's EXTENDED_HISTORY format parsed into the
+    timestamp, instead of a regex call per line.
+
+    Whether the file is metafied is decided by the first chunk that tells
+    (see is_metafied) and kept for every later read, since a short appended
+    line of plain UTF-8 can look metafied on its own.
+    """
+
+    def __init__(self, path: str, continuation: str = "\\"):
+        self.path = path
+        self.continuation = continuation
+        self.continuation_bytes = continuation.encode("utf-8")
+        escaped = re.escape(continuation)
+        # a line, then more lines as long as the newline follows the continuation
+        self.entry = re.compile(
+            r"^(?:: (\d+):\d+;)?([^\n]*(?:(?:(?<=" + escaped + r")|(?<=" + escaped + r"\r))\n[^\n]*)*)\n",
+            re.MULTILINE)
+        self.line_break = re.compile(escaped + r"\r?\n")
+        self.identity = None
+        self.metafied: Optional[bool] = None
+        self.offset = 0
+        self.remainder = b""
+
+    def read(self) -> Tuple[List[Entry], bool]:
+        """
+        New (timestamp, command) entries, and whether they replace everything
+        read before. That is the case on the first read, and when the file was
+        replaced or truncated (zsh rewrites it to trim the history).
+        """
+        stat = os.stat(self.path)
+        identity = (stat.st_dev, stat.st_ino)
+        restarted = identity != self.identity or stat.st_size < self.offset
+        if restarted:
+            self.identity = identity
+            self.offset = 0
+            self.remainder = b""
+
+        entries: List[Entry] = []
+        if stat.st_size == self.offset:
+            return entries, restarted
+
+        with open(self.path, "rb") as file:
+            file.seek(self.offset)
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                self.offset += len(chunk)
+                data = self.remainder + chunk
+                end = self._complete(data)
+                self.remainder = data[end:]
+                if end:
+                    self._parse(self._decode(data[:end]), entries)
+        return entries, restarted
+
+    def _complete(self, data: bytes) -> int:
+        """Length of the whole entries at the start of data."""
+        end = len(data)
+        while True:
+            end = data.rfind(b"\n", 0, end)
+            if end == -1:
+                return 0
+            line_end = end - 1 if data[end - 1:end] == b"\r" else end
+            if not data.endswith(self.continuation_bytes, 0, line_end):
+                return end + 1
+
+    def _decode(self, data: bytes) -> str:
+        if self.metafied is None:
+            self.metafied = is_metafied(data)
+        return decode(data, bool(self.metafied))
+
+    def _parse(self, text: str, entries: List[Entry]) -> None:
+        continuation = self.continuation
+        line_break = self.line_break
+        for timestamp, command in self.entry.findall(text):
+            if continuation in command:
+                command = line_break.sub("\n", command)
+            command = command.strip()
+            if command:
+                entries.append((int(timestamp) if timestamp else None, command))
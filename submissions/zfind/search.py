@@ -0,0 +1,175 @@
+from itertools import compress
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import re
+import threading
+
+# Characters a match has to follow to count as the start of a word
+WORD_BOUNDARIES = frozenset(" \t/\\-_.=:;|&'\"([{")
+# Separator between entries in the search text, never part of a command
+SEPARATOR = "\0"
+# Rest of the entry after a match
+REST_OF_ENTRY = "[^" + re.escape(SEPARATOR) + "]*"
+# Results kept for queries typed earlier, so backspace doesn't search again
+CACHE_SIZE = 64
+
+
+class SearchIndex:
+    """
+    Ranked fuzzy search over a list of commands.
+
+    Every command is lowercased once and joined into a single string. A
+    query is compiled to one regex ("gco" -> "g[^c\\0]*c[^o\\0]*o") that the
+    re engine runs over that string in C, only stopping at commands that
+    contain the query as a subsequence. Those are then ranked: prefix
+    matches first, then matches at the start of a word, then anywhere else,
+    then fuzzy matches by how tightly they match. Within a rank the
+    most recently added entry comes first.
+
+    Entries are added oldest first, and more can be added later as the
+    history grows. A command that is added again moves to the front and its
+    older copy is dropped.
+
+    Typing one more character only filters the previous results, one
+    regex search per result run from C, and results of earlier queries are
+    cached for backspacing.
+
+    A search over a big history still takes tens of milliseconds, so the app
+    runs it off the UI thread. add() and search() can be called from
+    different threads, and a search can be abandoned halfway once it's
+    stale (see search()).
+    """
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self._reset()
+        self.add(entries)
+
+    def _reset(self) -> None:
+        self.entries: List[str] = []
+        self.lowered: List[str] = []
+        self.text = ""
+        # Position of the most recent copy of every command
+        self.positions: Dict[str, int] = {}
+        # Positions of older copies, skipped until the next rebuild
+        self.dropped: Set[int] = set()
+        self._cache: Dict[str, List[int]] = {}
+        self._last: Optional[Tuple[str, List[int]]] = None
+
+    def __len__(self):
+        return len(self.entries) - len(self.dropped)
+
+    def add(self, entries: Iterable[str]) -> None:
+        """Index entries newer than everything indexed so far."""
+        with self._lock:
+            self._add(entries)
+
+    def _add(self, entries: Iterable[str]) -> None:
+        # last copy of every command, still oldest first
+        entries = list(reversed(dict.fromkeys(reversed(list(entries)))))
+        if not entries:
+            return
+        for position, entry in enumerate(entries, len(self.entries)):
+            previous = self.positions.get(entry)
+            if previous is not None:
+                self.dropped.add(previous)
+            self.positions[entry] = position
+
+        # a NUL in a command would shift the position of every later entry
+        lowered = [entry.lower().replace(SEPARATOR, " ") for entry in entries]
+        text = SEPARATOR.join(lowered)
+        self.text = self.text + SEPARATOR + text if self.entries else text
+        self.entries.extend(entries)
+        self.lowered.extend(lowered)
+        self._cache.clear()
+        self._last = None
+
+        # rebuild once older copies take up most of the text
+        if len(self.dropped) > len(self.entries) // 2:
+            live = [entry for position, entry in enumerate(self.entries) if position not in self.dropped]
+            self._reset()
+            self._add(live)
+
+    def search(self, query: str, cancelled: Optional[Callable[[], bool]] = None) -> Optional[List[str]]:
+        """
+        Matching entries, best match first.
+
+        cancelled is checked between the steps of the search, and None is
+        returned as soon as it returns True.
+        """
+        with self._lock:
+            return self._search(query.lower(), cancelled or (lambda: False))
+
+    def _search(self, query: str, cancelled: Callable[[], bool]) -> Optional[List[str]]:
+        results = self._cache.get(query)
+        if results is None:
+            if not query:
+                results = [position for position in range(len(self.entries) - 1, -1, -1)
+                           if position not in self.dropped]
+            else:
+                if self._last and self._last[0] and query.startswith(self._last[0]):
+                    candidates = self._narrow(query, sorted(self._last[1]))
+                else:
+                    candidates = self._candidates(query)
+                if cancelled():
+                    return None
+                results = self._rank(query, candidates)
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[query] = results
+
+        self._last = (query, results)
+        entries = self.entries
+        return [entries[position] for position in results]
+
+    def _narrow(self, query: str, positions: List[int]) -> List[int]:
+        # previous results that still match, without a Python loop per entry
+        search = re.compile(_subsequence(query)).search
+        return list(compress(positions, map(search, map(self.lowered.__getitem__, positions))))
+
+    def _candidates(self, query: str) -> List[int]:
+        # The pattern eats the rest of the entry, so there is one match per
+        # matching entry, and counting separators gives its position
+        pattern = re.compile(_subsequence(query) + REST_OF_ENTRY)
+        text = self.text
+        dropped = self.dropped
+        candidates = []
+        position = 0
+        previous = 0
+        for match in pattern.finditer(text):
+            start = match.start()
+            position += text.count(SEPARATOR, previous, start)
+            previous = start
+            if position not in dropped:
+                candidates.append(position)
+        return candidates
+
+    def _rank(self, query: str, candidates: List[int]) -> List[int]:
+        prefix, word, inside, fuzzy = [], [], [], []
+        pattern = None
+        lowered = self.lowered
+        # newest first
+        for position in reversed(candidates):
+            entry = lowered[position]
+            found = entry.find(query)
+            if found == 0:
+                prefix.append(position)
+            elif found > 0:
+                while found != -1 and entry[found - 1] not in WORD_BOUNDARIES:
+                    found = entry.find(query, found + 1)
+                (word if found != -1 else inside).append(position)
+            else:
+                pattern = pattern or re.compile(_subsequence(query))
+                match = pattern.search(entry)
+                if match:
+                    fuzzy.append((match.end() - match.start(), -position))
+        fuzzy.sort()
+        return prefix + word + inside + [-position for _, position in fuzzy]
+
+
+def _subsequence(query: str) -> str:
+    # "g[^c\0]*c[^o\0]*o": each gap stops at the first occurrence of the next
+    # character, so a failed match never backtracks through the gaps
+    parts = [re.escape(query[0])]
+    for char in query[1:]:
+        parts.append("[^" + re.escape(char) + re.escape(SEPARATOR) + "]*" + re.escape(char))
+    return "".join(parts)
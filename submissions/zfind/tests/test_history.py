@@ -0,0 +1,37 @@
+import os
+import sys
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from history import HistoryFile
+from zshhist import writehist
+
+
+def append(path, data):
+    with open(path, "ab") as file:
+        file.write(data)
+
+
+def test_tail_read_of_plain_utf8(tmp_path):
+    path = tmp_path / ".bash_history"
+    append(path, b"ls\ncd /tmp\n")
+    history = HistoryFile(str(path))
+    assert history.read() == ([(None, "ls"), (None, "cd /tmp")], True)
+
+    # 0x83 continuation bytes with no other meta byte around them
+    for command in ("echo тут", "echo Ã", "echo σă"):
+        append(path, command.encode("utf-8") + b"\n")
+        assert history.read() == ([(None, command)], False)
+
+
+def test_tail_read_of_metafied_history(tmp_path):
+    path = tmp_path / ".zsh_history"
+    append(path, b": 1700000000:0;ls\n")
+    history = HistoryFile(str(path))
+    assert history.read() == ([(1700000000, "ls")], True)
+
+    append(path, writehist(": 1700000001:0;echo тут\n".encode("utf-8")))
+    append(path, writehist(": 1700000002:0;echo Ã\n".encode("utf-8")))
+    assert history.read() == ([(1700000001, "echo тут"), (1700000002, "echo Ã")], False)
@@ -0,0 +1,36 @@
+import os
+import sys
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from search import SearchIndex
+
+
+def test_search_ranking():
+    index = SearchIndex(["git checkout main", "echo gco", "ls"])
+    assert index.search("gco") == ["echo gco", "git checkout main"]
+    assert index.search("") == ["ls", "echo gco", "git checkout main"]
+
+
+def test_entries_containing_nul():
+    index = SearchIndex(["old cmd"])
+    index.add(["new cmd\x00with nul", "x", "with more"])
+    assert index.search("with") == ["with more", "new cmd\x00with nul"]
+    assert index.search("x") == ["x"]
+
+
+def test_narrowing_matches_a_fresh_search():
+    commands = [f"{verb} {target}" for verb in ("git commit", "git checkout", "grep", "echo")
+                for target in ("main", "origin/main", "config.ini", "-la")]
+    index = SearchIndex(commands)
+    for query in ("g", "gc", "gco", "gcom"):
+        # every query after the first only filters the previous results
+        assert index.search(query) == SearchIndex(commands).search(query)
+
+
+def test_cancelled_search():
+    index = SearchIndex(["git checkout main", "ls"])
+    assert index.search("gco", cancelled=lambda: True) is None
+    assert index.search("gco") == ["git checkout main"]
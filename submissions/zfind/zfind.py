@@ -1,13 +1,21 @@
 from textual.app import App, ComposeResult, SystemCommand
-from textual.containers import Vertical, ScrollableContainer
-from textual.widgets import Button, Static, Input
+from textual.containers import Vertical
+from textual.widgets import Static, Input
 from textual.screen import Screen
-from typing import Iterable
+from textual.scroll_view import ScrollView
+from textual.geometry import Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.strip import Strip
+from textual import events, work
+from textual.worker import get_current_worker
+from typing import Iterable, Sequence
 from rich import print
+from rich.segment import Segment
+from search import SearchIndex
+from history import HistoryFile, chronological
 import pyperclip
 import os
-import re
-import uuid
 import configparser
 import platform
 import subprocess
@@ -21,21 +29,174 @@ if platform.system() == 'Windows':
 else:
     HISTORY_PATH = os.path.expanduser(config.get("Settings", "history_file", fallback="~/.zsh_history"))
 
+# PowerShell continues a multi-line command with a backtick, zsh with a backslash
+CONTINUATION = "`" if platform.system() == 'Windows' else "\\"
+# Seconds between checks for new commands in the history file
+REFRESH_INTERVAL = 1.0
+
+class CommandList(ScrollView, can_focus=True):
+    # Draws only the rows on screen, so 200k results cost as much as 30
+
+    COMPONENT_CLASSES = {"command-list--cursor"}
+
+    BINDINGS = [
+        ("up", "cursor_up", "Previous command"),
+        ("down", "cursor_down", "Next command"),
+        ("pageup", "page_up", "Previous page"),
+        ("pagedown", "page_down", "Next page"),
+        ("home", "first", "First command"),
+        ("end", "last", "Last command"),
+        ("enter", "select", "Copy the command"),
+    ]
+
+    cursor = reactive(0, always_update=True)
+
+    class Selected(Message):
+        def __init__(self, command: str) -> None:
+            super().__init__()
+            self.command = command
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.commands: Sequence[str] = []
+
+    def set_commands(self, commands: Sequence[str], keep_position: bool = False) -> None:
+        selected = None
+        if keep_position and self.cursor < len(self.commands):
+            selected = self.commands[self.cursor]
+        self.commands = commands
+        self.virtual_size = Size(0, len(commands))
+        if keep_position:
+            # new commands are added above the cursor, so follow the selected
+            # command to its new row and scroll along with it
+            row = self.cursor
+            if selected is not None:
+                try:
+                    row = commands.index(selected)
+                except ValueError:
+                    pass
+            if row != self.cursor:
+                self.scroll_to(y=self.scroll_offset.y + row - self.cursor, animate=False)
+            self.cursor = min(row, max(0, len(commands) - 1))
+        else:
+            self.scroll_to(0, 0, animate=False)
+            self.cursor = 0
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        row = scroll_y + y
+        width = self.size.width
+        if row >= len(self.commands):
+            return Strip.blank(width, self.rich_style)
+        if row == self.cursor:
+            style = self.get_component_rich_style("command-list--cursor")
+        else:
+            style = self.rich_style
+        command = " " + self.commands[row].replace("\n", " ")
+        strip = Strip([Segment(command, style)]).crop(scroll_x, scroll_x + width)
+        return strip.extend_cell_length(width, style)
+
+    def watch_cursor(self, cursor: int) -> None:
+        # keep the cursor row on screen
+        scroll_y = self.scroll_offset.y
+        if cursor < scroll_y:
+            self.scroll_to(y=cursor, animate=False)
+        elif cursor >= scroll_y + self.size.height:
+            self.scroll_to(y=cursor - self.size.height + 1, animate=False)
+        self.refresh()
+
+    def move_cursor(self, rows: int) -> None:
+        if self.commands:
+            self.cursor = max(0, min(len(self.commands) - 1, self.cursor + rows))
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(-1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(1)
+
+    def action_page_up(self) -> None:
+        self.move_cursor(-max(1, self.size.height))
+
+    def action_page_down(self) -> None:
+        self.move_cursor(max(1, self.size.height))
+
+    def action_first(self) -> None:
+        self.move_cursor(-len(self.commands))
+
+    def action_last(self) -> None:
+        self.move_cursor(len(self.commands))
+
+    def action_select(self) -> None:
+        if self.cursor < len(self.commands):
+            self.post_message(self.Selected(self.commands[self.cursor]))
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        row = self.scroll_offset.y + offset.y
+        if row < len(self.commands):
+            self.cursor = row
+            self.action_select()
+
 class ZshHistoryApp(App):
     CSS_PATH = "styles.tcss"
 
     def __init__(self):
         super().__init__()
-        self.commands = self.load_history()
+        self.refreshing = False
+        self.load_history()
 
     def load_history(self):
+        self.history = HistoryFile(HISTORY_PATH, CONTINUATION)
         try:
-            with open(HISTORY_PATH, "r", encoding="utf-8") as file:
-                lines = file.readlines()
-                commands = [re.sub(r"^: \d+:\d+;", "", line.strip()) for line in lines]
-                return list(dict.fromkeys(reversed(commands)))
+            entries, _ = self.history.read()
+            self.index = SearchIndex(chronological(entries))
         except FileNotFoundError:
-            return ["[History file not found]"]
+            self.index = SearchIndex(["[History file not found]"])
+
+    def refresh_history(self) -> None:
+        if not self.refreshing:
+            self.refreshing = True
+            self.read_new_history(self.history, self.index)
+
+    @work(thread=True)
+    def read_new_history(self, history: HistoryFile, index: SearchIndex) -> None:
+        # Only what was appended since the last read, indexed off the UI thread
+        try:
+            entries, restarted = history.read()
+        except OSError:
+            entries, restarted = [], False
+        if restarted:
+            index = SearchIndex(chronological(entries))
+        elif entries:
+            index.add(command for _, command in entries)
+        self.call_from_thread(self.add_history, history, index, bool(entries or restarted))
+
+    def add_history(self, history: HistoryFile, index: SearchIndex, changed: bool) -> None:
+        self.refreshing = False
+        if history is not self.history or not changed:
+            return
+        self.index = index
+        self.filter_commands(keep_position=True)
+
+    def filter_commands(self, keep_position: bool = False) -> None:
+        query = self.query_one("#search", Input).value
+        self.search_history(self.index, query, keep_position)
+
+    @work(thread=True, exclusive=True, group="search")
+    def search_history(self, index: SearchIndex, query: str, keep_position: bool) -> None:
+        # Off the UI thread, a newer search cancels this one
+        worker = get_current_worker()
+        results = index.search(query, cancelled=lambda: worker.is_cancelled)
+        if results is not None and not worker.is_cancelled:
+            self.call_from_thread(self.show_results, index, query, results, keep_position)
+
+    def show_results(self, index: SearchIndex, query: str, results, keep_position: bool) -> None:
+        # drop results that went stale while they were being computed
+        if index is self.index and query == self.query_one("#search", Input).value:
+            self.update_command_list(results, keep_position)
 
     def compose(self) -> ComposeResult:
         yield Vertical(
@@ -43,19 +204,16 @@ class ZshHistoryApp(App):
             Static("Press 'q' to quit, 'c' to clear search 'h' to change history file 'esc key' to escape search bar", classes="header-shortcuts"),
             Static("Search:", classes="header"),
             Input(placeholder="Type to filter...", id="search", classes="input"),
-            ScrollableContainer(id="command_list"),
+            CommandList(id="command_list"),
             Static("Waiting for command...", id="status", classes="status"),
         )
 
     def on_mount(self) -> None:
-        self.update_command_list(self.commands)
+        self.filter_commands()
+        self.set_interval(REFRESH_INTERVAL, self.refresh_history)
 
-    def update_command_list(self, filtered_commands):
-        container = self.query_one("#command_list", ScrollableContainer)
-        filtered_commands = filtered_commands[:]
-        container.remove_children(tuple(container.children))
-        buttons = [Button(cmd, id=f"cmd_{uuid.uuid4()}") for cmd in filtered_commands]
-        container.mount(*buttons)
+    def update_command_list(self, filtered_commands, keep_position=False):
+        self.query_one("#command_list", CommandList).set_commands(filtered_commands, keep_position)
 
     def copy_to_clipboard(self, text: str) -> None:
         text_str = str(text)  # Convert Text object to string
@@ -73,8 +231,8 @@ class ZshHistoryApp(App):
         else:
             pyperclip.copy(text_str)
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        command = event.button.label
+    def on_command_list_selected(self, event: CommandList.Selected) -> None:
+        command = event.command
         self.copy_to_clipboard(command)
         all_widgets = self.query("Static")
         print("All Static widgets:", [widget.id for widget in all_widgets if widget.id])
@@ -86,9 +244,10 @@ class ZshHistoryApp(App):
             print("Error updating status widget:", e)
 
     def on_input_changed(self, event: Input.Changed) -> None:
-        query = event.value.lower()
-        filtered = [cmd for cmd in self.commands if query in cmd.lower()]
-        self.update_command_list(filtered)
+        self.filter_commands()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        self.query_one("#command_list", CommandList).focus()
 
     BINDINGS = [
         ("q", "quit", "Quit the application"),
@@ -102,7 +261,7 @@ class ZshHistoryApp(App):
 
     def action_clear_search(self) -> None:
         self.query_one("#search", Input).value = ""
-        self.update_command_list(self.commands)
+        self.filter_commands()
 
     def action_change_history_file(self) -> None:
         if platform.system() in ['Linux', 'Darwin']:  # Only apply to macOS or Linux users
@@ -123,8 +282,8 @@ class ZshHistoryApp(App):
         with open(CONFIG_PATH, "w") as configfile:
             config.write(configfile)
         HISTORY_PATH = new_history_file
-        self.commands = self.load_history()
-        self.update_command_list(self.commands)
+        self.load_history()
+        self.filter_commands()
         self.query_one("#status", Static).update(f"Switched to {new_history_file}")
 
     def get_system_commands(self, screen: Screen) -> Iterable[SystemCommand]:
@@ -41,11 +41,15 @@ SOFTWARE.
 """
 
 import os
+import re
 import sys
 from argparse import ArgumentParser, FileType as OriginalFileType
 
 
-DEFAULT_ZSH_HIST_FILE = os.path.join(os.environ["HOME"], ".zsh_history")
+DEFAULT_ZSH_HIST_FILE = os.path.join(os.path.expanduser("~"), ".zsh_history")
+META = 0x83
+# Read/write buffer size of the converters
+CHUNK_SIZE = 1 << 16
 
 
 class FileType(OriginalFileType):
@@ -73,33 +77,29 @@ def ismeta(ch):
             or ch == 0xa0 or ch == 0x83 or ch == 0)
 
 
+# Translate tables of the codec: every meta byte and its escape sequence,
+# and the xor with 32 that undoes an escape
+METAFIED = re.compile(rb"[\x00\x83-\x9d\xa0]")
+ESCAPES = {bytes([c]): bytes([META, c ^ 32]) for c in range(256) if ismeta(c)}
+UNESCAPE = bytes(c ^ 32 for c in range(256))
+
+
 def readhist(bs):
-    change = False
-    result = bytearray()
-    for c in bs:
-        if c != 0x83:
-            if change:
-                d = c ^ 32;
-            else:
-                d = c
-            result.append(d)
-            change = False
-        else:
-            change = True
-    return bytes(result)
+    """Undo zsh metafication: drop every META byte and xor the byte after it with 32.
+
+    Works on whole buffers: the data is split at the META bytes and only the
+    first byte of every piece is translated, so plain ASCII history costs a
+    single scan.
+    """
+    if META not in bs:
+        return bytes(bs)
+    pieces = bytes(bs).split(b"\x83")
+    return pieces[0] + b"".join(piece[:1].translate(UNESCAPE) + piece[1:] for piece in pieces[1:])
 
 
 def writehist(bs):
-    result = bytearray()
-    for c in bs:
-        if ismeta(c):
-            d = 0x83
-            result.append(d)
-            d = c ^ 32
-            result.append(d)
-        else:
-            result.append(c)
-    return bytes(result)
+    """Metafy bytes the way zsh writes its history file."""
+    return METAFIED.sub(lambda match: ESCAPES[match.group()], bytes(bs))
 
 
 class InvalidFormatError(Exception):
@@ -135,16 +135,18 @@ def handle_export(args):
         return byte2u(i, readhist(x), args.strict)
 
     try:
-        hists = mapNotNone(f, enumerate(args.source.readlines()))
+        for hist in mapNotNone(f, enumerate(args.source)):
+            sys.stdout.write(hist)
     except InvalidFormatError as e:
         print("Invalid characters @ line {0}".format(e.index+1),
-              file=stderr)
+              file=sys.stderr)
         exit(2)
-    sys.stdout.write("".join(hists))
 
 
 def handle_import(args):
-    sys.stdout.buffer.write(writehist(args.source.read()))
+    # metafication is byte by byte, so the input can be converted in chunks
+    for chunk in iter(lambda: args.source.read(CHUNK_SIZE), b""):
+        sys.stdout.buffer.write(writehist(chunk))
 
 
 def handle_unknown(parser, args):